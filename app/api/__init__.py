@@ -8,8 +8,9 @@ from .routers import (
     maintenance_router,
     alert_routers,
     ai_router,
-    dashboard_routers
-    
+    dashboard_routers,
+    analytics_router,
+    sync_router
 )
 
 # Criar router principal para API (prefixo /api/v1)
@@ -25,7 +26,9 @@ routers = [
     maintenance_router,
     alert_routers,
     ai_router,
-    dashboard_routers
+    dashboard_routers,
+    analytics_router,
+    sync_router
 ]
 
 # Incluir todos os routers
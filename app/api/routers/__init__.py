@@ -8,6 +8,8 @@ from .maintenance import router as maintenance_router
 from .ai import router as ai_router
 from .alert import router as alert_routers
 from .dashboard import router as dashboard_routers
+from .analytics import router as analytics_router
+from .sync import router as sync_router
 
 
 # Lista de todos os routers para exportação
@@ -21,5 +23,7 @@ __all__ = [
     "maintenance_router",
     "ai_router",
     "alert_routers",
-    "dashboard_routers"
+    "dashboard_routers",
+    "analytics_router",
+    "sync_router"
 ]
\ No newline at end of file
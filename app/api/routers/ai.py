@@ -1,6 +1,12 @@
-from fastapi import APIRouter, HTTPException
+import asyncio
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.integrations.db.client import get_read_db_session
+from app.repositories.refuel_repository import RefuelRepository
 from app.schemas.ai import AnomalyRequest, AnomalyResponse, PredictRequest, PredictResponse
-from app.services.ai_service import predict_consumption, check_anomaly
+from app.services.ai_service import predict_consumption, get_prediction_stats, check_anomaly, get_retrain_counters
 
 router = APIRouter(prefix="/ai", tags=["ai"])
 
@@ -17,9 +23,15 @@ def detect_anomaly(payload: AnomalyRequest):
         raise HTTPException(status_code=500, detail=f"Erro interno: {e}")
 
 @router.post("/predict", response_model=PredictResponse)
-def predict(payload: PredictRequest):
+async def predict(payload: PredictRequest, db: AsyncSession = Depends(get_read_db_session)):
     try:
-        r = predict_consumption(payload.dict())
+        stats = await asyncio.to_thread(get_prediction_stats, payload.placa)
+
+        # Placa fria: sem histórico próprio, as médias estão só nos abastecimentos
+        if stats is None:
+            stats = await RefuelRepository(db).get_media_stats(payload.placa)
+
+        r = predict_consumption(payload.dict(), stats)
 
         return {
             "placa": payload.placa,
@@ -30,3 +42,9 @@ def predict(payload: PredictRequest):
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro interno: {e}")
+
+
+@router.get("/retrain-stats")
+def retrain_stats():
+    """Retreinos executados e ignorados pelo gate de drift (por worker)"""
+    return get_retrain_counters()
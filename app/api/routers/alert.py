@@ -1,36 +1,57 @@
-from fastapi import APIRouter, Depends, HTTPException
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
+from app.core.dependencies import get_current_active_user
+from app.integrations.db.client import get_read_db_session
+from app.models.user import User
+from app.schemas.enums import UserType
 from app.services.alert_service import AlertService
-from app.schemas.alert import AlertCreate, AlertResolveUpdate, AlertResponse
+from app.schemas.alert import AlertCreate, AlertResolveUpdate, AlertResponse, AlertBatchResponse
 
 router = APIRouter(prefix="/alerts", tags=["alerts"])
 
 
+def _alert_response(alert, placa: str | None) -> AlertResponse:
+    """AlertResponse de um Alert carregado (placa à parte: o veículo nem sempre está carregado)"""
+    resposta = AlertResponse.model_validate(alert)
+    resposta.placa = placa
+    return resposta
+
+
 @router.get("/", response_model=list[AlertResponse])
 async def list_alerts(
     id_veiculo: str | None = None,
     severity: str | None = None,
     resolved: bool | None = None,
-    db: AsyncSession = Depends(get_db)
+    skip: int = Query(0, ge=0, description="Número de registros para pular"),
+    limit: int = Query(100, ge=1, le=1000, description="Número máximo de registros"),
+    db: AsyncSession = Depends(get_read_db_session)
 ):
     service = AlertService(db)
-    alerts = await service.list_alerts(id_veiculo, severity, resolved)
-
-    return [
-        {
-            "id": a.id,
-            "severity": a.severity,
-            "message": a.message,
-            "resolved": a.resolved,
-            "created_at": a.created_at,
-            "id_veiculo": a.id_veiculo,
-            "id_abastecimento": a.id_abastecimento,
-            "placa": a.veiculo.placa if a.veiculo else None
-        }
-        for a in alerts
-    ]
+    alerts = await service.list_alerts(id_veiculo, severity, resolved, skip, limit)
+
+    # Linhas da projeção já têm os campos do AlertResponse (placa inclusa)
+    return [dict(a) for a in alerts]
+
+
+@router.get("/batch", response_model=AlertBatchResponse)
+async def get_alerts_batch(
+    ids: list[UUID] = Query(..., description="IDs dos alertas (repita o parâmetro: ?ids=...&ids=...)"),
+    db: AsyncSession = Depends(get_read_db_session),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Buscar vários alertas por ID em uma consulta, na ordem pedida.
+    IDs inexistentes ou de veículos de outro usuário vêm em missing.
+    """
+    service = AlertService(db)
+    id_usuario = None if current_user.type == UserType.ADM else current_user.id
+    alerts, missing = await service.get_alerts_by_ids(ids, id_usuario)
+
+    return {"alerts": [dict(a) for a in alerts], "missing": missing}
 
 
 @router.get("/{alert_id}", response_model=AlertResponse)
@@ -40,16 +61,7 @@ async def get_alert(alert_id: str, db: AsyncSession = Depends(get_db)):
     if not alert:
         raise HTTPException(404, "Alerta não encontrado")
 
-    return {
-        "id": alert.id,
-        "severity": alert.severity,
-        "message": alert.message,
-        "resolved": alert.resolved,
-        "created_at": alert.created_at,
-        "id_veiculo": alert.id_veiculo,
-        "id_abastecimento": alert.id_abastecimento,
-        "placa": alert.veiculo.placa if alert.veiculo else None
-    }
+    return _alert_response(alert, alert.veiculo.placa if alert.veiculo else None)
 
 
 @router.post("/", response_model=AlertResponse)
@@ -58,19 +70,12 @@ async def create_alert(payload: AlertCreate, db: AsyncSession = Depends(get_db))
     alert = await service.create_alert(
         id_veiculo=payload.id_veiculo,
         id_abastecimento=payload.id_abastecimento,
+        data_abastecimento=payload.data_abastecimento,
         severity=payload.severity,
         message=payload.message
     )
-    return {
-        "id": alert.id,
-        "severity": alert.severity,
-        "message": alert.message,
-        "resolved": alert.resolved,
-        "created_at": alert.created_at,
-        "id_veiculo": alert.id_veiculo,
-        "id_abastecimento": alert.id_abastecimento,
-        "placa": None  # veiculo não carregado aqui, mas OK
-    }
+    # veiculo não carregado aqui: placa fica None
+    return _alert_response(alert, None)
 
 
 @router.patch("/{alert_id}/resolve", response_model=AlertResponse)
@@ -80,16 +85,7 @@ async def resolve_alert(alert_id: str, payload: AlertResolveUpdate, db: AsyncSes
     if not alert:
         raise HTTPException(404, "Alerta não encontrado")
 
-    return {
-        "id": alert.id,
-        "severity": alert.severity,
-        "message": alert.message,
-        "resolved": alert.resolved,
-        "created_at": alert.created_at,
-        "id_veiculo": alert.id_veiculo,
-        "id_abastecimento": alert.id_abastecimento,
-        "placa": alert.veiculo.placa if alert.veiculo else None
-    }
+    return _alert_response(alert, alert.veiculo.placa if alert.veiculo else None)
 
 
 @router.delete("/{alert_id}")
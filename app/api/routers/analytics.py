@@ -0,0 +1,37 @@
+import asyncio
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
+
+from app.core.dependencies import get_current_admin_user
+from app.models.user import User
+from app.schemas.analytics import AnalyticsQueryInfo, AnalyticsResponse
+from app.services.analytics_service import list_queries, run_query
+
+router = APIRouter(prefix="/analytics", tags=["analytics"])
+
+
+@router.get("/", response_model=list[AnalyticsQueryInfo])
+async def list_analytics(
+    current_user: User = Depends(get_current_admin_user)
+) -> list[AnalyticsQueryInfo]:
+    """Consultas analíticas disponíveis - apenas admin"""
+    return list_queries()
+
+
+@router.get("/{consulta}", response_model=AnalyticsResponse)
+async def run_analytics(
+    consulta: str,
+    data_inicio: Optional[date] = Query(None, description="Data início (YYYY-MM-DD)"),
+    data_fim: Optional[date] = Query(None, description="Data fim (YYYY-MM-DD)"),
+    placa: Optional[str] = Query(None, description="Filtrar por placa"),
+    limite: int = Query(1000, ge=1, le=10000, description="Máximo de linhas no resultado"),
+    current_user: User = Depends(get_current_admin_user)
+) -> AnalyticsResponse:
+    """
+    Executar uma consulta analítica sobre os snapshots Parquet - apenas admin.
+    Não consulta o PostgreSQL: os dados são os do último python -m app.jobs.export_parquet.
+    """
+    # Agregação colunar é CPU: fora do event loop
+    return await asyncio.to_thread(run_query, consulta, data_inicio, data_fim, placa, limite)
@@ -3,8 +3,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import date
 from typing import List, Optional
 
-# ✔ CORRETO – seu get_db fica em app/core/database.py
-from app.core.database import get_db
+# Leitura analítica: vai para uma réplica quando houver (senão, primário)
+from app.integrations.db.client import get_read_db_session
 
 # ⚠ VERIFICAR NOME DO ARQUIVO: deve ser "dashboard_repository.py"
 from app.repositories.dashboard_repository import DashboardRepository
@@ -36,7 +36,7 @@ async def dashboard_metrics(
         None,
         description="Data final para filtro (AAAA-MM-DD)"
     ),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db_session)
 ):
     repo = DashboardRepository(db)
 
@@ -2,39 +2,68 @@ from typing import Optional
 from uuid import UUID
 from datetime import date
 
-from fastapi import APIRouter, Depends, Query, status
+from fastapi import APIRouter, Depends, Header, Query, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.integrations.db.client import get_db_session
+from app.integrations.db.client import get_db_session, get_read_db_session
 from app.schemas.refuel import (
     RefuelCreate,
     RefuelResponse,
     RefuelListResponse,
     RefuelUpdate,
-    RefuelPublishResponse
+    RefuelPublishResponse,
+    RefuelBatchResponse
 )
+from app.schemas.user import UserResponse
 from app.schemas.enums import UserType
 from app.services.refuel_service import RefuelService
+from app.services.idempotency_service import IdempotencyService
 from app.core.dependencies import get_current_active_user, get_current_admin_user
 from app.models.user import User
+from app.models.refuel import Refuel
+from app.common.fieldsets import projection
+from app.common.responses import PydanticResponse
 
 router = APIRouter(prefix="/refuels", tags=["refuels"])
 
+# Relacionamentos aceitos em ?expand= (nome -> tipo na resposta)
+REFUEL_EXPANSIONS = {
+    "usuario": Optional[UserResponse],
+}
 
-@router.post("/", status_code=status.HTTP_201_CREATED)
+
+@router.post("/", status_code=status.HTTP_201_CREATED, response_model=RefuelResponse)
 async def create_refuel(
     refuel_data: RefuelCreate,
+    idempotency_key: Optional[str] = Header(
+        None,
+        alias="Idempotency-Key",
+        max_length=255,
+        description="Repetições com a mesma chave devolvem a resposta original sem refazer nada"
+    ),
     current_user: User = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db_session)
 ):
     """
     Criar abastecimento 
     """
-    service = RefuelService(db)
+    # Só flush: o abastecimento e a resposta da Idempotency-Key vão no mesmo commit
+    service = RefuelService(db, auto_commit=False)
     refuel_data.id_usuario = current_user.id
-    
-    refuel = await service.create_refuel(refuel_data)
-    return RefuelResponse.model_validate(refuel)
+
+    async def criar():
+        refuel = await service.create_refuel(refuel_data)
+        return RefuelResponse.model_validate(refuel).model_dump(mode="json")
+
+    return await IdempotencyService(db).run(
+        idempotency_key,
+        current_user.id,
+        "POST /refuels",
+        refuel_data.model_dump(mode="json"),
+        status.HTTP_201_CREATED,
+        criar
+    )
     
 
 
@@ -46,15 +75,19 @@ async def list_refuels(
     id_usuario: Optional[UUID] = Query(None, description="Filtrar por ID do usuário"),
     data_inicio: Optional[date] = Query(None, description="Data início (YYYY-MM-DD)"),
     data_fim: Optional[date] = Query(None, description="Data fim (YYYY-MM-DD)"),
-    db: AsyncSession = Depends(get_db_session),
+    fields: Optional[str] = Query(None, description="Campos da resposta, separados por vírgula (ex.: data,km,litros)"),
+    expand: Optional[str] = Query(None, description="Relacionamentos incluídos na resposta: usuario"),
+    db: AsyncSession = Depends(get_read_db_session),
     current_user: User = Depends(get_current_active_user)
-) -> RefuelListResponse:
+) -> PydanticResponse:
     """
     Listar abastecimentos do banco de dados.
     Usuários comuns veem apenas seus próprios.
     Admins veem todos.
+    ?fields= limita as colunas lidas; ?expand=usuario traz o usuário em lote.
     """
     service = RefuelService(db)
+    projecao = projection(RefuelResponse, fields, expand, REFUEL_EXPANSIONS)
     
     # Se não for admin, forçar filtro pelo próprio id_usuario
     if current_user.type != UserType.ADM:
@@ -66,7 +99,8 @@ async def list_refuels(
         placa=placa,
         id_usuario=id_usuario,
         data_inicio=data_inicio,
-        data_fim=data_fim
+        data_fim=data_fim,
+        opcoes=projecao.options(Refuel)
     )
     
     total = await service.count_refuels(
@@ -76,20 +110,87 @@ async def list_refuels(
         data_fim=data_fim
     )
     
-    return RefuelListResponse(
+    if projecao.schema is not None:
+        return PydanticResponse({
+            "refuels": projecao.validate(refuels),
+            "total": total,
+            "page": (skip // limit) + 1,
+            "per_page": limit
+        })
+
+    return PydanticResponse(RefuelListResponse(
         refuels=[RefuelResponse.model_validate(r) for r in refuels],
         total=total,
         page=(skip // limit) + 1,
         per_page=limit
+    ))
+
+
+# Tipos de conteúdo da exportação
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+
+@router.get("/export", status_code=status.HTTP_200_OK)
+async def export_refuels(
+    formato: str = Query("csv", pattern="^(csv|ndjson)$", description="Formato: csv ou ndjson"),
+    placa: Optional[str] = Query(None, description="Filtrar por placa"),
+    id_usuario: Optional[UUID] = Query(None, description="Filtrar por ID do usuário"),
+    data_inicio: Optional[date] = Query(None, description="Data início (YYYY-MM-DD)"),
+    data_fim: Optional[date] = Query(None, description="Data fim (YYYY-MM-DD)"),
+    db: AsyncSession = Depends(get_read_db_session),
+    current_user: User = Depends(get_current_active_user)
+) -> StreamingResponse:
+    """
+    Exportar abastecimentos (sem paginação), enviados em pedaços conforme
+    são lidos do banco. Mesmos filtros e regras de acesso da listagem.
+    """
+    service = RefuelService(db)
+    
+    # Se não for admin, forçar filtro pelo próprio id_usuario
+    if current_user.type != UserType.ADM:
+        id_usuario = current_user.id
+    
+    return StreamingResponse(
+        service.export_refuels(
+            formato=formato,
+            placa=placa,
+            id_usuario=id_usuario,
+            data_inicio=data_inicio,
+            data_fim=data_fim
+        ),
+        media_type=EXPORT_MEDIA_TYPES[formato],
+        headers={"Content-Disposition": f'attachment; filename="abastecimentos.{formato}"'}
     )
 
 
+@router.get("/batch", response_model=RefuelBatchResponse, status_code=status.HTTP_200_OK)
+async def get_refuels_batch(
+    ids: list[UUID] = Query(..., description="IDs dos abastecimentos (repita o parâmetro: ?ids=...&ids=...)"),
+    db: AsyncSession = Depends(get_read_db_session),
+    current_user: User = Depends(get_current_active_user)
+) -> PydanticResponse:
+    """
+    Buscar vários abastecimentos por ID em uma consulta, na ordem pedida.
+    IDs inexistentes ou de abastecimentos de outro usuário vêm em missing.
+    """
+    id_usuario = None if current_user.type == UserType.ADM else current_user.id
+    refuels, missing = await RefuelService(db).get_refuels_by_ids(ids, id_usuario)
+
+    return PydanticResponse(RefuelBatchResponse(
+        refuels=[RefuelResponse.model_validate(r) for r in refuels],
+        missing=missing
+    ))
+
+
 @router.get("/{refuel_id}", response_model=RefuelResponse, status_code=status.HTTP_200_OK)
 async def get_refuel(
     refuel_id: UUID,
     db: AsyncSession = Depends(get_db_session),
     current_user: User = Depends(get_current_active_user)
-) -> RefuelResponse:
+) -> PydanticResponse:
     """Buscar abastecimento por ID - apenas dono ou admin"""
     service = RefuelService(db)
     refuel = await service.get_refuel_by_id(refuel_id)
@@ -101,7 +202,7 @@ async def get_refuel(
             "Você não tem permissão para acessar este recurso"
         )
     
-    return RefuelResponse.model_validate(refuel)
+    return PydanticResponse(RefuelResponse.model_validate(refuel))
 
 
 @router.patch("/{refuel_id}", response_model=RefuelResponse, status_code=status.HTTP_200_OK)
@@ -110,11 +211,11 @@ async def update_refuel(
     refuel_data: RefuelUpdate,
     db: AsyncSession = Depends(get_db_session),
     current_user: User = Depends(get_current_admin_user)
-) -> RefuelResponse:
+) -> PydanticResponse:
     """Atualizar abastecimento - apenas admin"""
     service = RefuelService(db)
     refuel = await service.update_refuel(refuel_id, refuel_data)
-    return RefuelResponse.model_validate(refuel)
+    return PydanticResponse(RefuelResponse.model_validate(refuel))
 
 
 @router.delete("/{refuel_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,31 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.integrations.db.client import get_db_session
+from app.core.dependencies import get_current_active_user
+from app.models.user import User
+from app.schemas.sync import SyncResponse
+from app.services.sync_service import SyncService
+from app.common.responses import PydanticResponse
+
+router = APIRouter(prefix="/sync", tags=["sync"])
+
+
+@router.get("/", response_model=SyncResponse)
+async def sync(
+    cursor: Optional[str] = Query(None, description="Cursor devolvido pela última sincronização (vazio = tudo)"),
+    limit: int = Query(500, ge=1, le=2000, description="Máximo de registros de cada tipo por página"),
+    current_user: User = Depends(get_current_active_user),
+    # Banco principal, não a réplica: o atraso da réplica faria o cursor
+    # avançar sobre alterações que ela ainda não recebeu
+    db: AsyncSession = Depends(get_db_session)
+) -> PydanticResponse:
+    """
+    Sincronização incremental do app: veículos, abastecimentos e alertas
+    criados/alterados e as exclusões desde o cursor. Repita com o cursor
+    devolvido enquanto mais=true; reset=true indica que a resposta é
+    completa e os dados locais devem ser substituídos.
+    """
+    return PydanticResponse(await SyncService(db).sync(current_user, cursor, limit))
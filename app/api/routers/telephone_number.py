@@ -4,7 +4,7 @@ from uuid import UUID
 from fastapi import APIRouter, Depends, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.integrations.db.client import get_db_session
+from app.integrations.db.client import get_db_session, get_read_db_session
 from app.schemas.telephone_number import (
     TelephoneNumberCreate,
     TelephoneNumberUpdate,
@@ -16,6 +16,7 @@ from app.services.telephone_number_service import TelephoneNumberService
 from app.core.dependencies import get_current_active_user
 from app.models.user import User
 from app.common.exceptions.validation_exceptions import ValidationError
+from app.common.responses import PydanticResponse
 
 router = APIRouter(prefix="/telephones", tags=["telephones"])
 
@@ -39,7 +40,7 @@ async def create_telephone(
     telephone_data: TelephoneNumberCreate,
     db: AsyncSession = Depends(get_db_session),
     current_user: User = Depends(get_current_active_user)
-) -> TelephoneNumberResponse:
+) -> PydanticResponse:
     """
     Criar número de telefone.
     Usuário pode criar para si mesmo ou admin pode criar para qualquer usuário.
@@ -52,7 +53,7 @@ async def create_telephone(
     
     service = TelephoneNumberService(db)
     telephone = await service.create_telephone(telephone_data)
-    return TelephoneNumberResponse.model_validate(telephone)
+    return PydanticResponse(TelephoneNumberResponse.model_validate(telephone), status_code=status.HTTP_201_CREATED)
 
 
 @router.get("/", response_model=TelephoneNumberListResponse, status_code=status.HTTP_200_OK)
@@ -61,9 +62,9 @@ async def list_telephones(
     limit: int = Query(100, ge=1, le=1000, description="Número máximo de registros"),
     status_filter: Optional[TelephoneNumberStatus] = Query(None, description="Filtrar por status"),
     user_id: Optional[UUID] = Query(None, description="Filtrar por ID do usuário"),
-    db: AsyncSession = Depends(get_db_session),
+    db: AsyncSession = Depends(get_read_db_session),
     current_user: User = Depends(get_current_active_user)
-) -> TelephoneNumberListResponse:
+) -> PydanticResponse:
     """
     Listar telefones.
     Usuário comum vê apenas seus próprios telefones.
@@ -87,12 +88,12 @@ async def list_telephones(
         user_id=user_id
     )
     
-    return TelephoneNumberListResponse(
+    return PydanticResponse(TelephoneNumberListResponse(
         telephone_numbers=[TelephoneNumberResponse.model_validate(t) for t in telephones],
         total=total,
         page=(skip // limit) + 1,
         per_page=limit
-    )
+    ))
 
 
 @router.get("/{telephone_id}", response_model=TelephoneNumberResponse, status_code=status.HTTP_200_OK)
@@ -100,7 +101,7 @@ async def get_telephone(
     telephone_id: UUID,
     db: AsyncSession = Depends(get_db_session),
     current_user: User = Depends(get_current_active_user)
-) -> TelephoneNumberResponse:
+) -> PydanticResponse:
     """Buscar telefone por ID - apenas dono ou admin"""
     service = TelephoneNumberService(db)
     telephone = await service.get_telephone_by_id(telephone_id)
@@ -108,7 +109,7 @@ async def get_telephone(
     # Validar permissão
     check_telephone_ownership(telephone.id_user, current_user)
     
-    return TelephoneNumberResponse.model_validate(telephone)
+    return PydanticResponse(TelephoneNumberResponse.model_validate(telephone))
 
 
 @router.patch("/{telephone_id}", response_model=TelephoneNumberResponse, status_code=status.HTTP_200_OK)
@@ -117,7 +118,7 @@ async def update_telephone(
     telephone_data: TelephoneNumberUpdate,
     db: AsyncSession = Depends(get_db_session),
     current_user: User = Depends(get_current_active_user)
-) -> TelephoneNumberResponse:
+) -> PydanticResponse:
     """Atualizar telefone - apenas dono ou admin"""
     service = TelephoneNumberService(db)
     
@@ -129,7 +130,7 @@ async def update_telephone(
     
     # Atualizar
     updated_telephone = await service.update_telephone(telephone_id, telephone_data)
-    return TelephoneNumberResponse.model_validate(updated_telephone)
+    return PydanticResponse(TelephoneNumberResponse.model_validate(updated_telephone))
 
 
 @router.delete("/{telephone_id}", status_code=status.HTTP_204_NO_CONTENT)
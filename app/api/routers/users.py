@@ -4,25 +4,35 @@ from uuid import UUID
 from fastapi import APIRouter, Depends, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.integrations.db.client import get_db_session
+from app.integrations.db.client import get_db_session, get_read_db_session
 from app.schemas.user import UserCreate, UserUpdate, UserResponse, UserListResponse
+from app.schemas.telephone_number import TelephoneNumberResponse
+from app.schemas.vehicle import VehicleResponse
 from app.schemas.enums import UserStatus, UserType
 from app.services.user_service import UserService
 from app.core.dependencies import get_current_active_user, get_current_admin_user
 from app.models.user import User
+from app.common.fieldsets import projection
+from app.common.responses import PydanticResponse
 
 router = APIRouter(prefix="/users", tags=["users"])
 
+# Relacionamentos aceitos em ?expand= (nome -> tipo na resposta)
+USER_EXPANSIONS = {
+    "telephone_numbers": list[TelephoneNumberResponse],
+    "veiculos": list[VehicleResponse],
+}
+
 
 @router.post("/", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 async def create_user(
     user_data: UserCreate,
     db: AsyncSession = Depends(get_db_session)
-) -> UserResponse:
+) -> PydanticResponse:
     """Criar novo usuário - endpoint público para registro"""
     service = UserService(db)
     user = await service.create_user(user_data)
-    return UserResponse.model_validate(user)
+    return PydanticResponse(UserResponse.model_validate(user), status_code=status.HTTP_201_CREATED)
 
 
 @router.get("/", response_model=UserListResponse, status_code=status.HTTP_200_OK)
@@ -32,17 +42,24 @@ async def list_users(
     status_param: Optional[UserStatus] = Query(None, alias="status", description="Filtrar por status"),
     user_type: Optional[UserType] = Query(None, description="Filtrar por tipo de usuário"),
     search: Optional[str] = Query(None, description="Buscar por nome ou email"),
-    db: AsyncSession = Depends(get_db_session),
+    fields: Optional[str] = Query(None, description="Campos da resposta, separados por vírgula (ex.: name,email)"),
+    expand: Optional[str] = Query(None, description="Relacionamentos incluídos na resposta: telephone_numbers, veiculos"),
+    db: AsyncSession = Depends(get_read_db_session),
     current_user: User = Depends(get_current_admin_user)
-) -> UserListResponse:
-    """Listar usuários - restrito a administradores"""
+) -> PydanticResponse:
+    """
+    Listar usuários - restrito a administradores.
+    ?fields= limita as colunas lidas; ?expand= traz telefones/veículos em lote.
+    """
     service = UserService(db)
+    projecao = projection(UserResponse, fields, expand, USER_EXPANSIONS)
     users = await service.get_users(
         skip=skip, 
         limit=limit, 
         status=status_param,
         user_type=user_type,
-        search=search
+        search=search,
+        opcoes=projecao.options(User)
     )
     total = await service.count_users(
         status=status_param,
@@ -50,12 +67,20 @@ async def list_users(
         search=search
     )
     
-    return UserListResponse(
+    if projecao.schema is not None:
+        return PydanticResponse({
+            "users": projecao.validate(users),
+            "total": total,
+            "page": (skip // limit) + 1,
+            "per_page": limit
+        })
+
+    return PydanticResponse(UserListResponse(
         users=[UserResponse.model_validate(user) for user in users],
         total=total,
         page=(skip // limit) + 1,
         per_page=limit
-    )
+    ))
 
 
 @router.get("/{user_id}", response_model=UserResponse, status_code=status.HTTP_200_OK)
@@ -63,11 +88,11 @@ async def get_user(
     user_id: UUID,
     db: AsyncSession = Depends(get_db_session),
     current_user: User = Depends(get_current_active_user)
-) -> UserResponse:
+) -> PydanticResponse:
     """Buscar usuário por ID"""
     service = UserService(db)
     user = await service.get_user_by_id(user_id)
-    return UserResponse.model_validate(user)
+    return PydanticResponse(UserResponse.model_validate(user))
 
 
 @router.patch("/{user_id}", response_model=UserResponse, status_code=status.HTTP_200_OK)
@@ -76,11 +101,11 @@ async def update_user(
     user_data: UserUpdate,
     db: AsyncSession = Depends(get_db_session),
     current_user: User = Depends(get_current_admin_user) 
-) -> UserResponse:
+) -> PydanticResponse:
     """Atualizar usuário - restrito a administradores"""
     service = UserService(db)
     user = await service.update_user(user_id, user_data)
-    return UserResponse.model_validate(user)
+    return PydanticResponse(UserResponse.model_validate(user))
 
 
 @router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -106,11 +131,11 @@ async def activate_user(
     user_id: UUID,
     db: AsyncSession = Depends(get_db_session),
     current_user: User = Depends(get_current_admin_user)
-) -> UserResponse:
+) -> PydanticResponse:
     """Ativar usuário - restrito a administradores"""
     service = UserService(db)
     user = await service.activate_user(user_id)
-    return UserResponse.model_validate(user)
+    return PydanticResponse(UserResponse.model_validate(user))
 
 
 @router.post("/{user_id}/deactivate", response_model=UserResponse, status_code=status.HTTP_200_OK)
@@ -118,11 +143,11 @@ async def deactivate_user(
     user_id: UUID,
     db: AsyncSession = Depends(get_db_session),
     current_user: User = Depends(get_current_admin_user)
-) -> UserResponse:
+) -> PydanticResponse:
     """Desativar usuário - restrito a administradores"""
     service = UserService(db)
     user = await service.deactivate_user(user_id)
-    return UserResponse.model_validate(user)
+    return PydanticResponse(UserResponse.model_validate(user))
 
 
 @router.get("/email/{email}", response_model=UserResponse, status_code=status.HTTP_200_OK)
@@ -130,11 +155,11 @@ async def get_user_by_email(
     email: str,
     db: AsyncSession = Depends(get_db_session),
     current_user: User = Depends(get_current_active_user)
-) -> UserResponse:
+) -> PydanticResponse:
     """Buscar usuário por email"""
     service = UserService(db)
     user = await service.get_user_by_email(email)
-    return UserResponse.model_validate(user)
+    return PydanticResponse(UserResponse.model_validate(user))
 
 
 @router.get("/cpf/{cpf}", response_model=UserResponse, status_code=status.HTTP_200_OK)
@@ -142,11 +167,11 @@ async def get_user_by_cpf(
     cpf: str,
     db: AsyncSession = Depends(get_db_session),
     current_user: User = Depends(get_current_active_user)
-) -> UserResponse:
+) -> PydanticResponse:
     """Buscar usuário por CPF"""
     service = UserService(db)
     user = await service.get_user_by_cpf(cpf)
-    return UserResponse.model_validate(user)
+    return PydanticResponse(UserResponse.model_validate(user))
 
 
 @router.get("/type/{user_type}", response_model=list[UserResponse], status_code=status.HTTP_200_OK)
@@ -154,8 +179,8 @@ async def get_users_by_type(
     user_type: UserType,
     db: AsyncSession = Depends(get_db_session),
     current_user: User = Depends(get_current_active_user)
-) -> list[UserResponse]:
+) -> PydanticResponse:
     """Buscar usuários por tipo"""
     service = UserService(db)
     users = await service.get_users_by_type(user_type)
-    return [UserResponse.model_validate(user) for user in users]
\ No newline at end of file
+    return PydanticResponse([UserResponse.model_validate(user) for user in users])
\ No newline at end of file
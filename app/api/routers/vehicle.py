@@ -4,16 +4,33 @@ from uuid import UUID
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.integrations.db.client import get_db_session
-from app.schemas.vehicle import VehicleCreate, VehicleUpdate, VehicleResponse, VehicleListResponse
+from app.integrations.db.client import get_db_session, get_read_db_session
+from app.schemas.vehicle import (
+    VehicleCreate,
+    VehicleUpdate,
+    VehicleResponse,
+    VehicleListResponse,
+    VehicleBatchResponse
+)
+from app.schemas.user import UserResponse
+from app.schemas.maintenance import MaintenanceResponse
 from app.schemas.enums import VehicleType, UserType
 from app.services.vehicle_service import VehicleService
-from app.core.dependencies import get_current_active_user, get_current_admin_user
+from app.core.dependencies import get_current_active_user, get_current_admin_user, get_owned_vehicle
 from app.models.user import User
+from app.models.vehicle import Vehicle
 from app.common.exceptions.validation_exceptions import ValidationError
+from app.common.fieldsets import projection
+from app.common.responses import PydanticResponse
 
 router = APIRouter(prefix="/vehicles", tags=["vehicles"])
 
+# Relacionamentos aceitos em ?expand= (nome -> tipo na resposta)
+VEHICLE_EXPANSIONS = {
+    "usuario": UserResponse,
+    "manutencoes": list[MaintenanceResponse],
+}
+
 
 def check_vehicle_ownership(current_user: User, vehicle_owner_id: UUID) -> bool:
     """Verifica se o usuário atual é dono do veículo ou é admin"""
@@ -27,7 +44,7 @@ async def create_vehicle(
     vehicle_data: VehicleCreate,
     db: AsyncSession = Depends(get_db_session),
     current_user: User = Depends(get_current_active_user)
-) -> VehicleResponse:
+) -> PydanticResponse:
     """Criar novo veículo"""
     # Validar que usuário só pode criar veículo para si mesmo, exceto admin
     if current_user.type != UserType.ADM and str(vehicle_data.id_usuario) != str(current_user.id):
@@ -37,7 +54,7 @@ async def create_vehicle(
     
     service = VehicleService(db)
     vehicle = await service.create_vehicle(vehicle_data)
-    return VehicleResponse.model_validate(vehicle)
+    return PydanticResponse(VehicleResponse.model_validate(vehicle), status_code=201)
 
 
 @router.get("/", response_model=VehicleListResponse)
@@ -48,11 +65,18 @@ async def list_vehicles(
     frota: Optional[str] = Query(None, description="Filtrar por frota"),
     manutencao_vencida: Optional[bool] = Query(None, description="Filtrar por manutenção vencida"),
     search: Optional[str] = Query(None, description="Buscar por placa, modelo ou marca"),
-    db: AsyncSession = Depends(get_db_session),
+    fields: Optional[str] = Query(None, description="Campos da resposta, separados por vírgula (ex.: placa,km_atual)"),
+    expand: Optional[str] = Query(None, description="Relacionamentos incluídos na resposta: usuario, manutencoes"),
+    db: AsyncSession = Depends(get_read_db_session),
     current_user: User = Depends(get_current_active_user)
-) -> VehicleListResponse:
-    """Listar veículos - usuários veem apenas seus veículos, admins veem todos"""
+) -> PydanticResponse:
+    """
+    Listar veículos - usuários veem apenas seus veículos, admins veem todos.
+    Com ?fields=, só os campos pedidos são lidos do banco; com ?expand=,
+    os relacionamentos vêm junto (uma consulta por relacionamento).
+    """
     service = VehicleService(db)
+    projecao = projection(VehicleResponse, fields, expand, VEHICLE_EXPANSIONS)
     
     # Usuários não-admin só veem seus próprios veículos
     id_usuario = None if current_user.type == UserType.ADM else current_user.id
@@ -64,7 +88,8 @@ async def list_vehicles(
         tipo=tipo,
         frota=frota,
         manutencao_vencida=manutencao_vencida,
-        search=search
+        search=search,
+        opcoes=projecao.options(Vehicle)
     )
     
     total = await service.count_vehicles(
@@ -75,19 +100,27 @@ async def list_vehicles(
         search=search
     )
     
-    return VehicleListResponse(
+    if projecao.schema is not None:
+        return PydanticResponse({
+            "vehicles": projecao.validate(vehicles),
+            "total": total,
+            "page": (skip // limit) + 1,
+            "per_page": limit
+        })
+
+    return PydanticResponse(VehicleListResponse(
         vehicles=[VehicleResponse.model_validate(vehicle) for vehicle in vehicles],
         total=total,
         page=(skip // limit) + 1,
         per_page=limit
-    )
+    ))
 
 
 @router.get("/manutencao-vencida", response_model=list[VehicleResponse])
 async def list_vehicles_manutencao_vencida(
-    db: AsyncSession = Depends(get_db_session),
+    db: AsyncSession = Depends(get_read_db_session),
     current_user: User = Depends(get_current_active_user)
-) -> list[VehicleResponse]:
+) -> PydanticResponse:
     """Listar veículos com manutenção vencida"""
     service = VehicleService(db)
     
@@ -95,26 +128,44 @@ async def list_vehicles_manutencao_vencida(
     id_usuario = None if current_user.type == UserType.ADM else current_user.id
     
     vehicles = await service.get_vehicles_manutencao_vencida(id_usuario)
-    return [VehicleResponse.model_validate(vehicle) for vehicle in vehicles]
+    return PydanticResponse([VehicleResponse.model_validate(vehicle) for vehicle in vehicles])
 
 
-@router.get("/{vehicle_id}", response_model=VehicleResponse)
-async def get_vehicle(
-    vehicle_id: UUID,
+@router.post("/manutencao-vencida/recalcular")
+async def recalcular_manutencao_vencida(
     db: AsyncSession = Depends(get_db_session),
-    current_user: User = Depends(get_current_active_user)
-) -> VehicleResponse:
-    """Buscar veículo por ID"""
+    current_user: User = Depends(get_current_admin_user)
+) -> dict:
+    """Recalcular próxima manutenção e manutenção vencida da frota inteira - apenas admin"""
     service = VehicleService(db)
-    vehicle = await service.get_vehicle_by_id(vehicle_id)
-    
-    # Verificar permissão
-    if not check_vehicle_ownership(current_user, vehicle.id_usuario):
-        raise ValidationError.unauthorized_operation(
-            "Usuário não tem permissão para visualizar este veículo"
-        )
-    
-    return VehicleResponse.model_validate(vehicle)
+    return await service.recompute_maintenance()
+
+
+@router.get("/batch", response_model=VehicleBatchResponse)
+async def get_vehicles_batch(
+    ids: list[UUID] = Query(..., description="IDs dos veículos (repita o parâmetro: ?ids=...&ids=...)"),
+    db: AsyncSession = Depends(get_read_db_session),
+    current_user: User = Depends(get_current_active_user)
+) -> PydanticResponse:
+    """
+    Buscar vários veículos por ID em uma consulta, na ordem pedida.
+    IDs inexistentes ou de veículos de outro usuário vêm em missing.
+    """
+    id_usuario = None if current_user.type == UserType.ADM else current_user.id
+    vehicles, missing = await VehicleService(db).get_vehicles_by_ids(ids, id_usuario)
+
+    return PydanticResponse(VehicleBatchResponse(
+        vehicles=[VehicleResponse.model_validate(vehicle) for vehicle in vehicles],
+        missing=missing
+    ))
+
+
+@router.get("/{vehicle_id}", response_model=VehicleResponse)
+async def get_vehicle(
+    vehicle: Vehicle = Depends(get_owned_vehicle)
+) -> PydanticResponse:
+    """Buscar veículo por ID - apenas dono ou admin"""
+    return PydanticResponse(VehicleResponse.model_validate(vehicle))
 
 
 @router.get("/placa/{placa}", response_model=VehicleResponse)
@@ -122,7 +173,7 @@ async def get_vehicle_by_placa(
     placa: str,
     db: AsyncSession = Depends(get_db_session),
     current_user: User = Depends(get_current_active_user)
-) -> VehicleResponse:
+) -> PydanticResponse:
     """Buscar veículo por placa"""
     service = VehicleService(db)
     vehicle = await service.get_vehicle_by_placa(placa)
@@ -133,47 +184,29 @@ async def get_vehicle_by_placa(
             "Usuário não tem permissão para visualizar este veículo"
         )
     
-    return VehicleResponse.model_validate(vehicle)
+    return PydanticResponse(VehicleResponse.model_validate(vehicle))
 
 
 @router.patch("/{vehicle_id}", response_model=VehicleResponse)
 async def update_vehicle(
-    vehicle_id: UUID,
     vehicle_data: VehicleUpdate,
-    db: AsyncSession = Depends(get_db_session),
-    current_user: User = Depends(get_current_active_user)
-) -> VehicleResponse:
+    vehicle: Vehicle = Depends(get_owned_vehicle),
+    db: AsyncSession = Depends(get_db_session)
+) -> PydanticResponse:
     """Atualizar veículo - apenas dono ou admin"""
     service = VehicleService(db)
-    vehicle = await service.get_vehicle_by_id(vehicle_id)
-    
-    # Verificar permissão
-    if not check_vehicle_ownership(current_user, vehicle.id_usuario):
-        raise ValidationError.unauthorized_operation(
-            "Usuário não tem permissão para editar este veículo"
-        )
-    
-    updated_vehicle = await service.update_vehicle(vehicle_id, vehicle_data)
-    return VehicleResponse.model_validate(updated_vehicle)
+    updated_vehicle = await service.update_vehicle(vehicle, vehicle_data)
+    return PydanticResponse(VehicleResponse.model_validate(updated_vehicle))
 
 
 @router.delete("/{vehicle_id}", status_code=204)
 async def delete_vehicle(
-    vehicle_id: UUID,
-    db: AsyncSession = Depends(get_db_session),
-    current_user: User = Depends(get_current_active_user)
+    vehicle: Vehicle = Depends(get_owned_vehicle),
+    db: AsyncSession = Depends(get_db_session)
 ):
     """Deletar veículo - apenas dono ou admin"""
     service = VehicleService(db)
-    vehicle = await service.get_vehicle_by_id(vehicle_id)
-    
-    # Verificar permissão
-    if not check_vehicle_ownership(current_user, vehicle.id_usuario):
-        raise ValidationError.unauthorized_operation(
-            "Usuário não tem permissão para deletar este veículo"
-        )
-    
-    await service.delete_vehicle(vehicle_id)
+    await service.delete_vehicle(vehicle)
     return None
 
 
@@ -183,19 +216,15 @@ async def update_vehicle_km(
     km_atual: int = Query(..., ge=0, description="Quilometragem atual"),
     db: AsyncSession = Depends(get_db_session),
     current_user: User = Depends(get_current_active_user)
-) -> VehicleResponse:
+) -> PydanticResponse:
     """Atualizar quilometragem do veículo - apenas dono ou admin"""
     service = VehicleService(db)
-    vehicle = await service.get_vehicle_by_id(vehicle_id)
     
-    # Verificar permissão
-    if not check_vehicle_ownership(current_user, vehicle.id_usuario):
-        raise ValidationError.unauthorized_operation(
-            "Usuário não tem permissão para atualizar este veículo"
-        )
+    # Permissão vai no próprio UPDATE: não-admin só altera veículo seu
+    id_usuario = None if current_user.type == UserType.ADM else current_user.id
     
-    updated_vehicle = await service.update_km(vehicle_id, km_atual)
-    return VehicleResponse.model_validate(updated_vehicle)
+    updated_vehicle = await service.update_km(vehicle_id, km_atual, id_usuario=id_usuario)
+    return PydanticResponse(VehicleResponse.model_validate(updated_vehicle))
 
 
 @router.post("/{vehicle_id}/manutencao", response_model=VehicleResponse)
@@ -203,16 +232,12 @@ async def registrar_manutencao(
     vehicle_id: UUID,
     db: AsyncSession = Depends(get_db_session),
     current_user: User = Depends(get_current_active_user)
-) -> VehicleResponse:
+) -> PydanticResponse:
     """Registrar que a manutenção foi realizada - apenas dono ou admin"""
     service = VehicleService(db)
-    vehicle = await service.get_vehicle_by_id(vehicle_id)
     
-    # Verificar permissão
-    if not check_vehicle_ownership(current_user, vehicle.id_usuario):
-        raise ValidationError.unauthorized_operation(
-            "Usuário não tem permissão para registrar manutenção deste veículo"
-        )
+    # Permissão vai no próprio UPDATE: não-admin só altera veículo seu
+    id_usuario = None if current_user.type == UserType.ADM else current_user.id
     
-    updated_vehicle = await service.registrar_manutencao(vehicle_id)
-    return VehicleResponse.model_validate(updated_vehicle)
+    updated_vehicle = await service.registrar_manutencao(vehicle_id, id_usuario=id_usuario)
+    return PydanticResponse(VehicleResponse.model_validate(updated_vehicle))
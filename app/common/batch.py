@@ -0,0 +1,31 @@
+from typing import Any, Callable, Iterable, Sequence, TypeVar
+from uuid import UUID
+
+from app.core.config import settings
+from app.common.exceptions.validation_exceptions import ValidationError
+
+T = TypeVar("T")
+
+
+def parse_ids(ids: Sequence[UUID]) -> list[UUID]:
+    """ids da busca em lote, sem repetidos (na ordem pedida), até BATCH_MAX_IDS"""
+    unicos = list(dict.fromkeys(ids))
+    if len(unicos) > settings.BATCH_MAX_IDS:
+        raise ValidationError.invalid_field(
+            "ids",
+            f"No máximo {settings.BATCH_MAX_IDS} ids por requisição"
+        )
+    return unicos
+
+
+def in_request_order(
+    ids: Sequence[UUID],
+    registros: Iterable[T],
+    chave: Callable[[T], Any] = lambda registro: registro.id
+) -> tuple[list[T], list[UUID]]:
+    """Registros na ordem de `ids` e os ids sem registro (inexistentes ou sem permissão)"""
+    por_id = {chave(registro): registro for registro in registros}
+    return (
+        [por_id[id_] for id_ in ids if id_ in por_id],
+        [id_ for id_ in ids if id_ not in por_id]
+    )
@@ -8,6 +8,9 @@ from .base_exceptions import (
     FrontnixException,
     EntityNotFoundError,
     EntityAlreadyExistsError,
+    ResourceLockedError,
+    IdempotencyKeyInUseError,
+    IdempotencyKeyMismatchError,
     DatabaseError
 )
 
@@ -57,6 +60,9 @@ __all__ = [
     "FrontnixException",
     "EntityNotFoundError",
     "EntityAlreadyExistsError",
+    "ResourceLockedError",
+    "IdempotencyKeyInUseError",
+    "IdempotencyKeyMismatchError",
     "DatabaseError",
     
     # Validation
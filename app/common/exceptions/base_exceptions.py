@@ -49,6 +49,45 @@ class EntityAlreadyExistsError(FrontnixException):
         )
 
 
+class ResourceLockedError(FrontnixException):
+    """Exceção para recurso travado por outra operação (tempo de espera esgotado)"""
+    def __init__(self, entity_name: str, identifier_value: Any, identifier_name: str = "ID"):
+        message = (
+            f"{entity_name} com {identifier_name} '{identifier_value}' está em uso por outra operação; "
+            f"tente novamente"
+        )
+
+        super().__init__(
+            message=message,
+            code="RESOURCE_LOCKED",
+            context={
+                "entity_name": entity_name,
+                "identifier_name": identifier_name,
+                "identifier_value": str(identifier_value)
+            }
+        )
+
+
+class IdempotencyKeyInUseError(FrontnixException):
+    """Exceção para Idempotency-Key cuja requisição original ainda está em andamento"""
+    def __init__(self, chave: str):
+        super().__init__(
+            message=f"Requisição com Idempotency-Key '{chave}' ainda em processamento; tente novamente",
+            code="IDEMPOTENCY_KEY_IN_USE",
+            context={"idempotency_key": chave}
+        )
+
+
+class IdempotencyKeyMismatchError(FrontnixException):
+    """Exceção para Idempotency-Key reutilizada com outra requisição"""
+    def __init__(self, chave: str):
+        super().__init__(
+            message=f"Idempotency-Key '{chave}' já foi usada com outra requisição",
+            code="IDEMPOTENCY_KEY_MISMATCH",
+            context={"idempotency_key": chave}
+        )
+
+
 class DatabaseError(FrontnixException):
     """Exceção para erros de banco de dados"""
     def __init__(self, message: str = "Erro no banco de dados", operation: Optional[str] = None):
@@ -10,6 +10,9 @@ from typing import Union
 EXCEPTION_HTTP_STATUS_MAP = {
     "ENTITY_NOT_FOUND": HTTPStatus.NOT_FOUND,
     "ENTITY_ALREADY_EXISTS": HTTPStatus.CONFLICT,
+    "RESOURCE_LOCKED": HTTPStatus.CONFLICT,
+    "IDEMPOTENCY_KEY_IN_USE": HTTPStatus.CONFLICT,
+    "IDEMPOTENCY_KEY_MISMATCH": HTTPStatus.UNPROCESSABLE_ENTITY,
     "DATABASE_ERROR": HTTPStatus.INTERNAL_SERVER_ERROR,
     "VALIDATION_ERROR": HTTPStatus.UNPROCESSABLE_ENTITY,
     "BUSINESS_RULE_ERROR": HTTPStatus.BAD_REQUEST,
@@ -28,6 +28,11 @@ class ValidationError(Exception):
     def required_field(cls, field: str) -> 'ValidationError':
         """Factory method para campo obrigatório"""
         return cls(message=f"Campo '{field}' é obrigatório", field=field)
+    
+    @classmethod
+    def unauthorized_operation(cls, message: str) -> 'ValidationError':
+        """Factory method para operação não permitida ao usuário"""
+        return cls(message=message)
 
 
 class BusinessRuleError(Exception):
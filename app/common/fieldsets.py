@@ -0,0 +1,92 @@
+from functools import lru_cache
+from typing import Any, Iterable, NamedTuple, Optional
+
+from pydantic import BaseModel, ConfigDict, create_model
+from sqlalchemy.orm import load_only, selectinload
+
+from app.common.exceptions.validation_exceptions import ValidationError
+
+
+class Projecao(NamedTuple):
+    """
+    ?fields= e ?expand= de uma listagem: colunas lidas do banco (load_only),
+    relacionamentos carregados em lote (selectinload) e o schema parcial
+    usado na resposta. Sem nenhum dos dois, schema é None e a listagem
+    segue com o schema completo.
+    """
+    campos: Optional[tuple[str, ...]]  # None = todos os campos do schema
+    expand: tuple[tuple[str, Any], ...]  # (relacionamento, tipo na resposta)
+    schema: Optional[type[BaseModel]]
+
+    def options(self, model) -> list:
+        """Opções de carregamento do select (vazio = comportamento padrão)"""
+        opcoes = []
+        if self.campos is not None:
+            chaves = dict.fromkeys(self.campos)
+            for nome, _ in self.expand:
+                # many-to-one precisa da FK carregada para o selectinload
+                chaves.update(dict.fromkeys(
+                    model.__mapper__.get_property_by_column(coluna).key
+                    for coluna in getattr(model, nome).property.local_columns
+                ))
+            opcoes.append(load_only(*(getattr(model, chave) for chave in chaves)))
+        opcoes.extend(selectinload(getattr(model, nome)) for nome, _ in self.expand)
+        return opcoes
+
+    def validate(self, objetos: Iterable[Any]) -> list[BaseModel]:
+        """Objetos ORM no schema parcial (para PydanticResponse)"""
+        return [self.schema.model_validate(objeto) for objeto in objetos]
+
+
+@lru_cache(maxsize=None)
+def _partial_schema(schema: type[BaseModel], campos: tuple[str, ...], expand: tuple[tuple[str, Any], ...]):
+    """Schema só com `campos` (mesmas validações e serialização) + relacionamentos expandidos"""
+    definicoes = {campo: (schema.model_fields[campo].annotation, schema.model_fields[campo]) for campo in campos}
+    definicoes.update({nome: (tipo, ...) for nome, tipo in expand})
+    return create_model(f"{schema.__name__}Parcial", __config__=ConfigDict(from_attributes=True), **definicoes)
+
+
+def _split(valor: Optional[str]) -> list[str]:
+    return [item.strip() for item in (valor or "").split(",") if item.strip()]
+
+
+def projection(
+    schema: type[BaseModel],
+    fields: Optional[str],
+    expand: Optional[str],
+    expansoes: dict[str, Any]
+) -> Projecao:
+    """
+    Interpreta ?fields=placa,km_atual e ?expand=usuario. fields aceita os
+    campos do schema (id vem sempre); expand, as chaves de `expansoes`
+    (relacionamento -> tipo na resposta).
+    """
+    pedidos = set(_split(fields))
+    desconhecidos = pedidos - schema.model_fields.keys()
+    if desconhecidos:
+        raise ValidationError.invalid_field(
+            "fields",
+            f"Campos desconhecidos: {', '.join(sorted(desconhecidos))}"
+        )
+
+    relacionamentos = set(_split(expand))
+    desconhecidos = relacionamentos - expansoes.keys()
+    if desconhecidos:
+        raise ValidationError.invalid_field(
+            "expand",
+            f"Relacionamentos desconhecidos: {', '.join(sorted(desconhecidos))}. "
+            f"Disponíveis: {', '.join(expansoes)}"
+        )
+
+    # Ordem do schema, não a do pedido: o schema parcial é reaproveitado (cache)
+    campos = tuple(campo for campo in schema.model_fields if campo in pedidos | {"id"}) if pedidos else None
+    expandir = tuple((nome, tipo) for nome, tipo in expansoes.items() if nome in relacionamentos)
+
+    if campos is None and not expandir:
+        return Projecao(None, (), None)
+
+    return Projecao(
+        campos,
+        expandir,
+        _partial_schema(schema, campos or tuple(schema.model_fields), expandir)
+    )
@@ -0,0 +1,28 @@
+from typing import Any
+
+import pydantic_core
+from fastapi.responses import Response
+
+
+class PydanticResponse(Response):
+    """
+    Resposta JSON de modelos Pydantic já validados (ou dicts/listas deles).
+
+    Com response_model=, o FastAPI valida de novo o que a rota devolve e só
+    então serializa: a rota que já montou o modelo paga a validação duas
+    vezes. Uma Response devolvida pela rota sai como está, e aqui o
+    pydantic-core serializa os modelos direto para bytes, no mesmo JSON do
+    caminho padrão. O response_model da rota continua documentando (OpenAPI).
+
+    Quem monta o conteúdo é responsável pela validação: use model_validate
+    (ou o construtor do schema), nunca dicts soltos. Só vale para rotas que
+    já têm os modelos prontos: rotas que devolvem dicts (ex.: alertas, da
+    projeção) ficam no caminho padrão, validadas uma vez pelo response_model.
+    O ganho é nas versões do FastAPI sem o caminho rápido dump_json
+    (anteriores à 0.130, aceitas pelo pyproject); da 0.130 em diante, as
+    duas formas empatam (benchmarks/bench_json_response.py).
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return pydantic_core.to_json(content)
@@ -20,6 +20,41 @@ class Settings(BaseSettings):
     PUBSUB_SUBSCRIPTION: str = "pi-smarttruck-sub"
     GOOGLE_APPLICATION_CREDENTIALS: Optional[str] = None 
     
+    # Armazenamento dos modelos de IA ("filesystem" ou "postgres")
+    MODEL_STORE_BACKEND: str = "filesystem"
+    MODEL_STORE_PATH: str = "/app/models/modelos_frota/"
+    # URL síncrona (psycopg) para o backend postgres; se vazia, deriva de DATABASE_URL
+    MODEL_STORE_DATABASE_URL: Optional[str] = None
+    MODEL_STORE_CACHE_TTL_SECONDS: float = 30.0
+
+    # Espera máxima pelo lock da placa (abastecimentos concorrentes); 0 = sem limite
+    PLACA_LOCK_TIMEOUT_MS: int = 5000
+
+    # Réplicas de leitura (URLs separadas por vírgula); vazio = tudo no primário
+    DATABASE_REPLICA_URLS: str = ""
+    # Réplica mais atrasada que isso não recebe leituras (vão para o primário)
+    REPLICA_MAX_LAG_SECONDS: float = 5.0
+    # Intervalo entre as verificações de atraso de cada réplica
+    REPLICA_CHECK_INTERVAL_SECONDS: float = 5.0
+    
+    # Idempotency-Key (POST de abastecimentos e manutenções): validade da
+    # chave no banco e da cópia da resposta em memória de cada processo
+    IDEMPOTENCY_KEY_TTL_HOURS: int = 24
+    # Reserva sem resposta há mais tempo que isso é considerada abandonada
+    IDEMPOTENCY_IN_PROGRESS_TIMEOUT_SECONDS: float = 120.0
+    IDEMPOTENCY_CACHE_TTL_SECONDS: float = 300.0
+    IDEMPOTENCY_CACHE_MAX_ENTRIES: int = 10000
+
+    # Sincronização incremental (/sync): exclusões guardadas por esse tempo;
+    # cursor mais antigo recebe tudo de novo
+    SYNC_TOMBSTONE_RETENTION_DAYS: int = 30
+
+    # Máximo de ids por busca em lote (GET /vehicles/batch, /refuels/batch, /alerts/batch)
+    BATCH_MAX_IDS: int = 100
+
+    # Snapshots Parquet dos abastecimentos (uma pasta por mês) para análises
+    ANALYTICS_PATH: str = "/app/analytics/abastecimentos/"
+    
     # CORS Configuration
     CORS_ORIGINS: str = "http://localhost:8081,http://localhost:3000,http://localhost:3030,https://frotinix.eastus2.cloudapp.azure.com,https://frotinix.vercel.app,exp://192.168.100.10:8081,http://localhost:8081"
 
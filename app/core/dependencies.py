@@ -8,9 +8,11 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.integrations.db.client import get_db_session
 from app.core.security import decode_access_token
 from app.services.user_service import UserService
+from app.services.vehicle_service import VehicleService
 from app.models.user import User
+from app.models.vehicle import Vehicle
 from app.schemas.enums import UserType
-from app.common.exceptions import UserNotFoundError
+from app.common.exceptions import UserNotFoundError, ValidationError
 
 
 # HTTPBearer scheme - apenas token JWT no header Authorization
@@ -89,3 +91,23 @@ async def get_current_admin_user(
         )
     
     return current_user
+
+
+async def get_owned_vehicle(
+    vehicle_id: UUID,
+    db: AsyncSession = Depends(get_db_session),
+    current_user: User = Depends(get_current_active_user)
+) -> Vehicle:
+    """
+    Dependency que carrega o veículo do path e garante que o usuário é
+    dono dele ou admin. O veículo fica no mapa de identidade da sessão
+    da requisição; services recebem a entidade já carregada.
+    """
+    vehicle = await VehicleService(db).get_vehicle_by_id(vehicle_id)
+    
+    if current_user.type != UserType.ADM and str(vehicle.id_usuario) != str(current_user.id):
+        raise ValidationError.unauthorized_operation(
+            "Usuário não tem permissão para acessar este veículo"
+        )
+    
+    return vehicle
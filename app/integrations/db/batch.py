@@ -0,0 +1,17 @@
+"""
+Busca de várias linhas por id em uma única consulta.
+"""
+from typing import Sequence
+from uuid import UUID
+
+from sqlalchemy import any_, literal
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID
+
+
+def id_in(coluna, ids: Sequence[UUID]):
+    """
+    coluna = ANY(:ids) com um único parâmetro array: o SQL é o mesmo para
+    qualquer quantidade de ids (um prepared statement só no asyncpg), ao
+    contrário de IN (:id_1, :id_2, ...).
+    """
+    return coluna == any_(literal(list(ids), ARRAY(PG_UUID(as_uuid=True))))
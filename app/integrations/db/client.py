@@ -1,7 +1,9 @@
 import asyncio
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
 from app.core.config import settings
+from app.integrations.db.replicas import get_replica_router
 
 
 engine = create_async_engine(
@@ -24,6 +26,23 @@ async def get_db_session() -> AsyncSession:
         yield session
 
 
+#Sessão para leituras que toleram atraso de réplica (listagens, dashboard, exportações).
+#Escritas e leituras do que acabou de ser gravado usam get_db_session (primário).
+async def get_read_db_session() -> AsyncSession:
+    replica = await get_replica_router().choose(engine)
+
+    # Sem réplica disponível (ou configurada): primário
+    bind = replica.engine if replica is not None else engine
+
+    async with AsyncSessionFactory(bind=bind) as session:
+        try:
+            yield session
+        except DBAPIError as e:
+            if replica is not None and e.connection_invalidated:
+                replica.mark_unavailable()
+            raise
+
+
 async def main():
     print("Conectando ao banco de dados...")
     try:
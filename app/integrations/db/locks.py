@@ -0,0 +1,56 @@
+"""
+Locks consultivos (advisory locks) do PostgreSQL para serializar
+operações por placa entre workers e containers.
+"""
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.common.exceptions import ResourceLockedError
+
+
+# Namespace (primeira chave do lock) para não colidir com outros usos
+LOCK_NAMESPACE_PLACA = 1
+
+# SQLSTATE lock_not_available (lock_timeout estourado)
+LOCK_NOT_AVAILABLE = "55P03"
+
+# O limite vale só para a espera do lock: um comando por passo (a ordem de
+# avaliação de funções dentro de um mesmo SELECT não é garantida)
+CURRENT_LOCK_TIMEOUT_SQL = "SELECT current_setting('lock_timeout')"
+
+SET_LOCK_TIMEOUT_SQL = "SELECT set_config('lock_timeout', :timeout, true)"
+
+LOCK_PLACA_SQL = "SELECT pg_advisory_xact_lock(:namespace, hashtext(:placa))"
+
+
+async def lock_placa(db: AsyncSession, placa: str, timeout_ms: Optional[int] = None) -> None:
+    """
+    Bloqueia a placa até o fim da transação atual (commit/rollback).
+    Requisições para outras placas não são afetadas.
+
+    Espera no máximo timeout_ms (padrão: PLACA_LOCK_TIMEOUT_MS) e então
+    lança ResourceLockedError; a transação fica abortada e precisa de rollback.
+    """
+    if timeout_ms is None:
+        timeout_ms = settings.PLACA_LOCK_TIMEOUT_MS
+
+    result = await db.execute(text(CURRENT_LOCK_TIMEOUT_SQL))
+    anterior = result.scalar_one()
+    await db.execute(text(SET_LOCK_TIMEOUT_SQL), {"timeout": str(int(timeout_ms))})
+
+    try:
+        await db.execute(
+            text(LOCK_PLACA_SQL),
+            {"namespace": LOCK_NAMESPACE_PLACA, "placa": placa}
+        )
+    except DBAPIError as e:
+        if getattr(e.orig, "sqlstate", None) == LOCK_NOT_AVAILABLE:
+            raise ResourceLockedError("Veículo", placa, "placa") from e
+        raise
+
+    # O limite não vale para o resto da transação
+    await db.execute(text(SET_LOCK_TIMEOUT_SQL), {"timeout": anterior})
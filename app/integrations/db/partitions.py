@@ -0,0 +1,221 @@
+"""
+Particionamento mensal (RANGE em data) da tabela refuel.
+
+Cada mês é uma partição refuel_AAAA_MM; refuel_default recebe o que cair
+fora delas (datas antigas ou muito no futuro), para nenhum INSERT falhar.
+Consultas com filtro em data (listagens, dashboard, exportações) só leem
+as partições do período (partition pruning).
+
+As funções recebem uma AsyncConnection já dentro de transação
+(engine.begin()) e não fazem commit.
+"""
+from datetime import date
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.models.refuel import Refuel
+
+TABELA = "refuel"
+PARTICAO_PADRAO = "refuel_default"
+
+# Meses à frente criados por ensure_partitions (rodar o job antes de acabarem)
+MESES_FUTUROS = 3
+
+
+def inicio_mes(dia: date) -> date:
+    return dia.replace(day=1)
+
+
+def somar_meses(mes: date, meses: int) -> date:
+    total = mes.year * 12 + (mes.month - 1) + meses
+    return date(total // 12, total % 12 + 1, 1)
+
+
+def nome_particao(mes: date) -> str:
+    return f"{TABELA}_{mes:%Y_%m}"
+
+
+async def is_partitioned(conn: AsyncConnection) -> bool:
+    """True se refuel já é uma tabela particionada"""
+    relkind = await conn.scalar(
+        text("SELECT relkind::text FROM pg_class WHERE oid = to_regclass(:tabela)"),
+        {"tabela": TABELA}
+    )
+    return relkind == "p"
+
+
+async def list_partitions(conn: AsyncConnection) -> list[tuple[str, str]]:
+    """(nome, limites) das partições de refuel, em ordem de nome"""
+    result = await conn.execute(
+        text(
+            "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) "
+            "FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass(:tabela) "
+            "ORDER BY c.relname"
+        ),
+        {"tabela": TABELA}
+    )
+    return [(nome, limites) for nome, limites in result.all()]
+
+
+async def create_partitions(conn: AsyncConnection, meses: list[date]) -> tuple[list[str], list[str]]:
+    """
+    Cria as partições mensais que faltam (e a partição padrão).
+    Um mês que já tem linhas na partição padrão não pode ganhar partição
+    própria sem mover essas linhas: fica de fora e é devolvido em ignorados.
+    Retorna (criadas, ignoradas).
+    """
+    existentes = {nome for nome, _ in await list_partitions(conn)}
+
+    if PARTICAO_PADRAO not in existentes:
+        await conn.execute(text(f"CREATE TABLE {PARTICAO_PADRAO} PARTITION OF {TABELA} DEFAULT"))
+
+    criadas, ignoradas = [], []
+    for mes in sorted({inicio_mes(m) for m in meses}):
+        nome = nome_particao(mes)
+        if nome in existentes:
+            continue
+
+        fim = somar_meses(mes, 1)
+        ocupado = await conn.scalar(
+            text(f"SELECT EXISTS (SELECT 1 FROM {PARTICAO_PADRAO} WHERE data >= :inicio AND data < :fim)"),
+            {"inicio": mes, "fim": fim}
+        )
+        if ocupado:
+            ignoradas.append(nome)
+            continue
+
+        await conn.execute(
+            text(
+                f"CREATE TABLE {nome} PARTITION OF {TABELA} "
+                f"FOR VALUES FROM ('{mes.isoformat()}') TO ('{fim.isoformat()}')"
+            )
+        )
+        criadas.append(nome)
+
+    return criadas, ignoradas
+
+
+async def ensure_partitions(
+    conn: AsyncConnection,
+    meses_futuros: int = MESES_FUTUROS,
+    desde: Optional[date] = None
+) -> tuple[list[str], list[str]]:
+    """Garante as partições de `desde` (padrão: mês atual) até meses_futuros à frente"""
+    atual = inicio_mes(date.today())
+    inicio = inicio_mes(desde) if desde else atual
+
+    meses = []
+    mes = inicio
+    while mes <= somar_meses(atual, meses_futuros):
+        meses.append(mes)
+        mes = somar_meses(mes, 1)
+
+    return await create_partitions(conn, meses)
+
+
+async def detach_partitions(
+    conn: AsyncConnection,
+    antes: date,
+    remover: bool = False
+) -> tuple[list[str], list[tuple[str, str]]]:
+    """
+    Desanexa as partições mensais anteriores ao mês de `antes`. A partição
+    desanexada vira uma tabela comum (arquivo), fora das consultas em
+    refuel; com remover=True é apagada.
+
+    Partições com alertas apontando para seus abastecimentos não podem sair
+    (FK de alerts): ficam e voltam em falhas com o motivo.
+    Retorna (desanexadas, falhas).
+    """
+    limite = nome_particao(inicio_mes(antes))
+
+    desanexadas, falhas = [], []
+    for nome, _ in await list_partitions(conn):
+        if nome == PARTICAO_PADRAO or nome >= limite:
+            continue
+
+        try:
+            # Savepoint: uma falha não desfaz as partições já desanexadas
+            async with conn.begin_nested():
+                await conn.execute(text(f"ALTER TABLE {TABELA} DETACH PARTITION {nome}"))
+                if remover:
+                    await conn.execute(text(f"DROP TABLE {nome}"))
+        except DBAPIError as e:
+            falhas.append((nome, str(e.orig).splitlines()[0]))
+            continue
+
+        desanexadas.append(nome)
+
+    return desanexadas, falhas
+
+
+async def convert_to_partitioned(conn: AsyncConnection, meses_futuros: int = MESES_FUTUROS) -> int:
+    """
+    Converte uma refuel comum em particionada, em uma única transação:
+    renomeia a tabela atual, cria a nova a partir do modelo (PK (id, data)),
+    cria as partições dos meses com dados, copia as linhas e refaz a FK de
+    alerts como (id_abastecimento, data_abastecimento).
+    A tabela fica bloqueada durante a cópia. Retorna as linhas copiadas.
+    """
+    if await is_partitioned(conn):
+        return 0
+
+    await conn.execute(text(f"LOCK TABLE {TABELA} IN ACCESS EXCLUSIVE MODE"))
+
+    # Alertas passam a guardar a data do abastecimento (parte da nova chave)
+    await conn.execute(text("ALTER TABLE alerts ADD COLUMN IF NOT EXISTS data_abastecimento DATE"))
+    await conn.execute(
+        text(
+            "UPDATE alerts a SET data_abastecimento = r.data "
+            f"FROM {TABELA} r WHERE r.id = a.id_abastecimento "
+            "AND a.data_abastecimento IS DISTINCT FROM r.data"
+        )
+    )
+    await conn.execute(text("ALTER TABLE alerts ALTER COLUMN data_abastecimento SET NOT NULL"))
+    await conn.execute(text("ALTER TABLE alerts DROP CONSTRAINT IF EXISTS alerts_id_abastecimento_fkey"))
+
+    # Tabela antiga sai do caminho (índices têm nome global no schema)
+    await conn.execute(text(f"ALTER TABLE {TABELA} RENAME TO {TABELA}_legado"))
+    indices = await conn.execute(
+        text("SELECT indexname FROM pg_indexes WHERE schemaname = current_schema() AND tablename = :tabela"),
+        {"tabela": f"{TABELA}_legado"}
+    )
+    for (indice,) in indices.all():
+        await conn.execute(
+            text(f'ALTER INDEX "{indice}" RENAME TO "{indice.replace(TABELA, f"{TABELA}_legado", 1)}"')
+        )
+    # FKs também, para as da tabela nova ficarem com os nomes padrão
+    fks = await conn.execute(
+        text("SELECT conname FROM pg_constraint WHERE conrelid = to_regclass(:tabela) AND contype = 'f'"),
+        {"tabela": f"{TABELA}_legado"}
+    )
+    for (fk,) in fks.all():
+        await conn.execute(text(f'ALTER TABLE {TABELA}_legado RENAME CONSTRAINT "{fk}" TO "{fk}_legado"'))
+
+    await conn.run_sync(Refuel.__table__.create)
+
+    meses = await conn.execute(text(f"SELECT DISTINCT date_trunc('month', data)::date FROM {TABELA}_legado"))
+    await create_partitions(conn, list(meses.scalars().all()))
+    await ensure_partitions(conn, meses_futuros)
+
+    # valor_total é coluna gerada: recalculada pelo banco
+    colunas = ", ".join(c.name for c in Refuel.__table__.c if c.computed is None)
+    copiadas = await conn.execute(
+        text(f"INSERT INTO {TABELA} ({colunas}) SELECT {colunas} FROM {TABELA}_legado")
+    )
+
+    await conn.execute(
+        text(
+            "ALTER TABLE alerts ADD CONSTRAINT alerts_abastecimento_fkey "
+            f"FOREIGN KEY (id_abastecimento, data_abastecimento) REFERENCES {TABELA} (id, data) "
+            "ON UPDATE CASCADE"
+        )
+    )
+    await conn.execute(text(f"DROP TABLE {TABELA}_legado"))
+    await conn.execute(text(f"ANALYZE {TABELA}"))
+
+    return copiadas.rowcount
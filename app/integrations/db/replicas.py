@@ -0,0 +1,160 @@
+"""
+Roteamento de leituras para réplicas do PostgreSQL.
+
+Leituras que toleram alguns segundos de atraso (listagens, dashboard,
+exportações) podem ir para uma réplica; escritas e fluxos que leem o que
+acabaram de gravar ficam no primário. Cada réplica tem o atraso medido a
+cada REPLICA_CHECK_INTERVAL_SECONDS contra a posição do WAL no primário:
+fora do ar ou mais atrasada que REPLICA_MAX_LAG_SECONDS, sai do rodízio até
+a próxima verificação boa.
+Sem réplica disponível, a leitura vai para o primário.
+"""
+import asyncio
+import itertools
+import logging
+import time
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Posição atual do WAL no primário, lida antes de medir as réplicas
+PRIMARY_LSN_SQL = "SELECT pg_current_wal_lsn()::text"
+
+# Atraso em segundos. Zero se a réplica já aplicou o WAL até a posição lida
+# no primário (comparar com o que ela mesma recebeu daria zero para sempre
+# com o receptor de WAL desconectado). Senão, com o receptor transmitindo e
+# tudo que chegou já aplicado, a réplica está em dia com o primário até o
+# envio da última mensagem recebida. Nos demais casos (desconectada ou
+# aplicando atrasada), a idade da última transação aplicada; NULL = nada
+# aplicado ainda: fora do rodízio.
+REPLICA_LAG_SQL = """
+SELECT CASE
+    WHEN NOT pg_is_in_recovery() THEN 0
+    WHEN pg_last_wal_replay_lsn() >= CAST(CAST(:lsn_primario AS text) AS pg_lsn) THEN 0
+    ELSE COALESCE(
+        (
+            SELECT GREATEST(EXTRACT(EPOCH FROM now() - last_msg_send_time), 0)
+            FROM pg_stat_wal_receiver
+            WHERE status = 'streaming'
+              AND pg_last_wal_replay_lsn() >= flushed_lsn
+        ),
+        EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    )
+END
+"""
+
+# Limite para a verificação não segurar a requisição com a réplica fora do ar
+CHECK_TIMEOUT_SECONDS = 2.0
+
+
+class Replica:
+    """Uma réplica: engine próprio e o resultado da última verificação"""
+
+    def __init__(self, url: str):
+        self.engine: AsyncEngine = create_async_engine(
+            url,
+            pool_size=10,
+            max_overflow=20
+        )
+        self.nome = self.engine.url.render_as_string(hide_password=True)
+        self.disponivel = False
+        self.atraso: Optional[float] = None
+        self.verificado_em = 0.0
+        self._lock = asyncio.Lock()
+
+    def due(self, intervalo: float) -> bool:
+        """Última verificação vencida e nenhuma em andamento"""
+        return time.monotonic() - self.verificado_em >= intervalo and not self._lock.locked()
+
+    async def refresh(self, intervalo: float, max_atraso: float, lsn_primario: Optional[str]) -> None:
+        """Mede o atraso se a última verificação venceu (uma por vez; as outras usam o resultado anterior)"""
+        if not self.due(intervalo):
+            return
+
+        async with self._lock:
+            try:
+                atraso = await asyncio.wait_for(self._measure(lsn_primario), CHECK_TIMEOUT_SECONDS)
+                self.atraso = float(atraso) if atraso is not None else None
+                disponivel = self.atraso is not None and self.atraso <= max_atraso
+            except Exception as e:
+                logger.warning("Réplica %s indisponível: %s", self.nome, e)
+                self.atraso = None
+                disponivel = False
+
+            if disponivel != self.disponivel:
+                logger.info("Réplica %s %s (atraso: %s)", self.nome, "no rodízio" if disponivel else "fora do rodízio", self.atraso)
+            self.disponivel = disponivel
+            self.verificado_em = time.monotonic()
+
+    async def _measure(self, lsn_primario: Optional[str]) -> Optional[float]:
+        # Sem a posição do primário: só o atraso pela última transação aplicada
+        async with self.engine.connect() as conn:
+            return await conn.scalar(text(REPLICA_LAG_SQL), {"lsn_primario": lsn_primario})
+
+    def mark_unavailable(self) -> None:
+        """Falha de conexão no meio de uma leitura: sai do rodízio até a próxima verificação"""
+        self.disponivel = False
+        self.verificado_em = time.monotonic()
+
+
+class ReplicaRouter:
+    """Escolhe a réplica de cada leitura (rodízio entre as disponíveis)"""
+
+    def __init__(self, urls: list[str], max_atraso: float, intervalo: float):
+        self.replicas = [Replica(url) for url in urls]
+        self.max_atraso = max_atraso
+        self.intervalo = intervalo
+        self._rodizio = itertools.count()
+
+    async def choose(self, primario: AsyncEngine) -> Optional[Replica]:
+        """Réplica para a próxima leitura, ou None para usar o primário"""
+        if not self.replicas:
+            return None
+
+        vencidas = [r for r in self.replicas if r.due(self.intervalo)]
+        if vencidas:
+            lsn_primario = await self._primary_lsn(primario)
+            await asyncio.gather(*(r.refresh(self.intervalo, self.max_atraso, lsn_primario) for r in vencidas))
+
+        disponiveis = [r for r in self.replicas if r.disponivel]
+        if not disponiveis:
+            return None
+        return disponiveis[next(self._rodizio) % len(disponiveis)]
+
+    @staticmethod
+    async def _primary_lsn(primario: AsyncEngine) -> Optional[str]:
+        """Posição do WAL no primário (None se a leitura falhar)"""
+        async def ler() -> str:
+            async with primario.connect() as conn:
+                return await conn.scalar(text(PRIMARY_LSN_SQL))
+
+        try:
+            return await asyncio.wait_for(ler(), CHECK_TIMEOUT_SECONDS)
+        except Exception as e:
+            logger.warning("Posição do WAL no primário indisponível: %s", e)
+            return None
+
+    async def dispose(self) -> None:
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+
+_replica_router: Optional[ReplicaRouter] = None
+
+
+def get_replica_router() -> ReplicaRouter:
+    """Retorna o roteador de réplicas (singleton, a partir de DATABASE_REPLICA_URLS)"""
+    global _replica_router
+    if _replica_router is None:
+        urls = [url.strip() for url in settings.DATABASE_REPLICA_URLS.split(",") if url.strip()]
+        _replica_router = ReplicaRouter(
+            urls,
+            max_atraso=settings.REPLICA_MAX_LAG_SECONDS,
+            intervalo=settings.REPLICA_CHECK_INTERVAL_SECONDS
+        )
+    return _replica_router
@@ -0,0 +1,39 @@
+"""
+Armazenamento plugável dos modelos de IA (disco local ou PostgreSQL)
+"""
+from app.core.config import settings
+
+from .base import ModelStore, ARTEFATOS
+from .filesystem import FileSystemModelStore
+
+
+# Singleton instance
+_model_store: ModelStore = None
+
+
+def _sync_database_url() -> str:
+    """URL síncrona (psycopg) equivalente à DATABASE_URL assíncrona"""
+    if settings.MODEL_STORE_DATABASE_URL:
+        return settings.MODEL_STORE_DATABASE_URL
+    return settings.DATABASE_URL.replace("+asyncpg", "+psycopg")
+
+
+def get_model_store() -> ModelStore:
+    """Retorna o backend configurado em MODEL_STORE_BACKEND"""
+    global _model_store
+    if _model_store is None:
+        if settings.MODEL_STORE_BACKEND == "postgres":
+            # Import tardio: só exige o driver psycopg quando o backend é usado
+            from .postgres import PostgresModelStore
+            _model_store = PostgresModelStore(
+                _sync_database_url(),
+                cache_ttl_seconds=settings.MODEL_STORE_CACHE_TTL_SECONDS
+            )
+        elif settings.MODEL_STORE_BACKEND == "filesystem":
+            _model_store = FileSystemModelStore(settings.MODEL_STORE_PATH)
+        else:
+            raise ValueError(f"MODEL_STORE_BACKEND inválido: {settings.MODEL_STORE_BACKEND}")
+    return _model_store
+
+
+__all__ = ["ModelStore", "ARTEFATOS", "FileSystemModelStore", "get_model_store"]
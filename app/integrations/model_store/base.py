@@ -0,0 +1,52 @@
+"""
+Interface comum dos backends de armazenamento dos modelos de IA
+"""
+from abc import ABC, abstractmethod
+from typing import Any, Optional
+
+import numpy as np
+
+
+# Artefatos guardados por placa (ou por chave de modelo agregado)
+ARTEFATOS = ("modelo", "limites", "historico", "estatisticas")
+
+
+class ModelStore(ABC):
+    """
+    Guarda os artefatos da IA identificados por (chave, artefato).
+    A chave é a placa do veículo ou uma chave interna iniciada por "_"
+    (ex.: "_frota/caminhao" para o modelo agregado do tipo).
+    """
+
+    @abstractmethod
+    def load(self, chave: str, artefato: str, fresh: bool = False) -> Optional[Any]:
+        """
+        Retorna o artefato ou None se ele não existir.
+        fresh=True ignora caches (use antes de ler-modificar-gravar).
+        """
+
+    @abstractmethod
+    def save(self, chave: str, artefato: str, valor: Any) -> None:
+        """Grava (ou substitui) o artefato"""
+
+    def append_historico(self, chave: str, valor: float) -> None:
+        """
+        Acrescenta uma média ao final do histórico sem devolvê-lo.
+        Implementação genérica (lê e regrava); os backends sobrescrevem
+        com um append de verdade.
+        """
+        historico = self.load(chave, "historico", fresh=True)
+        historico = np.array([], dtype=float) if historico is None else np.asarray(historico, dtype=float)
+        self.save(chave, "historico", np.append(historico, float(valor)))
+
+    @abstractmethod
+    def exists(self, chave: str, artefato: str) -> bool:
+        """Indica se o artefato existe"""
+
+    @abstractmethod
+    def delete(self, chave: str) -> None:
+        """Remove todos os artefatos da chave (não faz nada se não houver)"""
+
+    @abstractmethod
+    def list_keys(self) -> list[str]:
+        """Lista as placas com algum artefato (ignora chaves internas "_...")"""
@@ -0,0 +1,108 @@
+"""
+Backend de modelos em disco: uma pasta por placa (comportamento original)
+"""
+import io
+import os
+import shutil
+import threading
+from typing import Any, Optional
+
+import joblib
+import numpy as np
+
+from .base import ModelStore
+
+
+# Nome do arquivo de cada artefato dentro da pasta da placa
+ARQUIVOS = {
+    "modelo": "modelo.joblib",
+    "limites": "limites.joblib",
+    "historico": "historico.npy",
+    "estatisticas": "estatisticas.joblib",
+}
+
+
+class FileSystemModelStore(ModelStore):
+    """Guarda os artefatos em <base_path>/<chave>/<arquivo>"""
+
+    def __init__(self, base_path: str):
+        self.base_path = base_path
+
+    def path(self, chave: str, artefato: str) -> str:
+        return os.path.join(self.base_path, chave, ARQUIVOS[artefato])
+
+    def load(self, chave: str, artefato: str, fresh: bool = False) -> Optional[Any]:
+        path = self.path(chave, artefato)
+        if not os.path.exists(path):
+            return None
+
+        if artefato == "historico":
+            return np.load(path)
+        return joblib.load(path)
+
+    def save(self, chave: str, artefato: str, valor: Any) -> None:
+        path = self.path(chave, artefato)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Grava em arquivo temporário e troca atomicamente: leitores
+        # concorrentes nunca veem um arquivo pela metade
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            if artefato == "historico":
+                np.save(f, valor)
+            else:
+                joblib.dump(valor, f)
+        os.replace(tmp_path, path)
+
+    def append_historico(self, chave: str, valor: float) -> None:
+        """
+        Acrescenta a média direto no historico.npy: grava 8 bytes no fim do
+        arquivo e reescreve o cabeçalho no lugar (o NumPy reserva espaço no
+        cabeçalho para o shape crescer). Se não for possível, regrava tudo.
+        """
+        path = self.path(chave, "historico")
+        if not os.path.exists(path):
+            return super().append_historico(chave, valor)
+
+        with open(path, "r+b") as f:
+            versao = np.lib.format.read_magic(f)
+            if versao != (1, 0):
+                return super().append_historico(chave, valor)
+
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+            tamanho_cabecalho = f.tell()
+
+            if len(shape) != 1 or fortran_order or dtype != np.dtype("<f8"):
+                return super().append_historico(chave, valor)
+
+            cabecalho = io.BytesIO()
+            np.lib.format.write_array_header_1_0(cabecalho, {
+                "descr": np.lib.format.dtype_to_descr(dtype),
+                "fortran_order": False,
+                "shape": (shape[0] + 1,),
+            })
+            if len(cabecalho.getvalue()) != tamanho_cabecalho:
+                return super().append_historico(chave, valor)
+
+            # Dados primeiro, cabeçalho depois: um leitor concorrente vê o
+            # shape antigo (e ignora o byte extra) ou o novo, já completo
+            f.seek(tamanho_cabecalho + shape[0] * dtype.itemsize)
+            f.write(np.array([valor], dtype=dtype).tobytes())
+            f.flush()
+            f.seek(0)
+            f.write(cabecalho.getvalue())
+
+    def exists(self, chave: str, artefato: str) -> bool:
+        return os.path.exists(self.path(chave, artefato))
+
+    def delete(self, chave: str) -> None:
+        shutil.rmtree(os.path.join(self.base_path, chave), ignore_errors=True)
+
+    def list_keys(self) -> list[str]:
+        if not os.path.isdir(self.base_path):
+            return []
+
+        return sorted(
+            nome for nome in os.listdir(self.base_path)
+            if not nome.startswith("_") and os.path.isdir(os.path.join(self.base_path, nome))
+        )
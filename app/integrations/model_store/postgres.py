@@ -0,0 +1,197 @@
+"""
+Backend de modelos no PostgreSQL (tabela ia_artefatos) com cache em memória.
+
+Permite rodar a API em vários hosts sem volume compartilhado. Cada
+gravação incrementa a versão do artefato; a leitura passa por um cache
+read-through que, dentro do TTL, responde sem ir ao banco e, depois dele,
+só baixa o conteúdo de novo se a versão mudou.
+"""
+import io
+import threading
+import time
+from typing import Any, Optional
+
+import joblib
+import numpy as np
+from sqlalchemy import create_engine, select, delete, func, case, and_, not_
+from sqlalchemy.dialects.postgresql import insert
+
+from app.models.model_artifact import ModelArtifact
+from .base import ModelStore
+
+
+class PostgresModelStore(ModelStore):
+    """
+    Guarda os artefatos serializados (joblib) na tabela ia_artefatos.
+    O histórico é gravado como float64 little-endian cru, o que permite
+    acrescentar médias com um simples conteudo || novos_bytes no banco.
+    Históricos no formato antigo (joblib) continuam legíveis e passam para
+    o formato cru na primeira média acrescentada.
+    """
+
+    def __init__(self, database_url: str, cache_ttl_seconds: float = 30.0):
+        self.engine = create_engine(database_url, pool_pre_ping=True)
+        self.table = ModelArtifact.__table__
+        self.cache_ttl_seconds = cache_ttl_seconds
+
+        # (chave, artefato) -> (versao, valor, verificado_em); versao None = não existe
+        self._cache: dict[tuple[str, str], tuple[Optional[int], Any, float]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _dumps(artefato: str, valor: Any) -> bytes:
+        if artefato == "historico":
+            return np.asarray(valor, dtype="<f8").tobytes()
+
+        buffer = io.BytesIO()
+        joblib.dump(valor, buffer)
+        return buffer.getvalue()
+
+    @staticmethod
+    def _historico_joblib(conteudo: bytes) -> bool:
+        """
+        Histórico gravado antes do formato cru: pickle do joblib (começa com
+        PROTO 0x80 e termina com STOP "."). Médias de consumo em float64 cru
+        nunca terminam em 0x2e (seria um número da ordem de 1e-85).
+        """
+        return conteudo[:1] == b"\x80" and conteudo[-1:] == b"."
+
+    @classmethod
+    def _loads(cls, artefato: str, conteudo: bytes) -> Any:
+        if artefato == "historico" and not cls._historico_joblib(conteudo):
+            return np.frombuffer(conteudo, dtype="<f8").copy()
+
+        return joblib.load(io.BytesIO(conteudo))
+
+    def _cache_put(self, chave: str, artefato: str, versao: Optional[int], valor: Any) -> None:
+        with self._lock:
+            self._cache[(chave, artefato)] = (versao, valor, time.monotonic())
+
+    def load(self, chave: str, artefato: str, fresh: bool = False) -> Optional[Any]:
+        with self._lock:
+            cached = self._cache.get((chave, artefato))
+
+        # Dentro do TTL: responde direto da memória
+        if not fresh and cached and time.monotonic() - cached[2] < self.cache_ttl_seconds:
+            return cached[1]
+
+        t = self.table
+        filtro = (t.c.chave == chave, t.c.artefato == artefato)
+
+        # Uma consulta só: o conteúdo vem apenas se a versão mudou
+        conteudo = t.c.conteudo
+        if cached and cached[0] is not None:
+            conteudo = case((t.c.versao != cached[0], t.c.conteudo))
+
+        with self.engine.connect() as conn:
+            row = conn.execute(select(t.c.versao, conteudo.label("conteudo")).where(*filtro)).one_or_none()
+
+        if row is None:
+            self._cache_put(chave, artefato, None, None)
+            return None
+
+        # Versão não mudou: só renova o TTL, sem baixar o conteúdo
+        if row.conteudo is None:
+            self._cache_put(chave, artefato, row.versao, cached[1])
+            return cached[1]
+
+        valor = self._loads(artefato, row.conteudo)
+        self._cache_put(chave, artefato, row.versao, valor)
+        return valor
+
+    def save(self, chave: str, artefato: str, valor: Any) -> None:
+        t = self.table
+        stmt = insert(t).values(
+            chave=chave,
+            artefato=artefato,
+            conteudo=self._dumps(artefato, valor),
+            versao=1
+        )
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_ia_artefato",
+            set_={
+                "conteudo": stmt.excluded.conteudo,
+                "versao": t.c.versao + 1,
+                "updated_at": func.now(),
+            }
+        ).returning(t.c.versao)
+
+        with self.engine.begin() as conn:
+            versao = conn.execute(stmt).scalar_one()
+
+        self._cache_put(chave, artefato, versao, valor)
+
+    def append_historico(self, chave: str, valor: float) -> None:
+        t = self.table
+        novo = self._dumps("historico", [valor])
+
+        stmt = insert(t).values(
+            chave=chave,
+            artefato="historico",
+            conteudo=novo,
+            versao=1
+        )
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_ia_artefato",
+            set_={
+                "conteudo": t.c.conteudo.concat(stmt.excluded.conteudo),
+                "versao": t.c.versao + 1,
+                "updated_at": func.now(),
+            },
+            # Formato antigo (joblib) não aceita concatenação
+            where=not_(and_(
+                func.substring(t.c.conteudo, 1, 1) == b"\x80",
+                func.substring(t.c.conteudo, func.length(t.c.conteudo), 1) == b"."
+            ))
+        ).returning(t.c.versao)
+
+        with self.engine.begin() as conn:
+            versao = conn.execute(stmt).scalar_one_or_none()
+
+        if versao is None:
+            # Lê o joblib e regrava no formato cru, já com a nova média
+            return super().append_historico(chave, valor)
+
+        # Cache na versão anterior: acrescenta localmente; senão descarta
+        with self._lock:
+            cached = self._cache.pop((chave, "historico"), None)
+            if cached and cached[0] == versao - 1 and cached[1] is not None:
+                self._cache[(chave, "historico")] = (
+                    versao, np.append(cached[1], float(valor)), time.monotonic()
+                )
+
+    def exists(self, chave: str, artefato: str) -> bool:
+        """Consulta só a versão (ou o cache, dentro do TTL), sem baixar o conteúdo"""
+        with self._lock:
+            cached = self._cache.get((chave, artefato))
+
+        if cached and time.monotonic() - cached[2] < self.cache_ttl_seconds:
+            return cached[0] is not None
+
+        t = self.table
+        with self.engine.connect() as conn:
+            versao = conn.execute(
+                select(t.c.versao).where(t.c.chave == chave, t.c.artefato == artefato)
+            ).scalar_one_or_none()
+
+        return versao is not None
+
+    def delete(self, chave: str) -> None:
+        t = self.table
+        with self.engine.begin() as conn:
+            conn.execute(delete(t).where(t.c.chave == chave))
+
+        with self._lock:
+            for artefato in [a for (c, a) in self._cache if c == chave]:
+                self._cache[(chave, artefato)] = (None, None, time.monotonic())
+
+    def list_keys(self) -> list[str]:
+        t = self.table
+        with self.engine.connect() as conn:
+            result = conn.execute(
+                select(t.c.chave)
+                .where(~t.c.chave.startswith("_", autoescape=True))
+                .distinct()
+                .order_by(t.c.chave)
+            )
+            return list(result.scalars().all())
@@ -0,0 +1,4 @@
+"""
+Jobs executados fora do ciclo de requisições (linha de comando / agendador).
+Exemplo: python -m app.jobs.train_pooled_models
+"""
@@ -0,0 +1,80 @@
+"""
+Arquiva os abastecimentos antigos: move de refuel para refuel_arquivo, em
+lotes por placa, e soma os totais em refuel_resumo_diario (dashboard).
+
+Por placa, fica em refuel o último tanque cheio antes do corte e tudo
+depois dele, então o estado de consumo do veículo e o recálculo de médias
+não dependem do arquivo. Abastecimentos com alertas não são arquivados.
+Cada lote é uma transação com a placa travada (lock_placa): abastecimentos
+novos da placa esperam só pelo lote atual.
+
+    python -m app.jobs.archive_refuels
+    python -m app.jobs.archive_refuels --meses 6 --lote 2000
+"""
+import argparse
+import asyncio
+import time
+from datetime import date
+
+from sqlalchemy import text
+
+from app.core.database import AsyncSessionLocal, engine
+from app.integrations.db.locks import lock_placa
+from app.integrations.db.partitions import inicio_mes, somar_meses
+from app.repositories.refuel_archive_repository import RefuelArchiveRepository
+
+# Meses (além do atual) que ficam em refuel
+MESES_QUENTES = 12
+
+# Abastecimentos movidos por transação
+LOTE = 5000
+
+
+async def archive_refuels(meses: int, lote: int):
+    corte = somar_meses(inicio_mes(date.today()), -meses)
+    inicio = time.perf_counter()
+    print(f"📅 Arquivando abastecimentos anteriores a {corte.isoformat()}")
+
+    async with AsyncSessionLocal() as session:
+        repository = RefuelArchiveRepository(session)
+        placas = await repository.get_placas_before(corte)
+        await session.commit()
+
+        total = 0
+        for placa in placas:
+            movidos = 0
+            while True:
+                await lock_placa(session, placa)
+                quantidade = await repository.archive_batch(placa, corte, lote)
+                await session.commit()
+
+                movidos += quantidade
+                if quantidade < lote:
+                    break
+
+            if movidos:
+                print(f"📦 {placa}: {movidos} abastecimentos arquivados")
+            total += movidos
+
+    if total:
+        # Estatísticas do planejador refletem a tabela menor
+        async with engine.begin() as conn:
+            await conn.execute(text("ANALYZE refuel"))
+
+    print(f"✅ {total} abastecimento(s) de {len(placas)} placa(s) arquivado(s) em {time.perf_counter() - inicio:.1f}s")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Arquiva os abastecimentos antigos")
+    parser.add_argument("--meses", type=int, default=MESES_QUENTES, help="Meses mantidos em refuel")
+    parser.add_argument("--lote", type=int, default=LOTE, help="Abastecimentos por transação")
+    args = parser.parse_args()
+
+    try:
+        await archive_refuels(args.meses, args.lote)
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
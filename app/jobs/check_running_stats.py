@@ -0,0 +1,30 @@
+"""
+Confere as estatísticas acumuladas (count/mean/M2) de todas as placas
+contra o cálculo em lote sobre o histórico.
+
+    python -m app.jobs.check_running_stats
+"""
+import sys
+
+from app.integrations.model_store import get_model_store
+from app.services import ai_service
+
+
+def main() -> int:
+    divergentes = 0
+    for placa in get_model_store().list_keys():
+        resultado = ai_service.check_running_stats(placa)
+        if resultado["consistente"] is None:
+            continue
+
+        if resultado["consistente"]:
+            print(f"✅ {placa}: {resultado['acumulado']['count']} médias consistentes")
+        else:
+            divergentes += 1
+            print(f"❌ {placa}: acumulado={resultado['acumulado']} lote={resultado['lote']}")
+
+    return 1 if divergentes else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
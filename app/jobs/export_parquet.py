@@ -0,0 +1,157 @@
+"""
+Exporta os abastecimentos (refuel + refuel_arquivo) para Parquet, uma pasta
+por mês em ANALYTICS_PATH, base das análises de app.services.analytics_service.
+
+Incremental: para cada mês compara a quantidade de linhas e a última
+alteração (created_at/updated_at) com o manifesto do snapshot anterior e
+só regrava os meses que mudaram. Cada mês é lido com cursor no servidor
+(só a partição do mês) e gravado em lotes; a troca do arquivo é atômica.
+
+    python -m app.jobs.export_parquet
+    python -m app.jobs.export_parquet --completo
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import time
+from datetime import datetime, timezone
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import Float, String, cast, func, select
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, engine
+from app.integrations.db.partitions import somar_meses
+from app.repositories.refuel_repository import refuel_history
+from app.services.analytics_service import (
+    COLUNAS,
+    arrow_schema,
+    month_dir,
+    read_manifest,
+    write_manifest,
+)
+
+# Linhas buscadas por ida ao banco e por row group do Parquet
+LOTE = 50_000
+
+# Colunas numéricas saem do banco como float (Parquet em float64)
+_COLUNAS_FLOAT = {"litros", "valor_litro", "valor_total", "media"}
+_COLUNAS_TEXTO = {"id", "id_usuario"}
+
+
+# refuel + refuel_arquivo: arquivar abastecimentos não muda o snapshot
+_HISTORICO = refuel_history(*(nome for nome, _ in COLUNAS), "created_at", "updated_at")
+
+
+def _coluna(nome: str):
+    coluna = _HISTORICO.c[nome]
+    if nome in _COLUNAS_FLOAT:
+        return cast(coluna, Float).label(nome)
+    if nome in _COLUNAS_TEXTO:
+        return cast(coluna, String).label(nome)
+    return coluna
+
+
+async def _estado_banco(session) -> dict[str, dict]:
+    """Por mês: quantidade de linhas e última alteração"""
+    mes = func.to_char(_HISTORICO.c.data, "YYYY-MM")
+    result = await session.execute(
+        select(
+            mes,
+            func.count(),
+            func.max(func.coalesce(_HISTORICO.c.updated_at, _HISTORICO.c.created_at))
+        ).group_by(mes)
+    )
+    return {
+        m: {"linhas": linhas, "atualizado_em": atualizado.isoformat()}
+        for m, linhas, atualizado in result.all()
+    }
+
+
+async def _exportar_mes(session, raiz: str, mes: str) -> int:
+    inicio = datetime.strptime(mes, "%Y-%m").date()
+    query = (
+        select(*(_coluna(nome) for nome, _ in COLUNAS))
+        .where(_HISTORICO.c.data >= inicio, _HISTORICO.c.data < somar_meses(inicio, 1))
+        .order_by(_HISTORICO.c.data, _HISTORICO.c.hora)
+        .execution_options(yield_per=LOTE)
+    )
+
+    schema = arrow_schema()
+    pasta = month_dir(raiz, mes)
+    # Prefixo "_": ignorado pelos leitores do dataset
+    temporaria = os.path.join(raiz, f"_novo_{mes}")
+    shutil.rmtree(temporaria, ignore_errors=True)
+    os.makedirs(temporaria)
+
+    linhas = 0
+    with pq.ParquetWriter(os.path.join(temporaria, "part-0.parquet"), schema, compression="zstd") as writer:
+        result = await session.stream(query)
+        async for lote in result.partitions():
+            colunas = list(zip(*lote))
+            writer.write_batch(pa.RecordBatch.from_arrays(
+                [pa.array(valores, type=campo.type) for valores, campo in zip(colunas, schema)],
+                schema=schema
+            ))
+            linhas += len(lote)
+
+    # Troca a pasta do mês de uma vez (leitores veem o snapshot antigo ou o novo)
+    antiga = os.path.join(raiz, f"_antigo_{mes}")
+    if os.path.exists(pasta):
+        os.replace(pasta, antiga)
+    os.replace(temporaria, pasta)
+    shutil.rmtree(antiga, ignore_errors=True)
+    return linhas
+
+
+async def export_parquet(completo: bool = False):
+    raiz = settings.ANALYTICS_PATH
+    os.makedirs(raiz, exist_ok=True)
+    inicio = time.perf_counter()
+
+    manifesto = {"meses": {}, "gerado_em": None} if completo else read_manifest(raiz)
+
+    async with AsyncSessionLocal() as session:
+        atual = await _estado_banco(session)
+
+        alterados = sorted(m for m, estado in atual.items() if manifesto["meses"].get(m) != estado)
+        removidos = sorted(set(manifesto["meses"]) - set(atual))
+
+        total = 0
+        for mes in alterados:
+            linhas = await _exportar_mes(session, raiz, mes)
+            total += linhas
+            print(f"📦 {mes}: {linhas} abastecimentos")
+
+    for mes in removidos:
+        shutil.rmtree(month_dir(raiz, mes), ignore_errors=True)
+        print(f"🗑️  {mes}: sem abastecimentos, removido do snapshot")
+
+    manifesto["meses"] = atual
+    manifesto["gerado_em"] = datetime.now(timezone.utc).isoformat()
+    write_manifest(raiz, manifesto)
+
+    if not alterados and not removidos:
+        print("✅ Snapshot já estava atualizado")
+        return
+    print(
+        f"✅ {len(alterados)} mês(es) exportado(s) ({total} linhas), "
+        f"{len(removidos)} removido(s) em {time.perf_counter() - inicio:.1f}s"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Exporta os abastecimentos (refuel + refuel_arquivo) para Parquet")
+    parser.add_argument("--completo", action="store_true", help="Regrava todos os meses")
+    args = parser.parse_args()
+
+    try:
+        await export_parquet(args.completo)
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,29 @@
+"""
+Remove as Idempotency-Keys vencidas (IDEMPOTENCY_KEY_TTL_HOURS).
+Chaves vencidas já são reaproveitadas no próximo uso; o job só evita que a
+tabela cresça com chaves que nunca voltam (agendar no cron, ex.: 1x por dia).
+
+    python -m app.jobs.purge_idempotency_keys
+"""
+import asyncio
+
+from app.core.database import AsyncSessionLocal, engine
+from app.services.idempotency_service import IdempotencyService
+
+
+async def purge_idempotency_keys():
+    async with AsyncSessionLocal() as session:
+        removidas = await IdempotencyService(session).purge_expired()
+
+    print(f"✅ {removidas} Idempotency-Key(s) vencida(s) removida(s)")
+
+
+async def main():
+    try:
+        await purge_idempotency_keys()
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,29 @@
+"""
+Remove as exclusões da sincronização (sync_exclusoes) mais antigas que
+SYNC_TOMBSTONE_RETENTION_DAYS. Um app com cursor anterior à retenção recebe
+reset no próximo /sync, então nada se perde (agendar no cron, ex.: 1x por dia).
+
+    python -m app.jobs.purge_sync_tombstones
+"""
+import asyncio
+
+from app.core.database import AsyncSessionLocal, engine
+from app.services.sync_service import SyncService
+
+
+async def purge_sync_tombstones():
+    async with AsyncSessionLocal() as session:
+        removidas = await SyncService(session).purge_tombstones()
+
+    print(f"✅ {removidas} exclusão(ões) antiga(s) removida(s)")
+
+
+async def main():
+    try:
+        await purge_sync_tombstones()
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,182 @@
+"""
+Reconstrói o histórico da IA de todas as placas a partir dos abastecimentos
+(refuel + refuel_arquivo), depois de correções nos dados ou perda do volume
+dos modelos.
+
+As médias são lidas em uma única consulta ordenada por placa e KM, com
+cursor no servidor: só o histórico das placas em andamento fica em memória.
+Cada placa é regravada com o lock dela (lock_placa), como no cadastro de
+abastecimentos: se a placa mudou depois da leitura, as médias são lidas de
+novo já com o lock. O retreino roda em paralelo, em processos, ainda com o
+lock. Placas com menos de MIN_HISTORICO médias (ou sem nenhuma) ficam sem
+artefatos próprios e usam o modelo agregado do tipo.
+
+    python -m app.jobs.rebuild_histories
+    python -m app.jobs.rebuild_histories --workers 4 --sem-treino
+"""
+import argparse
+import asyncio
+import hashlib
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+import numpy as np
+from sqlalchemy import select, func, cast, literal, Text
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+
+from app.core.database import AsyncSessionLocal, engine
+from app.integrations.db.locks import lock_placa
+from app.integrations.model_store import get_model_store
+from app.repositories.refuel_repository import RefuelRepository, refuel_history
+from app.services.ai_service import MIN_HISTORICO, clear_plate, retrain_model, save_history
+
+# Linhas buscadas por ida ao banco
+LOTE_CURSOR = 10_000
+
+
+def _impressao(textos: list[str]) -> Optional[str]:
+    """Mesma impressão digital de _impressao_atual (None sem médias)"""
+    return hashlib.md5(",".join(textos).encode()).hexdigest() if textos else None
+
+
+async def _impressao_atual(session, placa: str) -> Optional[str]:
+    """md5 das médias da placa, na ordem do histórico"""
+    historico = refuel_history("id", "placa", "km", "media")
+    result = await session.execute(
+        select(func.md5(func.string_agg(
+            cast(historico.c.media, Text),
+            aggregate_order_by(literal(","), historico.c.km, historico.c.id)
+        )))
+        .where(historico.c.placa == placa, historico.c.media.is_not(None))
+    )
+    return result.scalar()
+
+
+async def _reconstruir_placa(
+    placa: str,
+    medias: list[float],
+    impressao: Optional[str],
+    pool: Optional[ProcessPoolExecutor]
+) -> tuple[int, bool]:
+    """
+    Regrava (ou remove) os artefatos da placa com o lock dela, até o fim
+    do retreino. Retorna (médias gravadas, retreinou).
+    """
+    async with AsyncSessionLocal() as session:
+        # Sem limite de espera: um cadastro da placa em andamento termina logo
+        await lock_placa(session, placa, timeout_ms=0)
+
+        # Mudou depois da leitura em lote: relê com o lock
+        if await _impressao_atual(session, placa) != impressao:
+            _, medias = await RefuelRepository(session).get_medias_from_km(placa, 0)
+
+        retreinado = False
+        if len(medias) < MIN_HISTORICO:
+            await asyncio.to_thread(clear_plate, placa)
+            medias = []
+        else:
+            await asyncio.to_thread(save_history, placa, np.array(medias, dtype=float))
+            if pool is not None:
+                retreinado = await asyncio.wrap_future(pool.submit(retrain_model, placa, "reconstrucao"))
+
+        # Libera o lock
+        await session.commit()
+
+    return len(medias), retreinado
+
+
+async def rebuild_histories(workers: int | None, treinar: bool = True):
+    # Abastecimentos arquivados também fazem parte do histórico
+    historico = refuel_history("id", "placa", "km", "media")
+    query = (
+        select(historico.c.placa, historico.c.media)
+        .where(historico.c.media.is_not(None))
+        .order_by(historico.c.placa, historico.c.km, historico.c.id)
+        .execution_options(yield_per=LOTE_CURSOR)
+    )
+
+    placas = removidas = medias_total = retreinados = 0
+    inicio = time.perf_counter()
+
+    workers = workers or os.cpu_count() or 1
+
+    # Placas em andamento (cada uma segura uma conexão e o lock dela)
+    vagas = asyncio.Semaphore(workers)
+    tarefas: set[asyncio.Task] = set()
+    vistas: set[str] = set()
+
+    # spawn: os processos não herdam conexões abertas do processo principal
+    contexto = multiprocessing.get_context("spawn")
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=contexto) as pool:
+        async def tarefa(placa: str, medias: list[float], impressao: Optional[str]):
+            nonlocal placas, removidas, medias_total, retreinados
+            try:
+                gravadas, retreinado = await _reconstruir_placa(
+                    placa, medias, impressao, pool if treinar else None
+                )
+            finally:
+                vagas.release()
+
+            if gravadas:
+                placas += 1
+                medias_total += gravadas
+            else:
+                removidas += 1
+            retreinados += int(retreinado)
+
+        async def fechar(placa: str, textos: list[str]):
+            await vagas.acquire()
+            vistas.add(placa)
+            t = asyncio.create_task(tarefa(placa, [float(m) for m in textos], _impressao(textos)))
+            tarefas.add(t)
+            t.add_done_callback(tarefas.discard)
+
+        async with AsyncSessionLocal() as session:
+            result = await session.stream(query)
+
+            placa_atual, textos = None, []
+            async for placa, media in result:
+                if placa != placa_atual:
+                    if placa_atual is not None:
+                        await fechar(placa_atual, textos)
+                    placa_atual, textos = placa, []
+
+                # Texto do numeric, como no media::text da impressão digital
+                textos.append(str(media))
+
+            if placa_atual is not None:
+                await fechar(placa_atual, textos)
+
+        # Placas com artefatos e sem nenhuma média nos abastecimentos
+        for placa in await asyncio.to_thread(get_model_store().list_keys):
+            if placa not in vistas:
+                await fechar(placa, [])
+
+        while tarefas:
+            await asyncio.gather(*tarefas)
+
+    print(f"💾 {placas} históricos gravados ({medias_total} médias), {removidas} placas sem histórico próprio "
+          f"em {time.perf_counter() - inicio:.1f}s")
+    if treinar:
+        print(f"🤖 {retreinados} modelos retreinados")
+    print(f"✅ Reconstrução concluída em {time.perf_counter() - inicio:.1f}s")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Reconstrói os históricos da IA a partir do banco")
+    parser.add_argument("--workers", type=int, default=None, help="Processos de retreino (padrão: nº de CPUs)")
+    parser.add_argument("--sem-treino", action="store_true", help="Só grava os históricos, sem retreinar")
+    args = parser.parse_args()
+
+    try:
+        await rebuild_histories(args.workers, treinar=not args.sem_treino)
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
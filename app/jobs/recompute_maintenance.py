@@ -0,0 +1,36 @@
+"""
+Recalcula km_prox_manutencao e manutencao_vencida de toda a frota em um
+único UPDATE (após mudar frequencia_km_manutencao ou corrigir dados em lote).
+
+Para rodar agendado (cron), por exemplo uma vez por dia:
+
+    python -m app.jobs.recompute_maintenance
+"""
+import asyncio
+
+from app.core.database import AsyncSessionLocal, engine
+from app.repositories.vehicle_repository import VehicleRepository
+
+
+async def recompute_maintenance():
+    async with AsyncSessionLocal() as session:
+        alterados = await VehicleRepository(session).recompute_maintenance()
+
+    if not alterados:
+        print("✅ Manutenções já estavam atualizadas")
+        return
+
+    for placa, vencida in alterados:
+        print(f"🔧 {placa}: {'manutenção vencida' if vencida else 'manutenção em dia'}")
+    print(f"✅ {len(alterados)} veículo(s) atualizado(s)")
+
+
+async def main():
+    try:
+        await recompute_maintenance()
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
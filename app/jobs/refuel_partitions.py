@@ -0,0 +1,150 @@
+"""
+Gerencia as partições mensais da tabela refuel.
+
+    # Converte uma refuel comum (bancos criados antes do particionamento)
+    python -m app.jobs.refuel_partitions converter
+
+    # Cria as partições que faltam até N meses à frente (agendar no cron)
+    python -m app.jobs.refuel_partitions criar --meses 3
+    python -m app.jobs.refuel_partitions criar --desde 2023-01
+
+    # Desanexa (arquiva) ou apaga as partições anteriores a um mês
+    python -m app.jobs.refuel_partitions desanexar 2023-01
+    python -m app.jobs.refuel_partitions desanexar 2023-01 --remover
+
+    # Lista as partições e confere o pruning das consultas por período
+    python -m app.jobs.refuel_partitions listar
+    python -m app.jobs.refuel_partitions verificar
+"""
+import argparse
+import asyncio
+import time
+from datetime import date, datetime
+
+from sqlalchemy import func, select, text
+from sqlalchemy.dialects import postgresql
+
+from app.core.database import engine
+from app.integrations.db import partitions
+from app.models.refuel import Refuel
+
+
+def _mes(valor: str) -> date:
+    return datetime.strptime(valor, "%Y-%m").date()
+
+
+async def converter(meses: int):
+    inicio = time.perf_counter()
+    async with engine.begin() as conn:
+        if await partitions.is_partitioned(conn):
+            print("✅ refuel já é particionada")
+            return
+        copiadas = await partitions.convert_to_partitioned(conn, meses)
+        total = len(await partitions.list_partitions(conn))
+
+    print(f"✅ refuel convertida: {copiadas} linhas em {total} partições ({time.perf_counter() - inicio:.1f}s)")
+
+
+async def criar(meses: int, desde: date | None):
+    async with engine.begin() as conn:
+        if not await partitions.is_partitioned(conn):
+            print("❌ refuel não é particionada (rode 'converter' antes)")
+            return
+        criadas, ignoradas = await partitions.ensure_partitions(conn, meses, desde)
+
+    for nome in criadas:
+        print(f"🧱 {nome} criada")
+    for nome in ignoradas:
+        print(f"⚠️  {nome} não criada: já há linhas desse mês em {partitions.PARTICAO_PADRAO}")
+    print(f"✅ {len(criadas)} partição(ões) criada(s)")
+
+
+async def desanexar(antes: date, remover: bool):
+    async with engine.begin() as conn:
+        desanexadas, falhas = await partitions.detach_partitions(conn, antes, remover)
+
+    for nome in desanexadas:
+        print(f"📦 {nome} {'removida' if remover else 'desanexada (tabela mantida como arquivo)'}")
+    for nome, motivo in falhas:
+        print(f"❌ {nome}: {motivo}")
+    print(f"✅ {len(desanexadas)} partição(ões) fora de refuel")
+
+
+async def listar():
+    async with engine.connect() as conn:
+        for nome, limites in await partitions.list_partitions(conn):
+            linhas = await conn.scalar(
+                text("SELECT reltuples::bigint FROM pg_class WHERE relname = :nome"),
+                {"nome": nome}
+            )
+            print(f"{nome:<20} {limites:<60} ~{max(linhas, 0)} linhas")
+
+
+async def verificar():
+    """EXPLAIN das consultas por período do mês atual: só a partição do mês deve aparecer"""
+    inicio = partitions.inicio_mes(date.today())
+    fim = partitions.somar_meses(inicio, 1)
+
+    # Mesmos filtros de RefuelRepository.get_all/count e do dashboard
+    consultas = {
+        "listagem": select(Refuel).where(Refuel.data >= inicio, Refuel.data <= fim).limit(100),
+        "contagem": select(func.count(Refuel.id)).where(Refuel.data >= inicio, Refuel.data <= fim),
+    }
+
+    ok = True
+    async with engine.connect() as conn:
+        for nome, consulta in consultas.items():
+            sql = consulta.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+            plano = (await conn.execute(text(f"EXPLAIN {sql}"))).scalars().all()
+            lidas = sorted({
+                parte.split()[0]
+                for linha in plano
+                for parte in linha.split(" on ")[1:]
+                if parte.startswith(partitions.TABELA)
+            })
+            esperado = {partitions.nome_particao(inicio), partitions.nome_particao(fim)}
+            podado = set(lidas) <= esperado
+            ok = ok and podado
+            print(f"{'✅' if podado else '❌'} {nome}: {', '.join(lidas) or '(nenhuma)'}")
+
+    if not ok:
+        raise SystemExit(1)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Partições mensais da tabela refuel")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    p = sub.add_parser("converter", help="Converte refuel em tabela particionada")
+    p.add_argument("--meses", type=int, default=partitions.MESES_FUTUROS, help="Meses à frente")
+
+    p = sub.add_parser("criar", help="Cria as partições que faltam")
+    p.add_argument("--meses", type=int, default=partitions.MESES_FUTUROS, help="Meses à frente")
+    p.add_argument("--desde", type=_mes, default=None, help="Primeiro mês (AAAA-MM), padrão: mês atual")
+
+    p = sub.add_parser("desanexar", help="Desanexa as partições anteriores a um mês")
+    p.add_argument("antes", type=_mes, help="Mês (AAAA-MM); partições anteriores saem de refuel")
+    p.add_argument("--remover", action="store_true", help="Apaga as partições em vez de mantê-las")
+
+    sub.add_parser("listar", help="Lista as partições")
+    sub.add_parser("verificar", help="Confere o partition pruning das consultas por período")
+
+    args = parser.parse_args()
+
+    try:
+        if args.comando == "converter":
+            await converter(args.meses)
+        elif args.comando == "criar":
+            await criar(args.meses, args.desde)
+        elif args.comando == "desanexar":
+            await desanexar(args.antes, args.remover)
+        elif args.comando == "listar":
+            await listar()
+        else:
+            await verificar()
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
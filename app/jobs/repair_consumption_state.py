@@ -0,0 +1,39 @@
+"""
+Recalcula o estado de consumo dos veículos (km_ultimo_tanque_cheio e
+litros_desde_tanque_cheio) a partir da tabela de abastecimentos.
+
+Use depois de criar as colunas (backfill) ou para corrigir divergências:
+
+    python -m app.jobs.repair_consumption_state
+    python -m app.jobs.repair_consumption_state ABC1D23
+"""
+import asyncio
+import sys
+
+from app.core.database import AsyncSessionLocal, engine
+from app.repositories.vehicle_repository import VehicleRepository
+
+
+async def repair_consumption_state(placa: str | None = None):
+    async with AsyncSessionLocal() as session:
+        placas = await VehicleRepository(session).refresh_consumption_state(placa)
+
+    if not placas:
+        print("✅ Estado de consumo já estava consistente")
+        return
+
+    for p in placas:
+        print(f"🔧 {p}: estado de consumo recalculado")
+    print(f"✅ {len(placas)} veículo(s) corrigido(s)")
+
+
+async def main():
+    placa = sys.argv[1] if len(sys.argv) > 1 else None
+    try:
+        await repair_consumption_state(placa)
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
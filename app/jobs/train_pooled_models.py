@@ -0,0 +1,56 @@
+"""
+Treina os modelos agregados da frota (um por tipo de veículo).
+
+Placas novas ainda não têm histórico suficiente para um modelo próprio;
+enquanto isso a detecção de anomalias usa o modelo do tipo do veículo.
+Execute periodicamente (ex.: uma vez por dia):
+
+    python -m app.jobs.train_pooled_models
+"""
+import asyncio
+
+import numpy as np
+from sqlalchemy import select, func
+
+from app.core.database import AsyncSessionLocal, engine
+from app.models.vehicle import Vehicle
+from app.repositories.refuel_repository import refuel_history
+from app.services.ai_service import train_pooled_model
+
+
+async def train_pooled_models():
+    """Junta as médias dos abastecimentos por tipo e treina um modelo para cada grupo"""
+    historico = refuel_history("placa", "media")
+
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            select(Vehicle.tipo, func.count(Vehicle.id)).group_by(Vehicle.tipo)
+        )
+        tipos = result.all()
+
+        for tipo, n_placas in tipos:
+            # Médias de todas as placas do tipo, inclusive as frias (sem histórico próprio)
+            result = await session.execute(
+                select(historico.c.media)
+                .join(Vehicle, Vehicle.placa == historico.c.placa)
+                .where(Vehicle.tipo == tipo, historico.c.media.is_not(None))
+            )
+            medias = np.fromiter((float(m) for m in result.scalars()), dtype=float)
+
+            total = await asyncio.to_thread(train_pooled_model, tipo.value, medias)
+
+            if total is None:
+                print(f"⚠️  {tipo.value}: histórico insuficiente na frota ({n_placas} placas)")
+            else:
+                print(f"✅ {tipo.value}: modelo agregado treinado com {total} médias de {n_placas} placas")
+
+
+async def main():
+    try:
+        await train_pooled_models()
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -2,8 +2,12 @@ from .base import Base, BaseModel
 from .user import User
 from .telephone_number import TelephoneNumber
 from .refuel import Refuel
+from .refuel_archive import RefuelArchive, RefuelDailySummary
 from .vehicle import Vehicle
 from .maintenance import Maintenance
 from .alert import Alert
+from .model_artifact import ModelArtifact
+from .idempotency_key import IdempotencyKey
+from .sync_tombstone import SyncTombstone
 
-__all__ = ["Base", "BaseModel", "User", "TelephoneNumber", "Refuel", "Vehicle", "Maintenance", "Alert"]
\ No newline at end of file
+__all__ = ["Base", "BaseModel", "User", "TelephoneNumber", "Refuel", "RefuelArchive", "RefuelDailySummary", "Vehicle", "Maintenance", "Alert", "ModelArtifact", "IdempotencyKey", "SyncTombstone"]
\ No newline at end of file
@@ -1,28 +1,50 @@
 from datetime import datetime
-import uuid
 
-from sqlalchemy import Column, String, DateTime, Boolean, ForeignKey
+from sqlalchemy import Column, String, Date, DateTime, Boolean, ForeignKey, ForeignKeyConstraint, Index, func
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
+from uuid_extensions import uuid7
 
 from app.models.base import Base
 
 
 class Alert(Base):
     __tablename__ = "alerts"
-
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    # INSERT/UPDATE ... RETURNING traz updated_at (gerado pelo banco)
+    __mapper_args__ = {"eager_defaults": True}
+    __table_args__ = (
+        # Listagem por veículo/status, mais recentes primeiro
+        Index("ix_alerts_veiculo_resolved_created", "id_veiculo", "resolved", "created_at"),
+        # Sincronização incremental (/sync): alterados depois do cursor
+        Index("ix_alerts_sync", "updated_at", "id"),
+        # refuel é particionada por data: a FK precisa da chave completa (id, data).
+        # ON UPDATE CASCADE acompanha o abastecimento quando a data dele muda.
+        ForeignKeyConstraint(
+            ["id_abastecimento", "data_abastecimento"],
+            ["refuel.id", "refuel.data"],
+            name="alerts_abastecimento_fkey",
+            onupdate="CASCADE"
+        ),
+    )
+
+    # uuid7 (ordenado pelo tempo), como nos demais modelos
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
 
     # 🔥 chaves estrangeiras
-    id_veiculo = Column(UUID(as_uuid=True), ForeignKey("veiculos.id"), nullable=False)
-    id_abastecimento = Column(UUID(as_uuid=True), ForeignKey("refuel.id"), nullable=False)
+    # ON DELETE CASCADE: remover o veículo remove os alertas dele
+    id_veiculo = Column(UUID(as_uuid=True), ForeignKey("veiculos.id", ondelete="CASCADE"), nullable=False)
+    id_abastecimento = Column(UUID(as_uuid=True), nullable=False)
+    data_abastecimento = Column(Date, nullable=False)
 
     severity = Column(String(10), nullable=False)  # LOW, MEDIUM, HIGH
     message = Column(String(255), nullable=False)
 
     resolved = Column(Boolean, default=False)
     created_at = Column(DateTime, default=datetime.utcnow)
+    # Preenchido também na criação: a sincronização usa só esta coluna
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
 
     # 🔥 RELACIONAMENTOS
-    veiculo = relationship("Vehicle", back_populates="alerts", lazy="joined")
-    abastecimento = relationship("Refuel", lazy="joined")
+    # Carregados só quando pedidos (selectinload); a listagem usa projeção
+    veiculo = relationship("Vehicle", back_populates="alerts", lazy="select")
+    abastecimento = relationship("Refuel", lazy="select")
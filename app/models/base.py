@@ -20,6 +20,10 @@ class BaseModel(Base):
     """
     __abstract__ = True
 
+    # INSERT/UPDATE ... RETURNING traz as colunas geradas pelo banco
+    # (created_at, updated_at, colunas calculadas) sem refresh
+    __mapper_args__ = {"eager_defaults": True}
+
     id: Mapped[UuidType] = mapped_column(
         UUID(as_uuid=True),
         primary_key=True,
@@ -40,6 +44,12 @@ class BaseModel(Base):
         comment="Data e hora da última atualização do registro"
     )
 
+    def __init__(self, **kwargs):
+        # updated_at explícito (nulo) no INSERT: sem isso o eager_defaults
+        # faz um SELECT extra só para buscar a coluna
+        kwargs.setdefault("updated_at", None)
+        super().__init__(**kwargs)
+
     def __repr__(self) -> str:
         """Representação string básica do modelo"""
         return f"<{self.__class__.__name__}(id={self.id})>"
\ No newline at end of file
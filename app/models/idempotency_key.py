@@ -0,0 +1,62 @@
+from datetime import datetime
+from typing import Any, Optional
+from uuid import UUID as UuidType
+
+from sqlalchemy import String, Integer, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import BaseModel
+
+
+class IdempotencyKey(BaseModel):
+    """
+    Idempotency-Key recebida em um POST e a resposta devolvida para ela.
+    Sem status_code/resposta: a requisição original ainda está em andamento.
+    """
+    __tablename__ = "idempotency_keys"
+
+    chave: Mapped[str] = mapped_column(
+        String(255),
+        nullable=False,
+        comment="Valor do cabeçalho Idempotency-Key"
+    )
+
+    id_usuario: Mapped[UuidType] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False,
+        comment="Usuário dono da chave (chaves de usuários diferentes não colidem)"
+    )
+
+    hash_requisicao: Mapped[str] = mapped_column(
+        String(64),
+        nullable=False,
+        comment="SHA-256 do endpoint + corpo da requisição original"
+    )
+
+    status_code: Mapped[Optional[int]] = mapped_column(
+        Integer,
+        nullable=True,
+        comment="Status HTTP da resposta original"
+    )
+
+    resposta: Mapped[Optional[Any]] = mapped_column(
+        JSONB,
+        nullable=True,
+        comment="Corpo JSON da resposta original"
+    )
+
+    expira_em: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        index=True,
+        comment="Depois disso a chave pode ser reutilizada"
+    )
+
+    __table_args__ = (
+        UniqueConstraint("id_usuario", "chave", name="uq_idempotency_usuario_chave"),
+    )
+
+    def __repr__(self) -> str:
+        return f"<IdempotencyKey(chave='{self.chave}', status_code={self.status_code})>"
@@ -0,0 +1,41 @@
+from sqlalchemy import String, Integer, LargeBinary, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import BaseModel
+
+
+class ModelArtifact(BaseModel):
+    """Artefatos da IA (modelo, limites, histórico, estatísticas) por placa"""
+    __tablename__ = "ia_artefatos"
+
+    chave: Mapped[str] = mapped_column(
+        String(50),
+        nullable=False,
+        comment="Placa do veículo ou chave do modelo agregado (_frota/<tipo>)"
+    )
+
+    artefato: Mapped[str] = mapped_column(
+        String(30),
+        nullable=False,
+        comment="Nome do artefato (modelo, limites, historico, estatisticas)"
+    )
+
+    conteudo: Mapped[bytes] = mapped_column(
+        LargeBinary,
+        nullable=False,
+        comment="Artefato serializado com joblib"
+    )
+
+    versao: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=1,
+        comment="Incrementada a cada gravação do artefato"
+    )
+
+    __table_args__ = (
+        UniqueConstraint('chave', 'artefato', name='uq_ia_artefato'),
+    )
+
+    def __repr__(self) -> str:
+        return f"<ModelArtifact(chave='{self.chave}', artefato='{self.artefato}', versao={self.versao})>"
@@ -1,6 +1,6 @@
-from sqlalchemy import String, Integer, Numeric, Date, Time, Boolean, ForeignKey, Computed
+from sqlalchemy import String, Integer, Numeric, Date, Time, Boolean, ForeignKey, Computed, PrimaryKeyConstraint, Index, text
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.orm import Mapped, mapped_column, relationship, declared_attr
 from decimal import Decimal
 from datetime import date, time
 from uuid import UUID as UuidType
@@ -11,9 +11,24 @@ from .base import BaseModel
 class Refuel(BaseModel):
     """Modelo de Abastecimento"""
     __tablename__ = "refuel"
+    # Particionada por mês (RANGE em data). A chave primária de uma tabela
+    # particionada precisa conter a coluna de partição: (id, data).
+    # Partições: app.integrations.db.partitions / app.jobs.refuel_partitions
+    __table_args__ = (
+        PrimaryKeyConstraint("id", "data", name="refuel_pkey"),
+        # Sincronização incremental (/sync): alterados depois do cursor
+        Index("ix_refuel_sync", text("COALESCE(updated_at, created_at)"), "id"),
+        {"postgresql_partition_by": "RANGE (data)"},
+    )
+
+    @declared_attr.directive
+    def __mapper_args__(cls):
+        # Para o ORM a identidade continua só o id (uuid7): session.get(Refuel, id)
+        return {"eager_defaults": True, "primary_key": [cls.__table__.c.id]}
     
     data: Mapped[date] = mapped_column(
         Date,
+        primary_key=True,
         nullable=False,
         comment="Data do abastecimento"
     )
@@ -0,0 +1,76 @@
+from sqlalchemy import String, Integer, Numeric, Date, Time, Boolean, DateTime, Index, func
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+from decimal import Decimal
+from datetime import date, time, datetime
+from typing import Optional
+from uuid import UUID as UuidType
+
+from .base import Base
+
+
+class RefuelArchive(Base):
+    """
+    Abastecimentos antigos movidos para fora de refuel (app.jobs.archive_refuels).
+    Mesmas colunas de refuel; valor_total guarda o valor já calculado.
+    """
+    __tablename__ = "refuel_arquivo"
+    __table_args__ = (
+        # Âncora/histórico por placa em ordem de KM (recalcular médias, IA)
+        Index("ix_refuel_arquivo_placa_km", "placa", "km"),
+    )
+
+    id: Mapped[UuidType] = mapped_column(UUID(as_uuid=True), primary_key=True)
+    data: Mapped[date] = mapped_column(Date, nullable=False)
+    hora: Mapped[time] = mapped_column(Time, nullable=False)
+    km: Mapped[int] = mapped_column(Integer, nullable=False)
+    litros: Mapped[Decimal] = mapped_column(Numeric(10, 2), nullable=False)
+    tipo_combustivel: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)
+    valor_litro: Mapped[Decimal] = mapped_column(Numeric(10, 2), nullable=False)
+    posto: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
+    valor_total: Mapped[Decimal] = mapped_column(Numeric(10, 2), nullable=False)
+    tanque_cheio: Mapped[Optional[bool]] = mapped_column(Boolean, nullable=True)
+    media: Mapped[Optional[Decimal]] = mapped_column(Numeric(10, 2), nullable=True)
+    id_usuario: Mapped[Optional[UuidType]] = mapped_column(UUID(as_uuid=True), nullable=True)
+    placa: Mapped[str] = mapped_column(String(10), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    arquivado_em: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        comment="Quando a linha saiu de refuel"
+    )
+
+    def __repr__(self) -> str:
+        return f"<RefuelArchive(id={self.id}, placa='{self.placa}', data='{self.data}')>"
+
+
+class RefuelDailySummary(Base):
+    """
+    Totais diários por placa dos abastecimentos arquivados, somados a cada
+    lote arquivado. O dashboard lê refuel + este resumo, sem tocar no arquivo.
+    """
+    __tablename__ = "refuel_resumo_diario"
+
+    placa: Mapped[str] = mapped_column(String(10), primary_key=True)
+    data: Mapped[date] = mapped_column(Date, primary_key=True)
+
+    abastecimentos: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    litros: Mapped[Decimal] = mapped_column(Numeric(14, 2), nullable=False, default=0)
+    valor_total: Mapped[Decimal] = mapped_column(Numeric(14, 2), nullable=False, default=0)
+    soma_media: Mapped[Decimal] = mapped_column(
+        Numeric(14, 2),
+        nullable=False,
+        default=0,
+        comment="Soma das médias km/L (com medias, dá a média do período)"
+    )
+    medias: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=0,
+        comment="Quantidade de abastecimentos com média"
+    )
+
+    def __repr__(self) -> str:
+        return f"<RefuelDailySummary(placa='{self.placa}', data='{self.data}', abastecimentos={self.abastecimentos})>"
@@ -0,0 +1,40 @@
+from typing import Optional
+from uuid import UUID as UuidType
+
+from sqlalchemy import String, Index
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import BaseModel
+
+
+class SyncTombstone(BaseModel):
+    """
+    Registro removido (ou que deixou de ser do usuário), para a sincronização
+    incremental (/sync) avisar os clientes. created_at = momento da exclusão.
+    """
+    __tablename__ = "sync_exclusoes"
+    __table_args__ = (
+        Index("ix_sync_exclusoes_sync", "created_at", "id"),
+    )
+
+    entidade: Mapped[str] = mapped_column(
+        String(20),
+        nullable=False,
+        comment="veiculo, abastecimento ou alerta"
+    )
+
+    id_registro: Mapped[UuidType] = mapped_column(
+        UUID(as_uuid=True),
+        nullable=False,
+        comment="ID do registro removido"
+    )
+
+    id_usuario: Mapped[Optional[UuidType]] = mapped_column(
+        UUID(as_uuid=True),
+        nullable=True,
+        comment="Dono do registro (quem deve receber a exclusão); admins recebem todas"
+    )
+
+    def __repr__(self) -> str:
+        return f"<SyncTombstone(entidade='{self.entidade}', id_registro={self.id_registro})>"
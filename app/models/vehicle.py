@@ -1,6 +1,7 @@
-from sqlalchemy import String, Integer, Boolean, ForeignKey, Enum
+from sqlalchemy import String, Integer, Numeric, Boolean, ForeignKey, Enum, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from typing import Optional
+from decimal import Decimal
 from uuid import UUID
 
 from .base import BaseModel
@@ -9,6 +10,17 @@ from app.schemas.enums import VehicleType
 
 class Vehicle(BaseModel):
     __tablename__ = "veiculos"
+    __table_args__ = (
+        # Índice parcial: só os veículos com manutenção vencida (poucos na frota)
+        Index(
+            "ix_veiculos_manutencao_vencida",
+            "id_usuario",
+            "km_atual",
+            postgresql_where=text("manutencao_vencida")
+        ),
+        # Sincronização incremental (/sync): alterados depois do cursor
+        Index("ix_veiculos_sync", text("COALESCE(updated_at, created_at)"), "id"),
+    )
 
     placa: Mapped[str] = mapped_column(
         String(10),
@@ -63,6 +75,12 @@ class Vehicle(BaseModel):
         nullable=True
     )
     
+    km_ultima_manutencao: Mapped[Optional[int]] = mapped_column(
+        Integer,
+        nullable=True,
+        comment="KM em que a última manutenção foi registrada"
+    )
+    
     manutencao_vencida: Mapped[bool] = mapped_column(
         Boolean,
         default=False,
@@ -79,6 +97,21 @@ class Vehicle(BaseModel):
         nullable=True
     )
 
+    # Estado do cálculo de consumo (mantido junto com cada abastecimento)
+    km_ultimo_tanque_cheio: Mapped[Optional[int]] = mapped_column(
+        Integer,
+        nullable=True,
+        comment="KM do último abastecimento com tanque cheio"
+    )
+
+    litros_desde_tanque_cheio: Mapped[Decimal] = mapped_column(
+        Numeric(10, 2),
+        nullable=False,
+        default=0,
+        server_default="0",
+        comment="Litros abastecidos depois do último tanque cheio"
+    )
+
     # Relacionamento com User
     usuario: Mapped["User"] = relationship(
         "User",
@@ -91,11 +124,14 @@ class Vehicle(BaseModel):
         "Maintenance",
         back_populates="veiculo",
         cascade="all, delete-orphan",
-        lazy="select"
+        lazy="select",
+        # FK com ON DELETE CASCADE: o banco apaga, sem carregar a lista antes
+        passive_deletes=True
     )
 
     def __repr__(self) -> str:
         return f"<Vehicle(id={self.id}, placa='{self.placa}', modelo='{self.modelo}')>"
 
 
-    alerts = relationship("Alert", back_populates="veiculo")
+    # FK com ON DELETE CASCADE: o banco apaga os alertas, sem carregá-los antes
+    alerts = relationship("Alert", back_populates="veiculo", passive_deletes=True)
@@ -1,11 +1,14 @@
 from .user_repository import UserRepository
 from .telephone_number_repository import TelephoneNumberRepository
 from .refuel_repository import RefuelRepository
+from .refuel_archive_repository import RefuelArchiveRepository
 from .vehicle_repository import VehicleRepository
 from .maintenance_repository import MaintenanceRepository
 from .alert_repository import AlertRepository
 from .dashboard_repository import DashboardRepository
+from .idempotency_key_repository import IdempotencyKeyRepository
+from .sync_repository import SyncRepository
 
 
 
-__all__ = ["UserRepository", "TelephoneNumberRepository", "RefuelRepository", "VehicleRepository", "MaintenanceRepository", "AlertRepository", "DashboardRepository"]
\ No newline at end of file
+__all__ = ["UserRepository", "TelephoneNumberRepository", "RefuelRepository", "RefuelArchiveRepository", "VehicleRepository", "MaintenanceRepository", "AlertRepository", "DashboardRepository", "IdempotencyKeyRepository", "SyncRepository"]
\ No newline at end of file
@@ -3,19 +3,38 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.models.alert import Alert
+from app.models.refuel import Refuel
+from app.models.vehicle import Vehicle
 from app.schemas.alert import AlertCreate
+from app.integrations.db.batch import id_in
 
 
 class AlertRepository:
 
-    def __init__(self, db: AsyncSession):
+    def __init__(self, db: AsyncSession, auto_commit: bool = True):
         self.db = db
+        # False: unidade de trabalho (os métodos só fazem flush)
+        self.auto_commit = auto_commit
+
+    async def _commit(self) -> None:
+        """Commit imediato ou, em unidade de trabalho, só flush (quem chamou faz o commit)"""
+        if self.auto_commit:
+            await self.db.commit()
+        else:
+            await self.db.flush()
 
     async def create(self, alert_data: AlertCreate) -> Alert:
-        alert = Alert(**alert_data.model_dump())
+        dados = alert_data.model_dump()
+
+        # FK composta (id, data) para refuel particionada
+        if dados["data_abastecimento"] is None:
+            dados["data_abastecimento"] = await self.db.scalar(
+                select(Refuel.data).where(Refuel.id == alert_data.id_abastecimento)
+            )
+
+        alert = Alert(**dados)
         self.db.add(alert)
-        await self.db.commit()
-        await self.db.refresh(alert)
+        await self._commit()
         return alert
 
     async def get_by_id(self, alert_id):
@@ -29,25 +48,70 @@ class AlertRepository:
         # retorna OBJETO Alert
         return result.scalar_one_or_none()
 
+    async def get_by_ids(self, ids, id_usuario=None):
+        """
+        Alertas com os ids pedidos, em uma consulta, na mesma projeção da
+        listagem. id_usuario: só os de veículos dele (None = sem restrição).
+        """
+        query = (
+            select(
+                Alert.id,
+                Alert.id_veiculo,
+                Alert.id_abastecimento,
+                Alert.data_abastecimento,
+                Alert.severity,
+                Alert.message,
+                Alert.resolved,
+                Alert.created_at,
+                Alert.updated_at,
+                Vehicle.placa
+            )
+            .join(Vehicle, Vehicle.id == Alert.id_veiculo)
+            .where(id_in(Alert.id, ids))
+        )
+
+        if id_usuario is not None:
+            query = query.where(Vehicle.id_usuario == id_usuario)
+
+        result = await self.db.execute(query)
+        return result.mappings().all()
+
     async def delete(self, alert: Alert):
         await self.db.delete(alert)
-        await self.db.commit()
+        await self._commit()
 
     async def update_resolved(self, alert: Alert, resolved: bool):
         alert.resolved = resolved
-        await self.db.commit()
-        await self.db.refresh(alert)
+        await self._commit()
         return alert
 
     async def list(
         self,
         id_veiculo=None,
         severity=None,
-        resolved=None
+        resolved=None,
+        skip: int = 0,
+        limit: int = 100
     ):
+        """
+        Listagem por projeção: só as colunas do alerta e a placa do veículo,
+        em um único JOIN (sem carregar Vehicle/Refuel inteiros).
+        Retorna linhas (mappings) no formato do AlertResponse.
+        """
         query = (
-            select(Alert)
-            .options(selectinload(Alert.veiculo))
+            select(
+                Alert.id,
+                Alert.id_veiculo,
+                Alert.id_abastecimento,
+                Alert.data_abastecimento,
+                Alert.severity,
+                Alert.message,
+                Alert.resolved,
+                Alert.created_at,
+                Alert.updated_at,
+                Vehicle.placa
+            )
+            .join(Vehicle, Vehicle.id == Alert.id_veiculo)
         )
 
         if id_veiculo:
@@ -59,10 +123,7 @@ class AlertRepository:
         if resolved is not None:
             query = query.where(Alert.resolved == resolved)
 
-        query = query.order_by(Alert.created_at.desc())
+        query = query.order_by(Alert.created_at.desc()).offset(skip).limit(limit)
 
         result = await self.db.execute(query)
-        alerts = result.scalars().all()
-
-        # retorna lista de OBJETOS
-        return alerts
+        return result.mappings().all()
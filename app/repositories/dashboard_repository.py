@@ -1,10 +1,11 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select, func, union_all
 from datetime import date
 from typing import List, Optional
 
 from app.models.vehicle import Vehicle
 from app.models.refuel import Refuel
+from app.models.refuel_archive import RefuelDailySummary
 from app.schemas.dashboard import DashboardMetricsResponse, ChartData
 
 class DashboardRepository:
@@ -29,36 +30,41 @@ class DashboardRepository:
         total_veiculos = (await self.db.execute(query)).scalar() or 0
 
         # ---------------------------
-        # BUSCA DOS ABASTECIMENTOS
+        # TOTAIS POR PLACA E MÊS
         # ---------------------------
-        refuel_query = select(Refuel)
-
-        if placas:
-            refuel_query = refuel_query.where(Refuel.placa.in_(placas))
-        if data_inicial:
-            refuel_query = refuel_query.where(Refuel.data >= data_inicial)
-        if data_final:
-            refuel_query = refuel_query.where(Refuel.data <= data_final)
-
-        refuels = (await self.db.execute(refuel_query)).scalars().all()
+        # Abastecimentos em refuel + totais diários dos já arquivados
+        # (refuel_resumo_diario): os números não mudam com o arquivamento
+        totais = self._totais_por_placa_mes(placas, data_inicial, data_final)
+        linhas = (await self.db.execute(
+            select(
+                totais.c.placa,
+                totais.c.mes,
+                func.sum(totais.c.abastecimentos).label("abastecimentos"),
+                func.sum(totais.c.valor_total).label("valor_total"),
+                func.sum(totais.c.soma_media).label("soma_media"),
+                func.sum(totais.c.medias).label("medias"),
+            )
+            .group_by(totais.c.placa, totais.c.mes)
+            .order_by(totais.c.mes, totais.c.placa)
+        )).all()
 
         # Quantidade de abastecimentos do período
-        abastecimentos_recent = len(refuels)
+        abastecimentos_recent = sum(int(l.abastecimentos) for l in linhas)
 
         # ---------------------------
         # CUSTOS
         # ---------------------------
-        custo_total = sum(float(r.valor_total) for r in refuels)
+        custo_total = sum(float(l.valor_total) for l in linhas)
 
         # ---------------------------
         # GRÁFICO: Gasto por mês
         # ---------------------------
         gasto_por_mes: dict[str, float] = {}
 
-        for r in refuels:
-            mes = r.data.strftime("%b")  # Jan, Fev, Mar...
+        for l in linhas:
+            mes = l.mes.strftime("%b")  # Jan, Fev, Mar...
             gasto_por_mes.setdefault(mes, 0)
-            gasto_por_mes[mes] += float(r.valor_total)
+            gasto_por_mes[mes] += float(l.valor_total)
 
         gasto_data = [
             ChartData(name=mes, gasto=valor)
@@ -70,14 +76,16 @@ class DashboardRepository:
         # ---------------------------
         consumo_por_veiculo: dict[str, List[float]] = {}
 
-        for r in refuels:
-            if r.media:
-                consumo_por_veiculo.setdefault(r.placa, [])
-                consumo_por_veiculo[r.placa].append(float(r.media))
+        # [soma das médias, quantidade de médias] por placa
+        for l in linhas:
+            if l.medias:
+                acumulado = consumo_por_veiculo.setdefault(l.placa, [0.0, 0])
+                acumulado[0] += float(l.soma_media)
+                acumulado[1] += int(l.medias)
 
         consumo_data = [
-            ChartData(name=placa, consumo=sum(vals) / len(vals))
-            for placa, vals in consumo_por_veiculo.items()
+            ChartData(name=placa, consumo=soma / quantidade)
+            for placa, (soma, quantidade) in consumo_por_veiculo.items()
         ]
 
         # Média da frota
@@ -103,3 +111,45 @@ class DashboardRepository:
                 min(consumo_data, key=lambda x: x.consumo) if consumo_data else None
             )
         )
+
+    @staticmethod
+    def _totais_por_placa_mes(
+        placas: Optional[List[str]],
+        data_inicial: Optional[date],
+        data_final: Optional[date]
+    ):
+        """Totais por placa e mês de refuel e do resumo dos arquivados (UNION ALL)"""
+
+        def filtrar(query, modelo):
+            if placas:
+                query = query.where(modelo.placa.in_(placas))
+            if data_inicial:
+                query = query.where(modelo.data >= data_inicial)
+            if data_final:
+                query = query.where(modelo.data <= data_final)
+            return query
+
+        mes = func.date_trunc("month", Refuel.data).label("mes")
+        quentes = select(
+            Refuel.placa,
+            mes,
+            func.count().label("abastecimentos"),
+            func.sum(Refuel.valor_total).label("valor_total"),
+            func.coalesce(func.sum(Refuel.media), 0).label("soma_media"),
+            func.count(Refuel.media).label("medias"),
+        ).group_by(Refuel.placa, mes)
+
+        mes = func.date_trunc("month", RefuelDailySummary.data).label("mes")
+        arquivados = select(
+            RefuelDailySummary.placa,
+            mes,
+            func.sum(RefuelDailySummary.abastecimentos).label("abastecimentos"),
+            func.sum(RefuelDailySummary.valor_total).label("valor_total"),
+            func.sum(RefuelDailySummary.soma_media).label("soma_media"),
+            func.sum(RefuelDailySummary.medias).label("medias"),
+        ).group_by(RefuelDailySummary.placa, mes)
+
+        return union_all(
+            filtrar(quentes, Refuel),
+            filtrar(arquivados, RefuelDailySummary)
+        ).subquery("totais")
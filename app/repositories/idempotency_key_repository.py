@@ -0,0 +1,91 @@
+from typing import Any, Optional
+from datetime import timedelta
+from uuid import UUID
+
+from sqlalchemy import select, update, delete, func, and_, or_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from uuid_extensions import uuid7
+
+from app.models.idempotency_key import IdempotencyKey
+
+
+class IdempotencyKeyRepository:
+    """Repository das Idempotency-Keys (os métodos não fazem commit)"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def claim(
+        self,
+        id_usuario: UUID,
+        chave: str,
+        hash_requisicao: str,
+        validade: timedelta,
+        abandono: timedelta
+    ) -> bool:
+        """
+        Reserva a chave para esta requisição em um único INSERT. Chave
+        existente e ainda válida não é tocada (retorna False). São
+        reaproveitadas a chave vencida e a reserva sem resposta há mais de
+        `abandono` (processo que caiu no meio da requisição).
+        """
+        stmt = insert(IdempotencyKey).values(
+            id=uuid7(),
+            chave=chave,
+            id_usuario=id_usuario,
+            hash_requisicao=hash_requisicao,
+            expira_em=func.now() + validade
+        )
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_idempotency_usuario_chave",
+            set_={
+                "hash_requisicao": stmt.excluded.hash_requisicao,
+                "expira_em": stmt.excluded.expira_em,
+                "status_code": None,
+                "resposta": None,
+                "created_at": func.now()
+            },
+            where=or_(
+                IdempotencyKey.expira_em < func.now(),
+                and_(
+                    IdempotencyKey.status_code.is_(None),
+                    IdempotencyKey.created_at < func.now() - abandono
+                )
+            )
+        ).returning(IdempotencyKey.id)
+
+        result = await self.db.execute(stmt)
+        return result.scalar_one_or_none() is not None
+
+    async def get(self, id_usuario: UUID, chave: str) -> Optional[IdempotencyKey]:
+        result = await self.db.execute(
+            select(IdempotencyKey).where(
+                IdempotencyKey.id_usuario == id_usuario,
+                IdempotencyKey.chave == chave
+            )
+        )
+        return result.scalar_one_or_none()
+
+    async def save_response(self, id_usuario: UUID, chave: str, status_code: int, resposta: Any) -> None:
+        await self.db.execute(
+            update(IdempotencyKey)
+            .where(IdempotencyKey.id_usuario == id_usuario, IdempotencyKey.chave == chave)
+            .values(status_code=status_code, resposta=resposta, updated_at=func.now())
+        )
+
+    async def release(self, id_usuario: UUID, chave: str) -> None:
+        """Libera a chave de uma requisição que falhou (o cliente pode repetir)"""
+        await self.db.execute(
+            delete(IdempotencyKey).where(
+                IdempotencyKey.id_usuario == id_usuario,
+                IdempotencyKey.chave == chave,
+                IdempotencyKey.status_code.is_(None)
+            )
+        )
+
+    async def delete_expired(self) -> int:
+        result = await self.db.execute(
+            delete(IdempotencyKey).where(IdempotencyKey.expira_em < func.now())
+        )
+        return result.rowcount
@@ -35,10 +35,8 @@ class MaintenanceRepository:
 
     async def get_by_id(self, maintenance_id: UUID) -> Maintenance:
         """Busca uma manutenção pelo ID"""
-        result = await self.db.execute(
-            select(Maintenance).where(Maintenance.id == maintenance_id)
-        )
-        maintenance = result.scalar_one_or_none()
+        # Mapa de identidade da sessão: entidade já carregada nesta requisição não gera nova consulta
+        maintenance = await self.db.get(Maintenance, maintenance_id)
         if not maintenance:
             raise ManutencaoNotFoundError.by_id(maintenance_id)
         return maintenance
@@ -0,0 +1,88 @@
+from typing import List
+from datetime import date
+
+from sqlalchemy import select, func, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.refuel import Refuel
+from app.models.refuel_archive import RefuelArchive
+
+
+# Colunas copiadas de refuel para refuel_arquivo
+ARCHIVE_COLUMNS = ", ".join(c.name for c in RefuelArchive.__table__.c if c.name != "arquivado_em")
+
+# Move um lote de abastecimentos antigos de uma placa para refuel_arquivo e
+# soma os totais no resumo diário, em um único comando.
+# Fica em refuel o último tanque cheio antes do corte (âncora) e tudo depois
+# dele: o estado de consumo do veículo e o recálculo de médias continuam
+# partindo de linhas quentes. Abastecimentos com alertas também ficam (FK).
+ARCHIVE_BATCH_SQL = f"""
+WITH ancora AS (
+    SELECT MAX(km) AS km
+    FROM refuel
+    WHERE placa = :placa AND tanque_cheio AND data < :corte
+),
+alvo AS (
+    SELECT r.id, r.data
+    FROM refuel r, ancora a
+    WHERE r.placa = :placa
+      AND r.data < :corte
+      AND r.km < a.km
+      AND NOT EXISTS (SELECT 1 FROM alerts al WHERE al.id_abastecimento = r.id)
+    ORDER BY r.km
+    LIMIT :lote
+),
+movidos AS (
+    DELETE FROM refuel r
+    USING alvo
+    WHERE r.id = alvo.id AND r.data = alvo.data
+    RETURNING r.*
+),
+arquivados AS (
+    INSERT INTO refuel_arquivo ({ARCHIVE_COLUMNS})
+    SELECT {ARCHIVE_COLUMNS} FROM movidos
+    RETURNING placa, data, litros, valor_total, media
+),
+resumo AS (
+    INSERT INTO refuel_resumo_diario AS d (placa, data, abastecimentos, litros, valor_total, soma_media, medias)
+    SELECT placa, data, COUNT(*), SUM(litros), SUM(valor_total), COALESCE(SUM(media), 0), COUNT(media)
+    FROM arquivados
+    GROUP BY placa, data
+    ON CONFLICT (placa, data) DO UPDATE SET
+        abastecimentos = d.abastecimentos + EXCLUDED.abastecimentos,
+        litros = d.litros + EXCLUDED.litros,
+        valor_total = d.valor_total + EXCLUDED.valor_total,
+        soma_media = d.soma_media + EXCLUDED.soma_media,
+        medias = d.medias + EXCLUDED.medias
+)
+SELECT COUNT(*) FROM arquivados
+"""
+
+
+class RefuelArchiveRepository:
+    """Repository do arquivo de abastecimentos antigos"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_placas_before(self, corte: date) -> List[str]:
+        """Placas com abastecimentos anteriores ao corte ainda em refuel"""
+        result = await self.db.execute(
+            select(Refuel.placa).where(Refuel.data < corte).distinct().order_by(Refuel.placa)
+        )
+        return list(result.scalars().all())
+
+    async def archive_batch(self, placa: str, corte: date, lote: int) -> int:
+        """
+        Arquiva até `lote` abastecimentos da placa anteriores ao corte
+        (não faz commit). Retorna quantos foram movidos; 0 = nada mais a arquivar.
+        """
+        result = await self.db.execute(
+            text(ARCHIVE_BATCH_SQL),
+            {"placa": placa, "corte": corte, "lote": lote}
+        )
+        return result.scalar_one()
+
+    async def count(self) -> int:
+        result = await self.db.execute(select(func.count()).select_from(RefuelArchive))
+        return result.scalar_one()
@@ -1,20 +1,129 @@
-from typing import Optional, List
+from typing import Optional, List, AsyncIterator, Sequence
 from datetime import date
+from uuid import UUID
 from decimal import Decimal
 
-from sqlalchemy import select, func
+from sqlalchemy import select, func, text, union_all, Row
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.refuel import Refuel
+from app.models.refuel_archive import RefuelArchive
 from app.schemas.refuel import RefuelCreate, RefuelUpdate
 from app.common.exceptions.abastecimento_exceptions import AbastecimentoNotFoundError
+from app.integrations.db.batch import id_in
+
+
+# Recalcula a média dos abastecimentos de uma placa a partir de :km_inicio.
+# A janela começa no último tanque cheio antes de :km_inicio (âncora). A média
+# de cada tanque cheio é a distância até o tanque cheio anterior (km
+# estritamente menor) dividida pelos seus litros mais os parciais com km
+# estritamente entre os dois, como no cadastro (create_refuel).
+# Âncora e litros também vêm de refuel_arquivo (edição abaixo do corte do
+# arquivamento); só as linhas de refuel são atualizadas.
+RECALCULATE_MEDIAS_SQL = """
+WITH historico AS (
+    SELECT id, km, litros, tanque_cheio FROM refuel WHERE placa = :placa
+    UNION ALL
+    SELECT id, km, litros, tanque_cheio FROM refuel_arquivo WHERE placa = :placa
+),
+ancora AS (
+    SELECT MAX(km) AS km
+    FROM historico
+    WHERE tanque_cheio AND km < :km_inicio
+),
+trecho AS (
+    SELECT r.id, r.km, r.litros, COALESCE(r.tanque_cheio, false) AS cheio
+    FROM historico r, ancora a
+    WHERE a.km IS NULL OR r.km >= a.km
+),
+-- Litros parciais (sem tanque cheio) antes do KM da linha e até ele
+acumulado AS (
+    SELECT
+        id,
+        km,
+        litros,
+        cheio,
+        COALESCE(SUM(CASE WHEN NOT cheio THEN litros END) OVER (
+            ORDER BY km RANGE BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING
+        ), 0) AS parciais_antes,
+        COALESCE(SUM(CASE WHEN NOT cheio THEN litros END) OVER (
+            ORDER BY km RANGE BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW
+        ), 0) AS parciais_ate
+    FROM trecho
+),
+-- Como no cadastro: tanque cheio anterior com km estritamente menor e só
+-- os parciais com km_anterior < km < km do tanque cheio
+cheios AS (
+    SELECT
+        id,
+        km,
+        litros,
+        parciais_antes,
+        MAX(km) OVER anteriores AS km_anterior,
+        MAX(parciais_ate) OVER anteriores AS parciais_ate_anterior
+    FROM acumulado
+    WHERE cheio
+    WINDOW anteriores AS (ORDER BY km RANGE BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING)
+),
+nova AS (
+    SELECT
+        a.id,
+        CASE
+            WHEN c.km_anterior IS NOT NULL
+            THEN ROUND(
+                (c.km - c.km_anterior)
+                / NULLIF(c.litros + c.parciais_antes - c.parciais_ate_anterior, 0),
+                2
+            )
+        END AS media
+    FROM acumulado a
+    LEFT JOIN cheios c ON c.id = a.id
+    WHERE a.km >= :km_inicio
+)
+UPDATE refuel r
+SET media = n.media,
+    updated_at = now()
+FROM nova n
+WHERE r.id = n.id AND r.media IS DISTINCT FROM n.media
+RETURNING r.id
+"""
+
+# Colunas da exportação (mesmos campos do RefuelResponse)
+EXPORT_COLUMNS = (
+    "id", "data", "hora", "placa", "km", "litros", "valor_litro", "valor_total",
+    "tanque_cheio", "media", "tipo_combustivel", "posto", "id_usuario",
+    "created_at", "updated_at",
+)
+
+# Linhas buscadas por ida ao banco no cursor da exportação
+EXPORT_BATCH_SIZE = 1000
+
+
+def refuel_history(*colunas: str):
+    """
+    Subconsulta com todos os abastecimentos: refuel + refuel_arquivo
+    (para histórico completo de médias, IA e análises).
+    """
+    return union_all(
+        select(*(Refuel.__table__.c[coluna] for coluna in colunas)),
+        select(*(RefuelArchive.__table__.c[coluna] for coluna in colunas)),
+    ).subquery("historico")
 
 
 class RefuelRepository:
     """Repository para acesso a dados de abastecimento"""
     
-    def __init__(self, db: AsyncSession):
+    def __init__(self, db: AsyncSession, auto_commit: bool = True):
         self.db = db
+        # False: unidade de trabalho (os métodos só fazem flush)
+        self.auto_commit = auto_commit
+
+    async def _commit(self) -> None:
+        """Commit imediato ou, em unidade de trabalho, só flush (quem chamou faz o commit)"""
+        if self.auto_commit:
+            await self.db.commit()
+        else:
+            await self.db.flush()
 
     async def create(self, refuel_data: RefuelCreate) -> Refuel:
         """
@@ -36,22 +145,28 @@ class RefuelRepository:
         )
 
         self.db.add(db_refuel)
-        await self.db.commit()
-        await self.db.refresh(db_refuel)
+        await self._commit()
         return db_refuel
     
     async def get_by_id(self, refuel_id: int) -> Refuel:
         """Busca um abastecimento pelo ID - lança exception se não encontrar"""
-        result = await self.db.execute(
-            select(Refuel).where(Refuel.id == refuel_id)
-        )
-        refuel = result.scalar_one_or_none()
+        # Mapa de identidade da sessão: entidade já carregada nesta requisição não gera nova consulta
+        refuel = await self.db.get(Refuel, refuel_id)
         
         if not refuel:
             raise AbastecimentoNotFoundError.by_id(refuel_id)
         
         return refuel
     
+    async def get_by_ids(self, ids: Sequence[UUID], id_usuario: Optional[UUID] = None) -> List[Refuel]:
+        """Abastecimentos com os ids pedidos, em uma consulta; id_usuario: só os dele (None = sem restrição)"""
+        query = select(Refuel).where(id_in(Refuel.id, ids))
+        if id_usuario is not None:
+            query = query.where(Refuel.id_usuario == id_usuario)
+
+        result = await self.db.execute(query)
+        return list(result.scalars().all())
+
     async def get_all(
         self,
         skip: int = 0,
@@ -59,22 +174,11 @@ class RefuelRepository:
         placa: Optional[str] = None,
         id_usuario: Optional[str] = None,
         data_inicio: Optional[date] = None,
-        data_fim: Optional[date] = None
+        data_fim: Optional[date] = None,
+        opcoes: Sequence = ()
     ) -> List[Refuel]:
-        """Busca todos os abastecimentos com filtros opcionais"""
-        query = select(Refuel)
-        
-        if placa:
-            query = query.where(Refuel.placa == placa)
-        
-        if id_usuario:
-            query = query.where(Refuel.id_usuario == id_usuario)
-        
-        if data_inicio:
-            query = query.where(Refuel.data >= data_inicio)
-        
-        if data_fim:
-            query = query.where(Refuel.data <= data_fim)
+        """Busca todos os abastecimentos com filtros opcionais (opcoes: load_only/selectinload do ?fields=/?expand=)"""
+        query = self._apply_filters(select(Refuel).options(*opcoes), placa, id_usuario, data_inicio, data_fim)
         
         query = (
             query
@@ -94,8 +198,47 @@ class RefuelRepository:
         data_fim: Optional[date] = None
     ) -> int:
         """Conta abastecimentos com filtros opcionais"""
-        query = select(func.count(Refuel.id))
+        query = self._apply_filters(
+            select(func.count(Refuel.id)), placa, id_usuario, data_inicio, data_fim
+        )
         
+        result = await self.db.execute(query)
+        return result.scalar_one()
+
+    async def stream_for_export(
+        self,
+        placa: Optional[str] = None,
+        id_usuario: Optional[str] = None,
+        data_inicio: Optional[date] = None,
+        data_fim: Optional[date] = None
+    ) -> AsyncIterator[List[Row]]:
+        """
+        Abastecimentos filtrados em lotes de EXPORT_BATCH_SIZE linhas, lidos
+        por cursor no servidor: a memória não cresce com o tamanho do resultado.
+        """
+        query = self._apply_filters(
+            select(*(Refuel.__table__.c[coluna] for coluna in EXPORT_COLUMNS)),
+            placa, id_usuario, data_inicio, data_fim
+        )
+        query = (
+            query
+            .order_by(Refuel.data, Refuel.hora, Refuel.id)
+            .execution_options(yield_per=EXPORT_BATCH_SIZE)
+        )
+
+        result = await self.db.stream(query)
+        async for lote in result.partitions():
+            yield lote
+
+    @staticmethod
+    def _apply_filters(
+        query,
+        placa: Optional[str],
+        id_usuario: Optional[str],
+        data_inicio: Optional[date],
+        data_fim: Optional[date]
+    ):
+        """Filtros comuns da listagem, contagem e exportação"""
         if placa:
             query = query.where(Refuel.placa == placa)
         
@@ -108,8 +251,7 @@ class RefuelRepository:
         if data_fim:
             query = query.where(Refuel.data <= data_fim)
         
-        result = await self.db.execute(query)
-        return result.scalar_one()
+        return query
 
     async def update(self, refuel_id: int, refuel_data: RefuelUpdate) -> Refuel:
         """Atualiza um abastecimento"""
@@ -119,8 +261,7 @@ class RefuelRepository:
         for field, value in update_data.items():
             setattr(refuel, field, value)
         
-        await self.db.commit()
-        await self.db.refresh(refuel)
+        await self._commit()
         return refuel
 
     async def delete(self, refuel_id: int) -> None:
@@ -128,7 +269,7 @@ class RefuelRepository:
         refuel = await self.get_by_id(refuel_id)
         
         await self.db.delete(refuel)
-        await self.db.commit()
+        await self._commit()
 
     async def get_last_refuel_by_placa(
         self, 
@@ -173,3 +314,72 @@ class RefuelRepository:
         total_litros = result.scalar_one_or_none()
         
         return total_litros or Decimal(0)
+
+    async def recalculate_medias(self, placa: str, km_inicio: int) -> int:
+        """
+        Recalcula no banco a média dos abastecimentos da placa com
+        km >= km_inicio (não faz commit). Retorna quantos mudaram.
+        """
+        result = await self.db.execute(
+            text(RECALCULATE_MEDIAS_SQL),
+            {"placa": placa, "km_inicio": km_inicio}
+        )
+        return len(result.all())
+
+    async def count_medias(self, placa: str) -> int:
+        """Quantidade de médias da placa (tamanho do histórico da IA), incluindo os arquivados"""
+        historico = refuel_history("placa", "media")
+
+        result = await self.db.execute(
+            select(func.count(historico.c.media)).where(historico.c.placa == placa)
+        )
+        return result.scalar_one()
+
+    async def get_media_stats(self, placa: str) -> Optional[dict]:
+        """
+        count/mean/m2 das médias da placa (mesmo formato das estatísticas
+        acumuladas da IA), incluindo os arquivados. None se não houver médias.
+        """
+        historico = refuel_history("placa", "media")
+
+        result = await self.db.execute(
+            select(
+                func.count(historico.c.media),
+                func.avg(historico.c.media),
+                func.var_pop(historico.c.media)
+            ).where(historico.c.placa == placa)
+        )
+        count, mean, variancia = result.one()
+
+        if not count:
+            return None
+
+        return {"count": count, "mean": float(mean), "m2": float(variancia) * count}
+
+    async def get_medias_from_km(self, placa: str, km_inicio: int) -> tuple[int, List[float]]:
+        """
+        Quantidade de médias antes de km_inicio e as médias a partir dele,
+        na ordem do histórico da IA (por KM). Inclui os abastecimentos arquivados.
+        """
+        historico = refuel_history("id", "placa", "km", "media")
+
+        result = await self.db.execute(
+            select(func.count(historico.c.media)).where(
+                historico.c.placa == placa,
+                historico.c.km < km_inicio
+            )
+        )
+        n_prefixo = result.scalar_one()
+
+        result = await self.db.execute(
+            select(historico.c.media)
+            .where(
+                historico.c.placa == placa,
+                historico.c.km >= km_inicio,
+                historico.c.media.is_not(None)
+            )
+            .order_by(historico.c.km, historico.c.id)
+        )
+        sufixo = [float(media) for media in result.scalars().all()]
+
+        return n_prefixo, sufixo
\ No newline at end of file
@@ -0,0 +1,162 @@
+from typing import List, Optional, Sequence
+from datetime import datetime
+from uuid import UUID
+
+from sqlalchemy import select, update, delete, func, text, tuple_, Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.alert import Alert
+from app.models.refuel import Refuel
+from app.models.sync_tombstone import SyncTombstone
+from app.models.vehicle import Vehicle
+
+# Posição do cursor em uma entidade: (momento, id) da última linha entregue.
+# id None = tudo antes do momento já foi entregue.
+Posicao = tuple[datetime, Optional[UUID]]
+
+# Agora e o início da transação aberta mais antiga de outra conexão do banco.
+# created_at/updated_at são now() (início da transação que gravou): nenhuma
+# linha ainda invisível tem momento anterior a esse início. Transações de
+# outro usuário do banco só aparecem com pg_read_all_stats (a aplicação e os
+# jobs usam o mesmo usuário).
+SYNC_HORIZON_SQL = """
+SELECT now(), LEAST(now(), (
+    SELECT MIN(xact_start)
+    FROM pg_stat_activity
+    WHERE datname = current_database()
+      AND backend_type = 'client backend'
+      AND pid <> pg_backend_pid()
+))
+"""
+
+
+class SyncRepository:
+    """
+    Consultas da sincronização incremental: linhas alteradas depois de uma
+    posição, em ordem (momento da alteração, id uuid7). Cada consulta é uma
+    varredura de índice a partir do cursor (ix_*_sync), proporcional ao que
+    mudou e não ao tamanho do histórico.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def now(self) -> datetime:
+        return await self.db.scalar(select(func.now()))
+
+    async def horizon(self) -> tuple[datetime, datetime]:
+        """(agora, limite): alterações com momento < limite já estão todas commitadas"""
+        result = await self.db.execute(text(SYNC_HORIZON_SQL))
+        agora, limite = result.one()
+        return agora, limite
+
+    @staticmethod
+    def _page(query, momento, id_coluna, desde: Optional[Posicao], ate: datetime, limit: int):
+        """(momento, id) > desde (sem id: momento >= desde) e momento < ate, em ordem"""
+        if desde is not None:
+            instante, ultimo_id = desde
+            if ultimo_id is None:
+                query = query.where(momento >= instante)
+            else:
+                query = query.where(tuple_(momento, id_coluna) > tuple_(instante, ultimo_id))
+
+        return query.where(momento < ate).order_by(momento, id_coluna).limit(limit)
+
+    async def changed_vehicles(
+        self,
+        desde: Optional[Posicao],
+        ate: datetime,
+        limit: int,
+        id_usuario: Optional[UUID] = None
+    ) -> List[tuple[datetime, Vehicle]]:
+        momento = func.coalesce(Vehicle.updated_at, Vehicle.created_at)
+        query = select(momento, Vehicle)
+        if id_usuario:
+            query = query.where(Vehicle.id_usuario == id_usuario)
+
+        result = await self.db.execute(self._page(query, momento, Vehicle.id, desde, ate, limit))
+        return [(m, v) for m, v in result.all()]
+
+    async def changed_refuels(
+        self,
+        desde: Optional[Posicao],
+        ate: datetime,
+        limit: int,
+        id_usuario: Optional[UUID] = None
+    ) -> List[tuple[datetime, Refuel]]:
+        momento = func.coalesce(Refuel.updated_at, Refuel.created_at)
+        query = select(momento, Refuel)
+        if id_usuario:
+            query = query.where(Refuel.id_usuario == id_usuario)
+
+        result = await self.db.execute(self._page(query, momento, Refuel.id, desde, ate, limit))
+        return [(m, r) for m, r in result.all()]
+
+    async def changed_alerts(
+        self,
+        desde: Optional[Posicao],
+        ate: datetime,
+        limit: int,
+        id_usuario: Optional[UUID] = None
+    ) -> Sequence[Row]:
+        """Projeção no formato do AlertResponse (placa inclusa), como na listagem"""
+        query = (
+            select(
+                Alert.id,
+                Alert.id_veiculo,
+                Alert.id_abastecimento,
+                Alert.data_abastecimento,
+                Alert.severity,
+                Alert.message,
+                Alert.resolved,
+                Alert.created_at,
+                Alert.updated_at,
+                Vehicle.placa
+            )
+            .join(Vehicle, Vehicle.id == Alert.id_veiculo)
+        )
+        if id_usuario:
+            query = query.where(Vehicle.id_usuario == id_usuario)
+
+        result = await self.db.execute(self._page(query, Alert.updated_at, Alert.id, desde, ate, limit))
+        return result.mappings().all()
+
+    async def tombstones(
+        self,
+        desde: Optional[Posicao],
+        ate: datetime,
+        limit: int,
+        id_usuario: Optional[UUID] = None
+    ) -> List[SyncTombstone]:
+        query = select(SyncTombstone)
+        if id_usuario:
+            query = query.where(SyncTombstone.id_usuario == id_usuario)
+
+        result = await self.db.execute(
+            self._page(query, SyncTombstone.created_at, SyncTombstone.id, desde, ate, limit)
+        )
+        return list(result.scalars().all())
+
+    def add_tombstone(self, entidade: str, id_registro: UUID, id_usuario: Optional[UUID]) -> None:
+        """Registra a exclusão na sessão (vai no mesmo commit da exclusão)"""
+        self.db.add(SyncTombstone(entidade=entidade, id_registro=id_registro, id_usuario=id_usuario))
+
+    async def add_vehicle_alert_tombstones(self, id_veiculo: UUID, id_usuario: Optional[UUID]) -> List[UUID]:
+        """Exclusão de todos os alertas do veículo para id_usuario; retorna os ids"""
+        result = await self.db.execute(select(Alert.id).where(Alert.id_veiculo == id_veiculo))
+        ids = list(result.scalars().all())
+        for id_alerta in ids:
+            self.add_tombstone("alerta", id_alerta, id_usuario)
+        return ids
+
+    async def touch_vehicle_alerts(self, id_veiculo: UUID) -> None:
+        """Alertas do veículo voltam ao /sync (updated_at = agora), ex.: troca de responsável"""
+        await self.db.execute(
+            update(Alert).where(Alert.id_veiculo == id_veiculo).values(updated_at=func.now())
+        )
+
+    async def delete_tombstones_before(self, antes: datetime) -> int:
+        result = await self.db.execute(
+            delete(SyncTombstone).where(SyncTombstone.created_at < antes)
+        )
+        return result.rowcount
@@ -31,10 +31,8 @@ class TelephoneNumberRepository:
     
     async def get_by_id(self, tel_id: UUID) -> TelephoneNumber:
         """Busca um número de telefone pelo ID - lança exception se não encontrar"""
-        result = await self.db.execute(
-            select(TelephoneNumber).where(TelephoneNumber.id == tel_id)
-        )
-        telephone = result.scalar_one_or_none()
+        # Mapa de identidade da sessão: entidade já carregada nesta requisição não gera nova consulta
+        telephone = await self.db.get(TelephoneNumber, tel_id)
         
         if not telephone:
             raise TelephoneNumberNotFoundError(f"Telefone com ID {tel_id} não encontrado")
@@ -1,4 +1,4 @@
-from typing import Optional, List
+from typing import Optional, List, Sequence
 from uuid import UUID
 
 from sqlalchemy import select, func, or_
@@ -34,10 +34,8 @@ class UserRepository:
 
     async def get_by_id(self, user_id: UUID) -> User:
         """Busca um usuário pelo ID"""
-        result = await self.db.execute(
-            select(User).where(User.id == user_id)
-        )
-        user = result.scalar_one_or_none()
+        # Mapa de identidade da sessão: entidade já carregada nesta requisição não gera nova consulta
+        user = await self.db.get(User, user_id)
         if not user:
             raise UserNotFoundError.by_id(user_id)
         return user
@@ -68,10 +66,11 @@ class UserRepository:
         limit: int = 100,
         status: Optional[UserStatus] = None,
         user_type: Optional[UserType] = None,
-        search: Optional[str] = None
+        search: Optional[str] = None,
+        opcoes: Sequence = ()
     ) -> List[User]:
-        """Lista usuários com filtros e paginação"""
-        query = select(User)
+        """Lista usuários com filtros e paginação (opcoes: load_only/selectinload do ?fields=/?expand=)"""
+        query = select(User).options(*opcoes)
         
         # Filtro por status
         if status is not None:
@@ -1,19 +1,105 @@
-from typing import Optional, List
+from typing import Optional, List, Sequence
 from uuid import UUID
 
-from sqlalchemy import select, func, or_
+from sqlalchemy import select, update, case, func, or_, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.vehicle import Vehicle
 from app.schemas.vehicle import VehicleCreate, VehicleUpdate
 from app.schemas.enums import VehicleType
 from app.common.exceptions.veiculo_exceptions import VeiculoNotFoundError
+from app.integrations.db.batch import id_in
+
+
+# Recalcula o estado de consumo (último tanque cheio + litros desde então)
+# a partir dos abastecimentos, em um único UPDATE. Só grava linhas que mudaram.
+REFRESH_CONSUMPTION_STATE_SQL = """
+WITH ultimo AS (
+    SELECT placa, MAX(km) AS km
+    FROM refuel
+    WHERE tanque_cheio
+    GROUP BY placa
+),
+estado AS (
+    SELECT
+        v.id,
+        u.km AS km_ultimo_tanque_cheio,
+        COALESCE(SUM(r.litros), 0) AS litros_desde_tanque_cheio
+    FROM veiculos v
+    LEFT JOIN ultimo u ON u.placa = v.placa
+    LEFT JOIN refuel r ON r.placa = v.placa AND r.km > u.km
+    WHERE CAST(:placa AS VARCHAR) IS NULL OR v.placa = :placa
+    GROUP BY v.id, u.km
+)
+UPDATE veiculos v
+SET km_ultimo_tanque_cheio = e.km_ultimo_tanque_cheio,
+    litros_desde_tanque_cheio = e.litros_desde_tanque_cheio
+FROM estado e
+WHERE v.id = e.id
+  AND (
+    v.km_ultimo_tanque_cheio IS DISTINCT FROM e.km_ultimo_tanque_cheio
+    OR v.litros_desde_tanque_cheio IS DISTINCT FROM e.litros_desde_tanque_cheio
+  )
+RETURNING v.placa
+"""
+
+
+# Recalcula km_prox_manutencao e manutencao_vencida da frota inteira em um
+# único UPDATE. A base é a manutenção mais recente (registrada no veículo ou
+# concluída em manutencoes); sem base ou sem frequência, km_prox_manutencao
+# fica como está. Só grava linhas que mudaram.
+RECOMPUTE_MAINTENANCE_SQL = """
+WITH concluida AS (
+    SELECT placa, MAX(km_atual) AS km
+    FROM manutencoes
+    WHERE status = 'CONCLUIDA'
+    GROUP BY placa
+),
+proxima AS (
+    SELECT
+        v.id,
+        COALESCE(
+            GREATEST(v.km_ultima_manutencao, c.km) + v.frequencia_km_manutencao,
+            v.km_prox_manutencao
+        ) AS km_prox_manutencao
+    FROM veiculos v
+    LEFT JOIN concluida c ON c.placa = v.placa
+),
+novo AS (
+    SELECT
+        p.id,
+        p.km_prox_manutencao,
+        COALESCE(v.km_atual >= p.km_prox_manutencao, FALSE) AS manutencao_vencida
+    FROM proxima p
+    JOIN veiculos v ON v.id = p.id
+)
+UPDATE veiculos v
+SET km_prox_manutencao = n.km_prox_manutencao,
+    manutencao_vencida = n.manutencao_vencida,
+    updated_at = now()
+FROM novo n
+WHERE v.id = n.id
+  AND (
+    v.km_prox_manutencao IS DISTINCT FROM n.km_prox_manutencao
+    OR v.manutencao_vencida IS DISTINCT FROM n.manutencao_vencida
+  )
+RETURNING v.placa, v.manutencao_vencida
+"""
 
 
 class VehicleRepository:
 
-    def __init__(self, db: AsyncSession):
+    def __init__(self, db: AsyncSession, auto_commit: bool = True):
         self.db = db
+        # False: unidade de trabalho (os métodos só fazem flush)
+        self.auto_commit = auto_commit
+
+    async def _commit(self) -> None:
+        """Commit imediato ou, em unidade de trabalho, só flush (quem chamou faz o commit)"""
+        if self.auto_commit:
+            await self.db.commit()
+        else:
+            await self.db.flush()
 
     async def create(self, vehicle_data: VehicleCreate) -> Vehicle:
         """Cria um novo veículo no banco de dados"""
@@ -33,20 +119,26 @@ class VehicleRepository:
         )
         
         self.db.add(db_vehicle)
-        await self.db.commit()
-        await self.db.refresh(db_vehicle)
+        await self._commit()
         return db_vehicle
 
     async def get_by_id(self, vehicle_id: UUID) -> Vehicle:
         """Busca um veículo pelo ID"""
-        result = await self.db.execute(
-            select(Vehicle).where(Vehicle.id == vehicle_id)
-        )
-        vehicle = result.scalar_one_or_none()
+        # Mapa de identidade da sessão: entidade já carregada nesta requisição não gera nova consulta
+        vehicle = await self.db.get(Vehicle, vehicle_id)
         if not vehicle:
             raise VeiculoNotFoundError.by_id(vehicle_id)
         return vehicle
 
+    async def get_by_ids(self, ids: Sequence[UUID], id_usuario: Optional[UUID] = None) -> List[Vehicle]:
+        """Veículos com os ids pedidos, em uma consulta; id_usuario: só os dele (None = sem restrição)"""
+        query = select(Vehicle).where(id_in(Vehicle.id, ids))
+        if id_usuario is not None:
+            query = query.where(Vehicle.id_usuario == id_usuario)
+
+        result = await self.db.execute(query)
+        return list(result.scalars().all())
+
     async def get_by_placa(self, placa: str) -> Vehicle:
         """Busca um veículo pela placa"""
         result = await self.db.execute(
@@ -65,10 +157,11 @@ class VehicleRepository:
         tipo: Optional[VehicleType] = None,
         frota: Optional[str] = None,
         manutencao_vencida: Optional[bool] = None,
-        search: Optional[str] = None
+        search: Optional[str] = None,
+        opcoes: Sequence = ()
     ) -> List[Vehicle]:
-        """Lista veículos com filtros e paginação"""
-        query = select(Vehicle)
+        """Lista veículos com filtros e paginação (opcoes: load_only/selectinload do ?fields=/?expand=)"""
+        query = select(Vehicle).options(*opcoes)
         
         # Filtro por usuário
         if id_usuario is not None:
@@ -134,24 +227,19 @@ class VehicleRepository:
         result = await self.db.execute(query)
         return result.scalar()
 
-    async def update(self, vehicle_id: UUID, vehicle_data: VehicleUpdate) -> Vehicle:
-        """Atualiza um veículo existente"""
-        db_vehicle = await self.get_by_id(vehicle_id)
-
+    async def update(self, db_vehicle: Vehicle, vehicle_data: VehicleUpdate) -> Vehicle:
+        """Atualiza um veículo já carregado"""
         update_data = vehicle_data.model_dump(exclude_unset=True)
         for field, value in update_data.items():
             setattr(db_vehicle, field, value)
 
-        await self.db.commit()
-        await self.db.refresh(db_vehicle)
+        await self._commit()
         return db_vehicle
 
-    async def delete(self, vehicle_id: UUID) -> bool:
-        """Remove permanentemente um veículo do banco"""
-        db_vehicle = await self.get_by_id(vehicle_id)
-
+    async def delete(self, db_vehicle: Vehicle) -> bool:
+        """Remove permanentemente um veículo já carregado"""
         await self.db.delete(db_vehicle)
-        await self.db.commit()
+        await self._commit()
         return True
 
     async def exists_placa(self, placa: str, exclude_vehicle_id: Optional[UUID] = None) -> bool:
@@ -164,33 +252,71 @@ class VehicleRepository:
         result = await self.db.execute(query)
         return result.scalar_one_or_none() is not None
 
-    async def update_km(self, vehicle_id: UUID, km_atual: int) -> Vehicle:
-        """Atualiza a quilometragem atual e verifica manutenção vencida"""
-        db_vehicle = await self.get_by_id(vehicle_id)
-        
-        db_vehicle.km_atual = km_atual
-        
-        # Verifica se a manutenção está vencida (apenas se km_prox_manutencao estiver definido)
-        if db_vehicle.km_prox_manutencao is not None and km_atual >= db_vehicle.km_prox_manutencao:
-            db_vehicle.manutencao_vencida = True
-        
-        await self.db.commit()
-        await self.db.refresh(db_vehicle)
-        return db_vehicle
+    async def update_km(
+        self,
+        vehicle_id: UUID,
+        km_atual: int,
+        id_usuario: Optional[UUID] = None
+    ) -> Optional[Vehicle]:
+        """
+        Atualiza a quilometragem atual e verifica manutenção vencida em um
+        único UPDATE ... RETURNING. Com id_usuario, só altera se o veículo
+        for dele. Retorna None se nenhuma linha foi alterada.
+        """
+        stmt = (
+            update(Vehicle)
+            .where(Vehicle.id == vehicle_id)
+            .values(
+                km_atual=km_atual,
+                # Vence se km_prox_manutencao estiver definido e for atingido
+                manutencao_vencida=case(
+                    (Vehicle.km_prox_manutencao <= km_atual, True),
+                    else_=Vehicle.manutencao_vencida
+                )
+            )
+            .returning(Vehicle)
+        )
 
-    async def registrar_manutencao(self, vehicle_id: UUID) -> Vehicle:
-        """Registra que a manutenção foi realizada e calcula próxima"""
-        db_vehicle = await self.get_by_id(vehicle_id)
-        
-        # Calcula próxima manutenção apenas se frequencia_km_manutencao estiver definida
-        if db_vehicle.frequencia_km_manutencao is not None:
-            db_vehicle.km_prox_manutencao = db_vehicle.km_atual + db_vehicle.frequencia_km_manutencao
-        
-        db_vehicle.manutencao_vencida = False
-        
-        await self.db.commit()
-        await self.db.refresh(db_vehicle)
-        return db_vehicle
+        return await self._update_returning(stmt, id_usuario)
+
+    async def registrar_manutencao(
+        self,
+        vehicle_id: UUID,
+        id_usuario: Optional[UUID] = None
+    ) -> Optional[Vehicle]:
+        """
+        Registra que a manutenção foi realizada e calcula a próxima em um
+        único UPDATE ... RETURNING. Com id_usuario, só altera se o veículo
+        for dele. Retorna None se nenhuma linha foi alterada.
+        """
+        stmt = (
+            update(Vehicle)
+            .where(Vehicle.id == vehicle_id)
+            .values(
+                # Próxima manutenção só muda se frequencia_km_manutencao estiver definida
+                km_prox_manutencao=func.coalesce(
+                    Vehicle.km_atual + Vehicle.frequencia_km_manutencao,
+                    Vehicle.km_prox_manutencao
+                ),
+                # Base para o recálculo em lote (recompute_maintenance)
+                km_ultima_manutencao=Vehicle.km_atual,
+                manutencao_vencida=False
+            )
+            .returning(Vehicle)
+        )
+
+        return await self._update_returning(stmt, id_usuario)
+
+    async def _update_returning(self, stmt, id_usuario: Optional[UUID]) -> Optional[Vehicle]:
+        if id_usuario is not None:
+            stmt = stmt.where(Vehicle.id_usuario == id_usuario)
+
+        result = await self.db.execute(stmt)
+        vehicle = result.scalar_one_or_none()
+
+        if vehicle is not None:
+            await self._commit()
+        return vehicle
 
     async def get_vehicles_manutencao_vencida(self, id_usuario: Optional[UUID] = None) -> List[Vehicle]:
         """Busca veículos com manutenção vencida"""
@@ -203,3 +329,30 @@ class VehicleRepository:
         
         result = await self.db.execute(query)
         return result.scalars().all()
+
+    async def recompute_maintenance(self) -> List[tuple[str, bool]]:
+        """
+        Recalcula km_prox_manutencao / manutencao_vencida de todos os veículos
+        (após mudar frequencia_km_manutencao ou corrigir dados em lote).
+        Retorna (placa, manutencao_vencida) das linhas alteradas.
+        """
+        result = await self.db.execute(text(RECOMPUTE_MAINTENANCE_SQL))
+        alterados = [(placa, vencida) for placa, vencida in result.all()]
+
+        await self._commit()
+        return alterados
+
+    async def refresh_consumption_state(self, placa: Optional[str] = None) -> List[str]:
+        """
+        Recalcula km_ultimo_tanque_cheio / litros_desde_tanque_cheio a partir
+        dos abastecimentos (de uma placa ou de todas).
+        Retorna as placas que estavam divergentes.
+        """
+        result = await self.db.execute(
+            text(REFRESH_CONSUMPTION_STATE_SQL),
+            {"placa": placa}
+        )
+        placas = list(result.scalars().all())
+
+        await self._commit()
+        return placas
@@ -1,6 +1,8 @@
 from pydantic import BaseModel
 from typing import Optional
 
+from .enums import VehicleType
+
 
 # -------------------------
 # 🔥 ANOMALIA
@@ -8,6 +10,7 @@ from typing import Optional
 class AnomalyRequest(BaseModel):
     placa: str
     media: float
+    tipo: Optional[VehicleType] = None
 
 
 class AnomalyResponse(BaseModel):
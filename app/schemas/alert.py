@@ -1,12 +1,14 @@
 from pydantic import BaseModel
 from uuid import UUID
-from datetime import datetime
+from datetime import date, datetime
 from typing import Optional
 
 
 class AlertCreate(BaseModel):
     id_veiculo: UUID
     id_abastecimento: UUID
+    # Data do abastecimento (parte da chave de refuel); se omitida, buscada pelo id
+    data_abastecimento: Optional[date] = None
     severity: str
     message: str
 
@@ -15,6 +17,7 @@ class AlertResponse(AlertCreate):
     id: UUID
     resolved: bool
     created_at: datetime
+    updated_at: Optional[datetime] = None
 
     
     placa: Optional[str] = None
@@ -25,3 +28,9 @@ class AlertResponse(AlertCreate):
 
 class AlertResolveUpdate(BaseModel):
     resolved: bool = True
+
+
+class AlertBatchResponse(BaseModel):
+    alerts: list[AlertResponse]
+    # IDs não encontrados ou sem permissão, na ordem pedida
+    missing: list[UUID]
@@ -0,0 +1,14 @@
+from pydantic import BaseModel, Field
+from typing import Any, List, Optional
+
+
+class AnalyticsQueryInfo(BaseModel):
+    nome: str
+    descricao: str
+
+
+class AnalyticsResponse(BaseModel):
+    consulta: str
+    snapshot_gerado_em: Optional[str] = Field(None, description="Quando o snapshot Parquet foi gerado")
+    linhas_lidas: int = Field(..., description="Abastecimentos considerados na agregação")
+    linhas: List[dict[str, Any]]
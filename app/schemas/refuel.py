@@ -57,6 +57,12 @@ class RefuelListResponse(BaseModel):
     per_page: int = Field(..., description="Registros por página")
 
 
+class RefuelBatchResponse(BaseModel):
+    """Schema para resposta da busca de abastecimentos em lote"""
+    refuels: list[RefuelResponse]
+    missing: list[UUID] = Field(..., description="IDs não encontrados ou sem permissão, na ordem pedida")
+
+
 class RefuelUpdate(BaseModel):
     """Schema para atualização de abastecimento (todos campos opcionais)"""
     data: Optional[date] = None
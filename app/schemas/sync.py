@@ -0,0 +1,27 @@
+from datetime import datetime
+from typing import List
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+from .vehicle import VehicleResponse
+from .refuel import RefuelResponse
+from .alert import AlertResponse
+
+
+class SyncTombstoneResponse(BaseModel):
+    """Registro removido desde o cursor"""
+    entidade: str = Field(..., description="veiculo, abastecimento ou alerta")
+    id: UUID = Field(..., description="ID do registro removido")
+    excluido_em: datetime = Field(..., description="Momento da exclusão")
+
+
+class SyncResponse(BaseModel):
+    """Alterações desde o cursor do cliente"""
+    cursor: str = Field(..., description="Enviar na próxima chamada")
+    mais: bool = Field(..., description="Há mais alterações: chamar de novo com o novo cursor")
+    reset: bool = Field(..., description="Resposta completa: o cliente deve descartar os dados locais")
+    veiculos: List[VehicleResponse]
+    abastecimentos: List[RefuelResponse]
+    alertas: List[AlertResponse]
+    exclusoes: List[SyncTombstoneResponse]
@@ -55,6 +55,12 @@ class VehicleResponse(VehicleBase):
     updated_at: Optional[datetime] = Field(None, description="Data e hora da última atualização")
 
 
+class VehicleBatchResponse(BaseModel):
+    """Schema para resposta da busca de veículos em lote"""
+    vehicles: list[VehicleResponse]
+    missing: list[UuidType] = Field(..., description="IDs não encontrados ou sem permissão, na ordem pedida")
+
+
 class VehicleListResponse(BaseModel):
     """Schema para resposta de lista de veículos"""
     vehicles: list[VehicleResponse]
@@ -1,46 +1,112 @@
-import os
-import joblib
+import logging
+
 import numpy as np
 
 from sklearn.ensemble import IsolationForest
 from sklearn.preprocessing import StandardScaler
 
-BASE_PATH = "/app/models/modelos_frota/"
+from app.integrations.model_store import get_model_store
+
+# Modelos agregados por tipo de veículo usam a chave _frota/<tipo>
+FROTA_FOLDER = "_frota"
+
+# Quantidade mínima de médias para treinar um modelo (por placa ou agregado)
+MIN_HISTORICO = 30
+
+# Gate de retreino: só refaz o modelo se as médias recentes se afastarem
+# da distribuição de treino (z da média da janela) ou após muitos pontos novos
+DRIFT_JANELA = 10
+DRIFT_Z_LIMIAR = 3.0
+RETREINO_MAX_PONTOS = 50
+
+# Referência do gate: as últimas médias do treino (não o histórico inteiro,
+# cuja média fica longe da janela por muito tempo depois de uma mudança de
+# patamar, ex.: nova rota ou motorista)
+DRIFT_REFERENCIA = MIN_HISTORICO
+
+logger = logging.getLogger(__name__)
+
+# Contadores do processo (cada worker tem os seus)
+_retrain_counters = {"executados": 0, "ignorados": 0}
 
 
 # ----------------------------------------
-#      UTILITÁRIOS DE ARQUIVOS
+#      CHAVES DO ARMAZENAMENTO
 # ----------------------------------------
 
-def get_model_paths(placa: str):
-    folder = os.path.join(BASE_PATH, placa)
+def get_pool_key(tipo: str):
+    return f"{FROTA_FOLDER}/{tipo}"
+
+
+# ----------------------------------------
+#     ESTATÍSTICAS ACUMULADAS (WELFORD)
+# ----------------------------------------
+
+def _stats_from_historico(historico: np.ndarray):
+    """
+    Calcula count/mean/M2 de uma vez só sobre o histórico completo.
+    "janela" guarda as últimas médias usadas pelo gate de drift.
+    """
+    if len(historico) == 0:
+        return {"count": 0, "mean": 0.0, "m2": 0.0, "janela": []}
+
+    mean = float(np.mean(historico))
     return {
-        "folder": folder,
-        "model": os.path.join(folder, "modelo.joblib"),
-        "limits": os.path.join(folder, "limites.joblib"),
-        "historico": os.path.join(folder, "historico.npy"),
+        "count": int(len(historico)),
+        "mean": mean,
+        "m2": float(np.sum((historico - mean) ** 2)),
+        "janela": [float(v) for v in historico[-DRIFT_JANELA:]],
     }
 
 
-def ensure_folder(placa: str):
-    paths = get_model_paths(placa)
-    os.makedirs(paths["folder"], exist_ok=True)
-    return paths
+def _stats_push(stats: dict, valor: float):
+    """Atualiza count/mean/M2 com um novo valor (algoritmo de Welford)."""
+    count = stats["count"] + 1
+    delta = valor - stats["mean"]
+    mean = stats["mean"] + delta / count
+    m2 = stats["m2"] + delta * (valor - mean)
+    janela = (list(stats.get("janela", [])) + [valor])[-DRIFT_JANELA:]
+    return {"count": count, "mean": mean, "m2": m2, "janela": janela}
+
+
+def check_running_stats(placa: str, tolerancia: float = 1e-9):
+    """
+    Confere se as estatísticas acumuladas da placa batem com o cálculo
+    em lote sobre o histórico.
+    """
+    store = get_model_store()
+    historico = store.load(placa, "historico", fresh=True)
+    acumulado = store.load(placa, "estatisticas", fresh=True)
+
+    if historico is None or acumulado is None:
+        return {"placa": placa, "consistente": None}
+
+    lote = _stats_from_historico(np.asarray(historico, dtype=float))
+
+    consistente = (
+        acumulado["count"] == lote["count"]
+        and np.isclose(acumulado["mean"], lote["mean"], rtol=tolerancia, atol=tolerancia)
+        and np.isclose(acumulado["m2"], lote["m2"], rtol=tolerancia, atol=tolerancia)
+    )
+
+    return {
+        "placa": placa,
+        "consistente": bool(consistente),
+        "acumulado": acumulado,
+        "lote": lote,
+    }
 
 
 # ----------------------------------------
 #         TREINAMENTO ROBUSTO
 # ----------------------------------------
 
-def train_robust_model(placa: str, historico: np.ndarray):
+def _fit_robust_model(historico: np.ndarray):
     """
-    Treina um modelo de detecção de anomalias robusto
-    usando IsolationForest em cima da média de consumo.
-    Salva o modelo em modelo.joblib e atualiza limites.joblib.
+    Ajusta scaler + IsolationForest e calcula os limites estatísticos
+    sobre um vetor de médias de consumo. Não grava nada em disco.
     """
 
-    paths = ensure_folder(placa)
-
     # reshape para (n amostras, 1 feature)
     X = historico.reshape(-1, 1)
 
@@ -70,66 +136,163 @@ def train_robust_model(placa: str, historico: np.ndarray):
         "std": std_hist,
         "limite_sup": limite_sup,
         "limite_inf": limite_inf,
+        # Tamanho do histórico usado no treino e distribuição das últimas
+        # médias do treino (referências do gate de drift)
+        "n_treino": int(len(historico)),
+        "media_referencia": float(np.mean(historico[-DRIFT_REFERENCIA:])),
+        "std_referencia": float(np.std(historico[-DRIFT_REFERENCIA:])),
     }
 
-    # Salva modelo completo
-    joblib.dump(modelo, paths["model"])
-
-    # Também salva limites em arquivo separado, para compatibilidade
     limites = {
         "media": media_hist,
         "std": std_hist,
         "limite_sup": limite_sup,
         "limite_inf": limite_inf,
     }
-    joblib.dump(limites, paths["limits"])
+
+    return modelo, limites
+
+
+def train_robust_model(placa: str, historico: np.ndarray):
+    """
+    Treina um modelo de detecção de anomalias robusto
+    usando IsolationForest em cima da média de consumo.
+    Salva o artefato "modelo" e atualiza "limites".
+    """
+
+    store = get_model_store()
+    modelo, limites = _fit_robust_model(historico)
+
+    # Salva modelo completo
+    store.save(placa, "modelo", modelo)
+
+    # Também salva limites em artefato separado, para compatibilidade
+    store.save(placa, "limites", limites)
 
 
 # ----------------------------------------
-#         ATUALIZAÇÃO ONLINE
+#     MODELO AGREGADO DA FROTA (COLD START)
 # ----------------------------------------
 
-def update_model_online(placa: str, media_calculada: float):
+def train_pooled_model(tipo: str, historico_frota: np.ndarray):
     """
-    Atualiza o "modelo" incrementalmente.
-    Agora guarda histórico e, quando tiver dados suficientes,
-    treina / atualiza o modelo robusto (IsolationForest).
+    Treina um modelo único para um tipo de veículo sobre as médias de
+    todas as placas do tipo (lidas dos abastecimentos: placas frias não
+    têm histórico próprio no armazenamento).
+    Retorna a quantidade de médias usadas, ou None se não houver
+    dados suficientes.
     """
 
-    paths = ensure_folder(placa)
-    hist_file = paths["historico"]
+    store = get_model_store()
+    historico_frota = np.asarray(historico_frota, dtype=float)
 
-    # Carrega histórico
-    if os.path.exists(hist_file):
-        historico = list(np.load(hist_file))
-    else:
-        historico = []
+    if len(historico_frota) < MIN_HISTORICO:
+        return None
 
-    # Adiciona a nova média
-    historico.append(media_calculada)
+    modelo, limites = _fit_robust_model(historico_frota)
+    store.save(get_pool_key(tipo), "modelo", modelo)
+    store.save(get_pool_key(tipo), "limites", limites)
 
-    # Salva histórico atualizado
-    historico_np = np.array(historico, dtype=float)
-    np.save(hist_file, historico_np)
+    return len(historico_frota)
 
-    # Só treina modelo robusto quando houver histórico suficiente
-    if len(historico_np) >= 30:  # você pode ajustar esse mínimo
-        train_robust_model(placa, historico_np)
 
-    return True
+# ----------------------------------------
+#         GATE DE RETREINO (DRIFT)
+# ----------------------------------------
+
+def should_retrain(modelo: dict | None, stats: dict):
+    """
+    Decide se o modelo da placa precisa ser retreinado a partir das
+    estatísticas acumuladas (count + janela das últimas médias).
+    O drift só é avaliado com a janela inteira de médias posteriores ao
+    treino, contra a distribuição das últimas médias do treino.
+    Retorna (retreinar, motivo).
+    """
+    if stats["count"] < MIN_HISTORICO:
+        return False, "historico_insuficiente"
+
+    # Sem modelo, ou modelo anterior ao gate (sem n_treino) → treina
+    if modelo is None or modelo.get("n_treino") is None:
+        return True, "sem_modelo"
+
+    pontos_novos = stats["count"] - modelo["n_treino"]
+    if pontos_novos >= RETREINO_MAX_PONTOS:
+        return True, "pontos_novos"
+
+    # Janela ainda com médias do próprio treino
+    janela = stats.get("janela") or []
+    if pontos_novos < DRIFT_JANELA or not janela:
+        return False, "estavel"
+
+    # Modelos anteriores à referência: histórico inteiro
+    media_ref = modelo.get("media_referencia", modelo["media"])
+    std_ref = modelo.get("std_referencia", modelo["std"])
+
+    desvio = abs(float(np.mean(janela)) - media_ref)
+
+    if std_ref == 0:
+        return desvio > 0, "drift"
+
+    # Média da janela em unidades de erro padrão da distribuição de referência
+    z = desvio / (std_ref / np.sqrt(len(janela)))
+    if z > DRIFT_Z_LIMIAR:
+        return True, "drift"
+
+    return False, "estavel"
+
+
+def get_retrain_counters():
+    """Retreinos executados/ignorados pelo gate neste processo."""
+    return dict(_retrain_counters)
 
 
 # ----------------------------------------
 #       DETECÇÃO DE ANOMALIAS
 # ----------------------------------------
 
-def detect_anomaly(placa: str, media_informada: float):
-    paths = get_model_paths(placa)
-    model_path = paths["model"]
-    limits_path = paths["limits"]
+def _score_with_model(placa: str, media_informada: float, modelo: dict, motivo: str):
+    """Aplica limites + IsolationForest de um modelo já carregado."""
+    limite_inf = modelo["limite_inf"]
+    limite_sup = modelo["limite_sup"]
+
+    limite_alerta = media_informada < limite_inf or media_informada > limite_sup
+
+    X = np.array([[media_informada]])
+    X_scaled = modelo["scaler"].transform(X)
+    label = modelo["iso"].predict(X_scaled)[0]
+
+    return {
+        "placa": placa,
+        "media_historica": modelo["media"],
+        "std_historico": modelo["std"],
+        "limite_inferior": limite_inf,
+        "limite_superior": limite_sup,
+        "media_informada": media_informada,
+        "anomalia": bool(limite_alerta or label == -1),
+        "motivo": motivo
+    }
+
+
+def _score(
+    placa: str,
+    media_informada: float,
+    modelo: dict | None,
+    limites: dict | None,
+    modelo_frota: dict | None,
+    tipo: str | None
+):
+    """Detecção sobre artefatos já carregados (não acessa o armazenamento)."""
+
+    # Placa ainda sem modelo próprio → tenta o modelo agregado do tipo
+    if modelo is None and limites is None:
+        if modelo_frota is not None:
+            return _score_with_model(
+                placa,
+                media_informada,
+                modelo_frota,
+                f"Histórico da placa insuficiente; detecção baseada no modelo agregado da frota ({tipo})."
+            )
 
-    # Se não existe limites E não existe modelo → IA não está pronta
-    if not os.path.exists(model_path) and not os.path.exists(limits_path):
         return {
             "placa": placa,
             "anomalia": False,
@@ -137,18 +300,16 @@ def detect_anomaly(placa: str, media_informada: float):
             "media_informada": media_informada
         }
 
-    # Carregar limites sempre (base estatística)
-    limites = joblib.load(limits_path)
-    media_hist = limites["media"]
-    std_hist = limites["std"]
-    limite_inf = limites["limite_inf"]
-    limite_sup = limites["limite_sup"]
+    # Se NÃO existe modelo robusto (IsolationForest) → usar só limites
+    if modelo is None:
+        media_hist = limites["media"]
+        std_hist = limites["std"]
+        limite_inf = limites["limite_inf"]
+        limite_sup = limites["limite_sup"]
 
-    # Verificação estatística (regra fixa)
-    limite_alerta = media_informada < limite_inf or media_informada > limite_sup
+        # Verificação estatística (regra fixa)
+        limite_alerta = media_informada < limite_inf or media_informada > limite_sup
 
-    # Se NÃO existe modelo robusto (IsolationForest) → usar só limites
-    if not os.path.exists(model_path):
         return {
             "placa": placa,
             "media_historica": media_hist,
@@ -160,30 +321,193 @@ def detect_anomaly(placa: str, media_informada: float):
             "motivo": "Detecção baseada apenas em limites estatísticos."
         }
 
-    # Carregar modelo robusto (modelo + scaler)
-    modelo = joblib.load(model_path)
-    scaler = modelo["scaler"]
-    iso = modelo["iso"]
+    # Modelo robusto (modelo + scaler + limites): anomalia = limites OU IsolationForest
+    return _score_with_model(
+        placa,
+        media_informada,
+        modelo,
+        "Limites ou modelo detectaram anomalia."
+    )
 
-    # Rodar IsolationForest
-    X = np.array([[media_informada]])
-    X_scaled = scaler.transform(X)
-    label = iso.predict(X_scaled)[0]
 
-    # Anomalia final = limites OU modelo
-    is_anomalia = limite_alerta or (label == -1)
+def _load_scoring_state(placa: str, tipo: str | None, fresh: bool = False):
+    """Carrega modelo da placa, ou limites, ou o modelo agregado do tipo."""
+    store = get_model_store()
+    modelo = store.load(placa, "modelo", fresh=fresh)
+    limites = store.load(placa, "limites", fresh=fresh) if modelo is None else None
 
-    return {
-        "placa": placa,
-        "media_historica": media_hist,
-        "std_historico": std_hist,
-        "limite_inferior": limite_inf,
-        "limite_superior": limite_sup,
-        "media_informada": media_informada,
-        "anomalia": is_anomalia,
-        "motivo": "Limites ou modelo detectaram anomalia."
+    modelo_frota = None
+    if modelo is None and limites is None and tipo:
+        modelo_frota = store.load(get_pool_key(tipo), "modelo")
+
+    return modelo, limites, modelo_frota
+
+
+def detect_anomaly(placa: str, media_informada: float, tipo: str | None = None):
+    modelo, limites, modelo_frota = _load_scoring_state(placa, tipo)
+    return _score(placa, media_informada, modelo, limites, modelo_frota, tipo)
+
+
+# ----------------------------------------
+#     INGESTÃO DE NOVAS MÉDIAS (ONLINE)
+# ----------------------------------------
+
+def score_media(placa: str, media_calculada: float, tipo: str | None = None):
+    """
+    Avalia a média contra o modelo atual da placa (ou o agregado do tipo)
+    sem gravar nada. Retorna (resultado, modelo); o modelo vai para
+    record_media (gate de retreino) sem nova leitura do armazenamento.
+    """
+    # Sem cache: o gate depende do n_treino mais recente
+    modelo, limites, modelo_frota = _load_scoring_state(placa, tipo, fresh=True)
+    resultado = _score(placa, float(media_calculada), modelo, limites, modelo_frota, tipo)
+    return resultado, modelo
+
+
+def record_media(placa: str, media_calculada: float, modelo: dict | None, n_anterior: int | None = None):
+    """
+    Acrescenta a média ao histórico da placa (append, sem regravar) e
+    atualiza as estatísticas acumuladas.
+
+    Placa fria (sem histórico próprio): não grava nada; as médias ficam
+    apenas nos abastecimentos até a placa ter MIN_HISTORICO delas
+    (promote_plate).
+
+    n_anterior: quantidade de médias da placa no banco antes desta. Se o
+    histórico tiver outro tamanho (ex.: média gravada por uma transação
+    que depois falhou), não grava e devolve "sincronizado"=False: quem
+    chamou reconstrói o histórico a partir dos abastecimentos.
+
+    Retorna "historico_proprio", "sincronizado", "retreinar" e
+    "motivo_retreino"; o retreino e a promoção ficam com quem chamou.
+    """
+    store = get_model_store()
+    media = float(media_calculada)
+    registro = {
+        "historico_proprio": True,
+        "sincronizado": True,
+        "retreinar": False,
+        "motivo_retreino": "historico_insuficiente",
     }
 
+    # Estatísticas acumuladas (placas antigas: calcula uma vez a partir do histórico)
+    stats = store.load(placa, "estatisticas", fresh=True)
+    if stats is None:
+        historico = store.load(placa, "historico", fresh=True)
+        if historico is None:
+            registro["historico_proprio"] = False
+            return registro
+        stats = _stats_from_historico(np.asarray(historico, dtype=float))
+
+    if n_anterior is not None and stats["count"] != n_anterior:
+        registro["sincronizado"] = False
+        return registro
+
+    store.append_historico(placa, media)
+    stats = _stats_push(stats, media)
+    store.save(placa, "estatisticas", stats)
+
+    retreinar, motivo = should_retrain(modelo, stats)
+    if not retreinar and motivo != "historico_insuficiente":
+        _retrain_counters["ignorados"] += 1
+
+    registro["retreinar"] = retreinar
+    registro["motivo_retreino"] = motivo
+    return registro
+
+
+def ingest(placa: str, media_calculada: float, tipo: str | None = None):
+    """
+    Registra uma nova média da placa em uma única passada: avalia a média
+    contra o modelo ANTERIOR à atualização (score_media) e a acrescenta
+    ao histórico (record_media). Retorna o resultado da detecção com os
+    campos de record_media.
+    """
+    resultado, modelo = score_media(placa, media_calculada, tipo)
+    resultado.update(record_media(placa, media_calculada, modelo))
+    return resultado
+
+
+def promote_plate(placa: str, medias: list[float]):
+    """
+    Placa fria que chegou a MIN_HISTORICO médias: grava o histórico
+    completo (lido dos abastecimentos) e treina o modelo próprio.
+    Retorna False se ainda não houver médias suficientes.
+    """
+    if len(medias) < MIN_HISTORICO:
+        return False
+
+    save_history(placa, np.asarray(medias, dtype=float))
+    return retrain_model(placa, "historico_suficiente")
+
+
+def retrain_model(placa: str, motivo: str = ""):
+    """
+    Retreina o modelo da placa sobre o histórico completo.
+    Retorna False se ainda não houver histórico suficiente.
+    """
+    historico = get_model_store().load(placa, "historico", fresh=True)
+
+    if historico is None or len(historico) < MIN_HISTORICO:
+        return False
+
+    train_robust_model(placa, np.asarray(historico, dtype=float))
+    _retrain_counters["executados"] += 1
+    logger.info(f"Modelo da placa {placa} retreinado ({motivo})")
+    return True
+
+
+def save_history(placa: str, historico: np.ndarray):
+    """Grava o histórico completo da placa e as estatísticas correspondentes."""
+    store = get_model_store()
+    historico = np.asarray(historico, dtype=float)
+
+    store.save(placa, "historico", historico)
+    store.save(placa, "estatisticas", _stats_from_historico(historico))
+
+
+def clear_plate(placa: str):
+    """Remove os artefatos próprios da placa (volta a usar o modelo agregado)."""
+    get_model_store().delete(placa)
+
+
+def rebuild_history_suffix(placa: str, n_prefixo: int, sufixo: list[float]):
+    """
+    Substitui o histórico da placa a partir da posição n_prefixo (médias
+    recalculadas depois de editar/remover um abastecimento), refaz as
+    estatísticas e retreina se houver histórico suficiente.
+
+    Retorna True se o histórico mudou, False se já estava igual e None se
+    o histórico guardado tem menos de n_prefixo médias (fora de sincronia:
+    chame de novo com n_prefixo=0 e todas as médias).
+
+    Placa fria (sem histórico próprio) continua sem artefatos enquanto
+    tiver menos de MIN_HISTORICO médias.
+    """
+    store = get_model_store()
+    historico = store.load(placa, "historico", fresh=True)
+
+    if historico is None:
+        if n_prefixo > 0:
+            return None
+        if len(sufixo) < MIN_HISTORICO:
+            return False
+        return promote_plate(placa, sufixo)
+
+    historico = np.asarray(historico, dtype=float)
+
+    if len(historico) < n_prefixo:
+        return None
+
+    sufixo_np = np.asarray(sufixo, dtype=float)
+    if np.array_equal(historico[n_prefixo:], sufixo_np):
+        return False
+
+    save_history(placa, np.concatenate([historico[:n_prefixo], sufixo_np]))
+
+    retrain_model(placa, "recalculo")
+    return True
+
 
 # -----------------------------------------------------
 #     🔥 PADRÃO PARA INTEGRAR COM SUAS ROTAS ATUAIS
@@ -202,34 +526,58 @@ def check_anomaly(payload: dict):
         else:
             raise ValueError("Não foi possível calcular a média para verificar anomalia.")
 
-    return detect_anomaly(placa, media)
+    # Tipo do veículo habilita o modelo agregado para placas sem histórico
+    tipo = payload.get("tipo")
 
+    return detect_anomaly(placa, media, getattr(tipo, "value", tipo))
 
-def predict_consumption(payload: dict):
-    placa = payload["placa"]
-    paths = get_model_paths(placa)
 
-    # Sem histórico → sem previsão
-    if not os.path.exists(paths["historico"]):
+def get_prediction_stats(placa: str):
+    """
+    Estatísticas acumuladas da placa (count/mean/m2), ou None se a placa
+    não tem histórico próprio (placa fria: as médias estão só nos
+    abastecimentos, RefuelRepository.get_media_stats).
+    """
+    store = get_model_store()
+
+    # Estatísticas acumuladas: custo O(1), independente do tamanho do histórico
+    stats = store.load(placa, "estatisticas")
+
+    if stats is None:
+        historico = store.load(placa, "historico")
+        if historico is None:
+            return None
+
+        # Placa anterior às estatísticas acumuladas → calcula e persiste uma vez
+        stats = _stats_from_historico(np.asarray(historico, dtype=float))
+        store.save(placa, "estatisticas", stats)
+
+    return stats
+
+
+def predict_consumption(payload: dict, stats: dict | None):
+    """Previsão pela média histórica a partir das estatísticas (get_prediction_stats)."""
+
+    # Sem médias → sem previsão
+    if stats is None:
         return {
             "previsao": None,
             "rmse": None,
             "age": None
         }
 
-    historico = list(np.load(paths["historico"]))
+    media_hist = float(stats["mean"])
 
-    if len(historico) < 2:
+    if stats["count"] < 2:
         # Não existe variação → RMSE impossível calcular
         return {
-            "previsao": float(np.mean(historico)),
+            "previsao": media_hist,
             "rmse": None,
             "age": None
         }
 
-    historico_np = np.array(historico, dtype=float)
-    media_hist = float(np.mean(historico_np))
-    rmse = float(np.sqrt(np.mean((historico_np - media_hist) ** 2)))
+    # RMSE da previsão pela média = desvio padrão populacional
+    rmse = float(np.sqrt(stats["m2"] / stats["count"]))
 
     # Se o usuário mandou litros e km para prever o AGE
     if "km" in payload and "litros_usados" in payload:
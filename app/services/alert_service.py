@@ -1,25 +1,35 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.repositories.alert_repository import AlertRepository
+from app.repositories.sync_repository import SyncRepository
 from app.schemas.alert import AlertCreate
+from app.common.batch import parse_ids, in_request_order
 
 
 class AlertService:
 
-    def __init__(self, db: AsyncSession):
-        self.repo = AlertRepository(db)
+    def __init__(self, db: AsyncSession, auto_commit: bool = True):
+        self.repo = AlertRepository(db, auto_commit=auto_commit)
+        self.sync_repo = SyncRepository(db)
 
-    async def create_alert(self, id_veiculo, id_abastecimento, severity, message):
+    async def create_alert(self, id_veiculo, id_abastecimento, severity, message, data_abastecimento=None):
         alert = AlertCreate(
             id_veiculo=id_veiculo,
             id_abastecimento=id_abastecimento,
+            data_abastecimento=data_abastecimento,
             severity=severity,
             message=message
         )
         return await self.repo.create(alert)
 
-    async def list_alerts(self, id_veiculo=None, severity=None, resolved=None):
-        return await self.repo.list(id_veiculo, severity, resolved)
+    async def list_alerts(self, id_veiculo=None, severity=None, resolved=None, skip=0, limit=100):
+        return await self.repo.list(id_veiculo, severity, resolved, skip, limit)
+
+    async def get_alerts_by_ids(self, ids, id_usuario=None):
+        """Busca em lote: alertas na ordem de `ids` e os ids não encontrados"""
+        ids = parse_ids(ids)
+        alertas = await self.repo.get_by_ids(ids, id_usuario)
+        return in_request_order(ids, alertas, chave=lambda alerta: alerta["id"])
 
     async def get_alert(self, alert_id):
         return await self.repo.get_by_id(alert_id)
@@ -33,5 +43,6 @@ class AlertService:
     async def delete_alert(self, alert_id):
         alert = await self.repo.get_by_id(alert_id)
         if alert:
+            self.sync_repo.add_tombstone("alerta", alert.id, alert.veiculo.id_usuario)
             await self.repo.delete(alert)
         return alert
@@ -0,0 +1,167 @@
+"""
+Análises sobre os snapshots Parquet dos abastecimentos.
+
+Os snapshots (job app.jobs.export_parquet) ficam em ANALYTICS_PATH, uma
+pasta por mês (mes=AAAA-MM, particionamento hive). As consultas rodam
+no próprio processo com pyarrow (dataset + group_by colunar): leem só as
+colunas e os meses necessários e não tocam no PostgreSQL.
+"""
+import json
+import os
+from datetime import date
+from typing import Any, Optional
+
+from app.core.config import settings
+from app.common.exceptions import EntityNotFoundError
+
+MANIFESTO = "_manifest.json"
+
+# Colunas gravadas no Parquet (valores em float64: análise, não contabilidade)
+COLUNAS = (
+    ("id", "string"),
+    ("data", "date32"),
+    ("hora", "time64[us]"),
+    ("placa", "string"),
+    ("km", "int64"),
+    ("litros", "float64"),
+    ("valor_litro", "float64"),
+    ("valor_total", "float64"),
+    ("tanque_cheio", "bool"),
+    ("media", "float64"),
+    ("tipo_combustivel", "string"),
+    ("posto", "string"),
+    ("id_usuario", "string"),
+)
+
+# Consultas pré-definidas: colunas de agrupamento, agregações (coluna, função)
+# e ordenação do resultado
+CONSULTAS: dict[str, dict[str, Any]] = {
+    "custo_por_posto": {
+        "descricao": "Gasto, litros e preço médio por posto",
+        "grupo": ["posto"],
+        "agregacoes": [("valor_total", "sum"), ("litros", "sum"), ("valor_litro", "mean"), ("id", "count")],
+        "ordem": [("valor_total_sum", "descending")],
+    },
+    "consumo_por_motorista": {
+        "descricao": "Média km/L, litros e gasto por usuário que registrou",
+        "grupo": ["id_usuario"],
+        "agregacoes": [("media", "mean"), ("litros", "sum"), ("valor_total", "sum"), ("id", "count")],
+        "ordem": [("litros_sum", "descending")],
+    },
+    "consumo_por_placa": {
+        "descricao": "Média km/L, litros e gasto por veículo",
+        "grupo": ["placa"],
+        "agregacoes": [("media", "mean"), ("litros", "sum"), ("valor_total", "sum"), ("km", "max"), ("id", "count")],
+        "ordem": [("valor_total_sum", "descending")],
+    },
+    "tendencia_mensal": {
+        "descricao": "Gasto, litros, preço e média km/L mês a mês",
+        "grupo": ["mes"],
+        "agregacoes": [
+            ("valor_total", "sum"), ("litros", "sum"), ("valor_litro", "mean"), ("media", "mean"), ("id", "count")
+        ],
+        "ordem": [("mes", "ascending")],
+    },
+}
+
+
+def arrow_schema():
+    """Schema pyarrow dos snapshots"""
+    # Import tardio: pyarrow só é carregado por quem usa as análises
+    import pyarrow as pa
+
+    tipos = {
+        "string": pa.string(),
+        "date32": pa.date32(),
+        "time64[us]": pa.time64("us"),
+        "int64": pa.int64(),
+        "float64": pa.float64(),
+        "bool": pa.bool_(),
+    }
+    return pa.schema([(nome, tipos[tipo]) for nome, tipo in COLUNAS])
+
+
+def month_dir(raiz: str, mes: str) -> str:
+    """Pasta do mês (AAAA-MM) no layout hive"""
+    return os.path.join(raiz, f"mes={mes}")
+
+
+def read_manifest(raiz: str) -> dict:
+    """Estado do último snapshot: por mês, linhas e última alteração exportadas"""
+    try:
+        with open(os.path.join(raiz, MANIFESTO)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"meses": {}, "gerado_em": None}
+
+
+def write_manifest(raiz: str, manifesto: dict) -> None:
+    caminho = os.path.join(raiz, MANIFESTO)
+    with open(caminho + ".tmp", "w") as f:
+        json.dump(manifesto, f, indent=2, sort_keys=True)
+    os.replace(caminho + ".tmp", caminho)
+
+
+def list_queries() -> list[dict]:
+    return [{"nome": nome, "descricao": c["descricao"]} for nome, c in CONSULTAS.items()]
+
+
+def run_query(
+    nome: str,
+    data_inicio: Optional[date] = None,
+    data_fim: Optional[date] = None,
+    placa: Optional[str] = None,
+    limite: int = 1000,
+    raiz: Optional[str] = None
+) -> dict:
+    """
+    Executa uma consulta pré-definida sobre os snapshots (síncrono e CPU-bound:
+    chamar fora do event loop). Só os meses do período são lidos.
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+
+    if nome not in CONSULTAS:
+        raise EntityNotFoundError("Consulta analítica", nome, "nome")
+    consulta = CONSULTAS[nome]
+
+    raiz = raiz or settings.ANALYTICS_PATH
+    manifesto = read_manifest(raiz)
+    if not manifesto["meses"]:
+        raise EntityNotFoundError("Snapshot analítico")
+
+    dataset = ds.dataset(
+        raiz,
+        format="parquet",
+        schema=arrow_schema().append(pa.field("mes", pa.string())),
+        partitioning=ds.partitioning(pa.schema([("mes", pa.string())]), flavor="hive"),
+        exclude_invalid_files=True,
+    )
+
+    # Filtro em mes poda as pastas; o filtro em data corta dentro do mês
+    filtro = None
+    condicoes = []
+    if data_inicio:
+        condicoes += [ds.field("mes") >= f"{data_inicio:%Y-%m}", ds.field("data") >= data_inicio]
+    if data_fim:
+        condicoes += [ds.field("mes") <= f"{data_fim:%Y-%m}", ds.field("data") <= data_fim]
+    if placa:
+        condicoes.append(ds.field("placa") == placa)
+    for condicao in condicoes:
+        filtro = condicao if filtro is None else filtro & condicao
+
+    colunas = sorted(set(consulta["grupo"]) | {coluna for coluna, _ in consulta["agregacoes"]})
+    tabela = dataset.to_table(columns=colunas, filter=filtro)
+
+    resultado = tabela.group_by(consulta["grupo"]).aggregate(consulta["agregacoes"])
+    indices = pc.sort_indices(resultado, sort_keys=consulta["ordem"])
+    resultado = resultado.take(indices).slice(0, limite)
+
+    return {
+        "consulta": nome,
+        "snapshot_gerado_em": manifesto["gerado_em"],
+        "linhas_lidas": tabela.num_rows,
+        "linhas": resultado.to_pylist(),
+    }
+
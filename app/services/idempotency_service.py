@@ -0,0 +1,165 @@
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Any, Awaitable, Callable, Optional
+from uuid import UUID
+
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.repositories.idempotency_key_repository import IdempotencyKeyRepository
+from app.common.exceptions import IdempotencyKeyInUseError, IdempotencyKeyMismatchError
+
+# Cabeçalho da resposta repetida (o cliente sabe que nada foi refeito)
+REPLAYED_HEADER = "Idempotency-Replayed"
+
+
+class ResponseCache:
+    """
+    Respostas já concluídas, em memória do processo, com TTL e limite de
+    entradas (as mais antigas saem primeiro). A tabela continua sendo a
+    fonte da verdade; o cache só poupa a ida ao banco nas repetições.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        # (id_usuario, chave) -> (hash_requisicao, status_code, resposta, guardado_em)
+        self._entries: OrderedDict[tuple[str, str], tuple[str, int, Any, float]] = OrderedDict()
+
+    def get(self, id_usuario: UUID, chave: str) -> Optional[tuple[str, int, Any]]:
+        entrada = self._entries.get((str(id_usuario), chave))
+        if entrada is None:
+            return None
+        if time.monotonic() - entrada[3] >= self.ttl_seconds:
+            del self._entries[(str(id_usuario), chave)]
+            return None
+        return entrada[:3]
+
+    def put(self, id_usuario: UUID, chave: str, hash_requisicao: str, status_code: int, resposta: Any) -> None:
+        self._entries[(str(id_usuario), chave)] = (hash_requisicao, status_code, resposta, time.monotonic())
+        self._entries.move_to_end((str(id_usuario), chave))
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+_response_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> ResponseCache:
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = ResponseCache(
+            settings.IDEMPOTENCY_CACHE_TTL_SECONDS,
+            settings.IDEMPOTENCY_CACHE_MAX_ENTRIES
+        )
+    return _response_cache
+
+
+def request_hash(endpoint: str, payload: Any) -> str:
+    """SHA-256 do endpoint + corpo (mesma chave em outro endpoint/corpo não é repetição)"""
+    corpo = json.dumps(payload, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(f"{endpoint}\n{corpo}".encode()).hexdigest()
+
+
+class IdempotencyService:
+    """Execução de POSTs com Idempotency-Key"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.repository = IdempotencyKeyRepository(db)
+        self.cache = get_response_cache()
+
+    async def run(
+        self,
+        chave: Optional[str],
+        id_usuario: UUID,
+        endpoint: str,
+        payload: Any,
+        status_code: int,
+        operacao: Callable[[], Awaitable[Any]],
+        efeito_externo: bool = False
+    ) -> JSONResponse:
+        """
+        Executa `operacao` (que devolve o corpo JSON da resposta) uma única vez
+        por (usuário, chave). Repetições devolvem a resposta guardada sem
+        executar nada; sem chave, só executa.
+
+        `operacao` não faz commit (só flush): o que ela gravou e a resposta
+        guardada vão no mesmo commit, então não existe abastecimento gravado
+        com a chave ainda sem resposta.
+
+        A chave é reservada (e commitada) antes da operação: uma repetição
+        que chega durante a original recebe 409. Se a operação falhar, a
+        reserva é desfeita e o cliente pode tentar de novo com a mesma chave.
+        efeito_externo: a operação já fez algo fora do banco (ex.: publicou no
+        Pub/Sub); se o commit falhar depois dela, a resposta é gravada em
+        nova transação em vez de liberar a chave (a repetição não publica de novo).
+        """
+        if not chave:
+            resposta = await operacao()
+            await self.db.commit()
+            return JSONResponse(content=resposta, status_code=status_code)
+
+        hash_requisicao = request_hash(endpoint, payload)
+
+        salva = self.cache.get(id_usuario, chave)
+        if salva is not None:
+            return self._replay(chave, hash_requisicao, *salva)
+
+        reservada = await self.repository.claim(
+            id_usuario,
+            chave,
+            hash_requisicao,
+            validade=timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS),
+            abandono=timedelta(seconds=settings.IDEMPOTENCY_IN_PROGRESS_TIMEOUT_SECONDS)
+        )
+        await self.db.commit()
+
+        if not reservada:
+            registro = await self.repository.get(id_usuario, chave)
+            # Lido antes do rollback (que expira os objetos da sessão).
+            # Sem registro: a original falhou e liberou a chave agora
+            salva = registro and (registro.hash_requisicao, registro.status_code, registro.resposta)
+            await self.db.rollback()
+
+            if salva is None or (salva[0] == hash_requisicao and salva[1] is None):
+                raise IdempotencyKeyInUseError(chave)
+            if salva[1] is not None:
+                self.cache.put(id_usuario, chave, *salva)
+            return self._replay(chave, hash_requisicao, *salva)
+
+        resposta = None
+        try:
+            resposta = await operacao()
+            await self.repository.save_response(id_usuario, chave, status_code, resposta)
+            await self.db.commit()
+        except BaseException:
+            await self.db.rollback()
+            if resposta is None or not efeito_externo:
+                await self.repository.release(id_usuario, chave)
+                await self.db.commit()
+                raise
+
+            # Já publicado: a chave fica com a resposta (se falhar de novo, a
+            # reserva só é reaproveitada depois do tempo de abandono)
+            await self.repository.save_response(id_usuario, chave, status_code, resposta)
+            await self.db.commit()
+
+        self.cache.put(id_usuario, chave, hash_requisicao, status_code, resposta)
+
+        return JSONResponse(content=resposta, status_code=status_code)
+
+    @staticmethod
+    def _replay(chave: str, hash_requisicao: str, hash_salvo: str, status_code: int, resposta: Any) -> JSONResponse:
+        if hash_salvo != hash_requisicao:
+            raise IdempotencyKeyMismatchError(chave)
+        return JSONResponse(content=resposta, status_code=status_code, headers={REPLAYED_HEADER: "true"})
+
+    async def purge_expired(self) -> int:
+        removidas = await self.repository.delete_expired()
+        await self.db.commit()
+        return removidas
@@ -1,30 +1,70 @@
-from typing import Optional, List
+import asyncio
+import csv
+import io
+import json
+from typing import Optional, List, AsyncIterator, Sequence
 from datetime import date, datetime
 from uuid import UUID
 from decimal import Decimal, ROUND_HALF_UP
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.repositories.refuel_repository import RefuelRepository
+from app.repositories.refuel_repository import RefuelRepository, EXPORT_COLUMNS
 from app.repositories.vehicle_repository import VehicleRepository
+from app.repositories.sync_repository import SyncRepository
 from app.models.refuel import Refuel
 from app.schemas.refuel import RefuelCreate, RefuelUpdate
 from app.common.exceptions.validation_exceptions import ValidationError
 from app.common.exceptions.veiculo_exceptions import VeiculoNotFoundError
+from app.common.batch import parse_ids, in_request_order
+from app.integrations.db.locks import lock_placa
 
 #  IA
-from app.services.ai_service import update_model_online as train_online_append
-from app.services.ai_service import detect_anomaly
+from app.services.ai_service import score_media, record_media
+from app.services.ai_service import retrain_model, promote_plate, MIN_HISTORICO
+from app.services.ai_service import rebuild_history_suffix
 from app.services.alert_service import AlertService
 
 
+def _json_value(valor):
+    """Mesmo formato do JSON da API: datas ISO 8601, Decimal e UUID como texto"""
+    if hasattr(valor, "isoformat"):
+        return valor.isoformat()
+    return str(valor)
+
+
+def _csv_chunk(linhas, cabecalho: bool = False) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if cabecalho:
+        writer.writerow(EXPORT_COLUMNS)
+    writer.writerows(
+        [valor.isoformat() if hasattr(valor, "isoformat") else valor for valor in linha]
+        for linha in linhas
+    )
+    return buffer.getvalue()
+
+
+def _ndjson_chunk(linhas) -> str:
+    return "".join(
+        json.dumps(dict(linha._mapping), default=_json_value, ensure_ascii=False) + "\n"
+        for linha in linhas
+    )
+
+
 class RefuelService:
     """Service para lógica de negócio de abastecimento"""
     
-    def __init__(self, db: AsyncSession):
-        self.repository = RefuelRepository(db)
-        self.vehicle_repository = VehicleRepository(db)
-        self.alert_service = AlertService(db)
+    def __init__(self, db: AsyncSession, auto_commit: bool = True):
+        # Unidade de trabalho: os repositórios só fazem flush e cada
+        # operação do service termina com um único commit (auto_commit=False:
+        # só flush, e quem chamou faz o commit, ex.: Idempotency-Key)
+        self.db = db
+        self.auto_commit = auto_commit
+        self.repository = RefuelRepository(db, auto_commit=False)
+        self.vehicle_repository = VehicleRepository(db, auto_commit=False)
+        self.alert_service = AlertService(db, auto_commit=False)
+        self.sync_repository = SyncRepository(db)
 
     async def create_refuel(self, refuel_data: RefuelCreate) -> Refuel:
         """Criar novo abastecimento"""
@@ -39,6 +79,11 @@ class RefuelService:
         if refuel_data.km <= 0:
             raise ValidationError("Quilometragem deve ser maior que zero")
 
+        # Abastecimentos da mesma placa são serializados (entre workers/containers):
+        # o estado de consumo do veículo e o histórico da IA são
+        # ler-modificar-gravar. O lock vale até o commit do abastecimento.
+        await lock_placa(self.db, refuel_data.placa)
+
         try:
             vehicle = await self.vehicle_repository.get_by_placa(refuel_data.placa)
         except VeiculoNotFoundError:
@@ -55,39 +100,70 @@ class RefuelService:
             )
         
         # ---------- Cálculo de média ----------
+        km_ultimo_tanque_cheio, litros_intermediarios = await self._get_consumption_state(
+            vehicle,
+            refuel_data.km
+        )
+
+        # Trecho da média: tanque cheio anterior com KM menor e parciais com KM
+        # estritamente entre os dois (mesma regra do recálculo em SQL). O estado
+        # do veículo só vale se nenhum abastecimento estiver neste mesmo KM.
+        km_base, litros_base = km_ultimo_tanque_cheio, litros_intermediarios
+        if (
+            refuel_data.tanque_cheio
+            and km_ultimo_tanque_cheio is not None
+            and vehicle.km_ultimo_abastecimento is not None
+            and refuel_data.km <= vehicle.km_ultimo_abastecimento
+        ):
+            km_base, litros_base = await self._get_segment_from_refuels(vehicle.placa, refuel_data.km)
+
         media_calculada: Optional[Decimal] = None
         
-        if refuel_data.tanque_cheio:
-            ultimo_tanque_cheio = await self.repository.get_last_refuel_by_placa(
-                placa=refuel_data.placa,
-                tanque_cheio=True,
-                before_km=refuel_data.km
-            )
+        if refuel_data.tanque_cheio and km_base is not None:
+            distancia = refuel_data.km - km_base
             
-            if ultimo_tanque_cheio:
-                distancia = refuel_data.km - ultimo_tanque_cheio.km
+            if distancia > 0:
+                litros_totais = litros_base + refuel_data.litros
                 
-                if distancia > 0:
-                    litros_intermediarios = await self.repository.get_sum_litros_between_km(
-                        placa=refuel_data.placa,
-                        km_start=ultimo_tanque_cheio.km,
-                        km_end=refuel_data.km
+                if litros_totais > 0:
+                    media_calculada = Decimal(distancia) / Decimal(litros_totais)
+                    media_calculada = media_calculada.quantize(
+                        Decimal("0.01"), rounding=ROUND_HALF_UP
                     )
-                    
-                    litros_totais = litros_intermediarios + refuel_data.litros
-                    
-                    if litros_totais > 0:
-                        media_calculada = Decimal(distancia) / Decimal(litros_totais)
-                        media_calculada = media_calculada.quantize(
-                            Decimal("0.01"), rounding=ROUND_HALF_UP
-                        )
 
         # Média só existe se tanque_cheio=True
         refuel_data.media = media_calculada if refuel_data.tanque_cheio else None
 
-        # ---------- IA: adicionar ao histórico + treinar ----------
+        # ---------- Estado de consumo do veículo ----------
+        # Alterações no veículo vão no mesmo flush/commit do abastecimento
+        if refuel_data.tanque_cheio:
+            vehicle.km_ultimo_tanque_cheio = refuel_data.km
+            vehicle.litros_desde_tanque_cheio = Decimal(0)
+        elif km_ultimo_tanque_cheio is not None:
+            vehicle.km_ultimo_tanque_cheio = km_ultimo_tanque_cheio
+            if refuel_data.km > km_ultimo_tanque_cheio:
+                vehicle.litros_desde_tanque_cheio = litros_intermediarios + refuel_data.litros
+
+        # ---------- Atualizar veículo ----------
+        vehicle.km_atual = refuel_data.km
+        vehicle.km_ultimo_abastecimento = refuel_data.km
+        
+        if vehicle.km_prox_manutencao is not None and vehicle.km_atual >= vehicle.km_prox_manutencao:
+            vehicle.manutencao_vencida = True
+
+        # ---------- IA: avaliar (sem gravar nada) ----------
+        result = None
+        modelo = None
+        n_anterior = None
         if media_calculada is not None:
-           train_online_append(refuel_data.placa, float(media_calculada))
+            # Roda fora do event loop para não travar requisições de outras placas
+            result, modelo = await asyncio.to_thread(
+                score_media,
+                refuel_data.placa,
+                float(media_calculada),
+                vehicle.tipo.value
+            )
+            n_anterior = await self.repository.count_medias(refuel_data.placa)
 
         # ---------- Criar abastecimento no banco ----------
         refuel = await self.repository.create(refuel_data)
@@ -97,41 +173,86 @@ class RefuelService:
             vehicle.modelo_ia_treinado = True
             vehicle.data_ultimo_treinamento = datetime.utcnow()
 
-        # ------------ IA: detectar ANOMALIA ------------
-        if media_calculada is not None:
-            result = detect_anomaly(refuel_data.placa, float(media_calculada))
+        # ------------ IA: ANOMALIA (avaliada antes de gravar) ------------
+        if result is not None and result["anomalia"] is True:
+            # determinar severidade
+            limite_inf = result["limite_inferior"]
+            m = float(media_calculada)
 
-            if result["anomalia"] is True:
-                # determinar severidade
-                limite_inf = result["limite_inferior"]
-                m = float(media_calculada)
+            if m < limite_inf * 0.8:
+                severity = "HIGH"
+            else:
+                severity = "MEDIUM"
 
-                if m < limite_inf * 0.8:
-                    severity = "HIGH"
-                else:
-                    severity = "MEDIUM"
+            await self.alert_service.create_alert(
+                id_veiculo=vehicle.id,
+                id_abastecimento=refuel.id,
+                data_abastecimento=refuel.data,
+                severity=severity,
+                message=f"Anomalia detectada: média {media_calculada} km/L"
+            )
 
-                await self.alert_service.create_alert(
-                    id_veiculo=vehicle.id,
-                    id_abastecimento=refuel.id,
-                    severity=severity,
-                    message=f"Anomalia detectada: média {media_calculada} km/L"
-                )
+        # ---------- IA: histórico + treino, só depois do flush ----------
+        # Erros do banco (constraint, lock, conexão) aparecem antes de tocar
+        # no armazenamento. Se o commit ainda falhar, o histórico fica com uma
+        # média a mais e record_media detecta no próximo abastecimento da placa
+        # (inclusive a repetição com a mesma Idempotency-Key)
+        if media_calculada is not None:
+            await self.db.flush()
+            await self._record_media(refuel_data.placa, float(media_calculada), modelo, n_anterior)
 
-        # ---------- Atualizar veículo ----------
-        vehicle.km_atual = refuel_data.km
-        vehicle.km_ultimo_abastecimento = refuel_data.km
-        
-        if vehicle.km_prox_manutencao is not None and vehicle.km_atual >= vehicle.km_prox_manutencao:
-            vehicle.manutencao_vencida = True
-        
-        await self.vehicle_repository.db.commit()
+        await self._commit()
         
         return refuel
     
+    async def _get_consumption_state(self, vehicle, km: int) -> tuple[Optional[int], Decimal]:
+        """
+        KM do último tanque cheio e litros abastecidos desde então.
+        Usa o estado guardado no veículo; se ainda não houver (veículo sem
+        tanque cheio ou anterior às colunas), busca nos abastecimentos.
+        """
+        if vehicle.km_ultimo_tanque_cheio is not None:
+            return vehicle.km_ultimo_tanque_cheio, vehicle.litros_desde_tanque_cheio
+
+        return await self._get_segment_from_refuels(vehicle.placa, km)
+
+    async def _get_segment_from_refuels(self, placa: str, km: int) -> tuple[Optional[int], Decimal]:
+        """
+        KM do último tanque cheio com KM menor que `km` e litros abastecidos
+        estritamente entre os dois, direto dos abastecimentos.
+        """
+        ultimo_tanque_cheio = await self.repository.get_last_refuel_by_placa(
+            placa=placa,
+            tanque_cheio=True,
+            before_km=km
+        )
+
+        if not ultimo_tanque_cheio:
+            return None, Decimal(0)
+
+        litros_intermediarios = await self.repository.get_sum_litros_between_km(
+            placa=placa,
+            km_start=ultimo_tanque_cheio.km,
+            km_end=km
+        )
+
+        return ultimo_tanque_cheio.km, litros_intermediarios
+    
     async def get_refuel_by_id(self, refuel_id: int) -> Refuel:
         return await self.repository.get_by_id(refuel_id)
     
+    async def get_refuels_by_ids(
+        self,
+        ids: Sequence[UUID],
+        id_usuario: Optional[UUID] = None
+    ) -> tuple[List[Refuel], List[UUID]]:
+        """
+        Busca em lote: abastecimentos na ordem de `ids` e os ids não encontrados.
+        id_usuario: abastecimentos de outro usuário contam como não encontrados
+        """
+        ids = parse_ids(ids)
+        return in_request_order(ids, await self.repository.get_by_ids(ids, id_usuario))
+
     async def get_refuels(
         self,
         skip: int = 0,
@@ -139,7 +260,8 @@ class RefuelService:
         placa: Optional[str] = None,
         id_usuario: Optional[UUID] = None,
         data_inicio: Optional[date] = None,
-        data_fim: Optional[date] = None
+        data_fim: Optional[date] = None,
+        opcoes: Sequence = ()
     ) -> List[Refuel]:
         return await self.repository.get_all(
             skip=skip,
@@ -147,7 +269,8 @@ class RefuelService:
             placa=placa,
             id_usuario=str(id_usuario) if id_usuario else None,
             data_inicio=data_inicio,
-            data_fim=data_fim
+            data_fim=data_fim,
+            opcoes=opcoes
         )
     
     async def count_refuels(
@@ -164,6 +287,31 @@ class RefuelService:
             data_fim=data_fim
         )
     
+    async def export_refuels(
+        self,
+        formato: str = "csv",
+        placa: Optional[str] = None,
+        id_usuario: Optional[UUID] = None,
+        data_inicio: Optional[date] = None,
+        data_fim: Optional[date] = None
+    ) -> AsyncIterator[bytes]:
+        """
+        Exportação em CSV ou NDJSON, um pedaço por lote lido do cursor
+        (para StreamingResponse; memória constante para qualquer volume).
+        """
+        if formato == "csv":
+            yield _csv_chunk([], cabecalho=True).encode()
+
+        lotes = self.repository.stream_for_export(
+            placa=placa,
+            id_usuario=str(id_usuario) if id_usuario else None,
+            data_inicio=data_inicio,
+            data_fim=data_fim
+        )
+        async for lote in lotes:
+            pedaco = _csv_chunk(lote) if formato == "csv" else _ndjson_chunk(lote)
+            yield pedaco.encode()
+    
     async def update_refuel(
         self,
         refuel_id: int,
@@ -178,7 +326,81 @@ class RefuelService:
         if refuel_data.km is not None and refuel_data.km <= 0:
             raise ValidationError("Quilometragem deve ser maior que zero")
         
-        return await self.repository.update(refuel_id, refuel_data)
+        refuel = await self.repository.get_by_id(refuel_id)
+        km_anterior = refuel.km
+        await lock_placa(self.db, refuel.placa)
+
+        refuel = await self.repository.update(refuel_id, refuel_data)
+
+        # KM/litros/tanque cheio podem ter mudado as médias seguintes
+        await self._recalculate_from_km(refuel.placa, min(km_anterior, refuel.km))
+
+        # A média deste abastecimento pode ter mudado no UPDATE em SQL
+        await self.db.refresh(refuel)
+        await self._commit()
+        return refuel
     
     async def delete_refuel(self, refuel_id: int) -> None:
+        refuel = await self.repository.get_by_id(refuel_id)
+        placa, km = refuel.placa, refuel.km
+        await lock_placa(self.db, placa)
+
+        # Exclusão entregue ao app no próximo /sync
+        self.sync_repository.add_tombstone("abastecimento", refuel.id, refuel.id_usuario)
         await self.repository.delete(refuel_id)
+        await self._recalculate_from_km(placa, km)
+
+        await self._commit()
+
+    async def _commit(self) -> None:
+        """Commit da operação ou, com auto_commit=False, só flush"""
+        if self.auto_commit:
+            await self.db.commit()
+        else:
+            await self.db.flush()
+
+    async def _record_media(self, placa: str, media: float, modelo: Optional[dict], n_anterior: int) -> None:
+        """
+        Acrescenta a média (já gravada no banco, sem commit) ao histórico da
+        IA e retreina se o gate pedir. Placa fria chegando a MIN_HISTORICO
+        médias é promovida; histórico fora de sincronia com os abastecimentos
+        é reconstruído a partir deles. A placa já deve estar travada (lock_placa).
+        """
+        registro = await asyncio.to_thread(record_media, placa, media, modelo, n_anterior)
+
+        if registro["retreinar"]:
+            await asyncio.to_thread(retrain_model, placa, registro["motivo_retreino"])
+            return
+
+        if registro["historico_proprio"] and registro["sincronizado"]:
+            return
+
+        # Médias lidas do banco, já com este abastecimento
+        _, medias = await self.repository.get_medias_from_km(placa, 0)
+
+        if not registro["historico_proprio"]:
+            # Placa fria: ganha histórico e modelo próprios ao chegar a MIN_HISTORICO médias
+            if len(medias) >= MIN_HISTORICO:
+                await asyncio.to_thread(promote_plate, placa, medias)
+            return
+
+        await asyncio.to_thread(rebuild_history_suffix, placa, 0, medias)
+
+    async def _recalculate_from_km(self, placa: str, km_inicio: int) -> None:
+        """
+        Depois de editar/remover um abastecimento: recalcula no banco as
+        médias a partir de km_inicio, troca o trecho correspondente do
+        histórico da IA e refaz o estado de consumo do veículo.
+        Não faz commit; a placa já deve estar travada (lock_placa).
+        """
+        await self.repository.recalculate_medias(placa, km_inicio)
+
+        n_prefixo, sufixo = await self.repository.get_medias_from_km(placa, km_inicio)
+        alterado = await asyncio.to_thread(rebuild_history_suffix, placa, n_prefixo, sufixo)
+
+        # Histórico fora de sincronia com os abastecimentos: reconstrói inteiro
+        if alterado is None:
+            _, medias = await self.repository.get_medias_from_km(placa, 0)
+            await asyncio.to_thread(rebuild_history_suffix, placa, 0, medias)
+
+        await self.vehicle_repository.refresh_consumption_state(placa)
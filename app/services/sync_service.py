@@ -0,0 +1,133 @@
+import base64
+import binascii
+import json
+from datetime import datetime, timedelta
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.user import User
+from app.repositories.sync_repository import SyncRepository, Posicao
+from app.schemas.enums import UserType
+from app.schemas.vehicle import VehicleResponse
+from app.schemas.refuel import RefuelResponse
+from app.schemas.alert import AlertResponse
+from app.schemas.sync import SyncResponse, SyncTombstoneResponse
+from app.common.exceptions.validation_exceptions import ValidationError
+
+# Entidades do cursor, na ordem da resposta
+ENTIDADES = ("veiculos", "abastecimentos", "alertas", "exclusoes")
+CURSOR_VERSAO = 1
+
+
+def encode_cursor(posicoes: dict[str, Posicao]) -> str:
+    """Cursor opaco (base64url de JSON): posição de cada entidade"""
+    dados = {"v": CURSOR_VERSAO}
+    for nome, (instante, ultimo_id) in posicoes.items():
+        dados[nome] = [instante.isoformat(), str(ultimo_id) if ultimo_id else None]
+    return base64.urlsafe_b64encode(json.dumps(dados, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> dict[str, Posicao]:
+    try:
+        dados = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if dados.get("v") != CURSOR_VERSAO:
+            raise ValueError("versão")
+        return {
+            nome: (datetime.fromisoformat(dados[nome][0]), UUID(dados[nome][1]) if dados[nome][1] else None)
+            for nome in ENTIDADES
+        }
+    except (ValueError, KeyError, TypeError, IndexError, binascii.Error, json.JSONDecodeError):
+        raise ValidationError.invalid_field("cursor", "Cursor de sincronização inválido")
+
+
+class SyncService:
+    """Sincronização incremental do app: o que mudou desde o cursor do cliente"""
+
+    def __init__(self, db: AsyncSession):
+        self.repository = SyncRepository(db)
+
+    async def sync(self, usuario: User, cursor: Optional[str], limit: int) -> SyncResponse:
+        """
+        Veículos, abastecimentos e alertas alterados (criados ou atualizados)
+        e exclusões desde o cursor, até `limit` de cada. Sem cursor, ou com
+        cursor mais antigo que a retenção das exclusões, devolve tudo
+        (reset=True) e o cliente recomeça do zero.
+
+        Só entram alterações anteriores ao início da transação aberta mais
+        antiga: updated_at é o início da transação, e uma transação ainda
+        aberta (ex.: abastecimento esperando o lock da placa e retreinando a
+        IA) grava um momento anterior ao de linhas já entregues.
+        """
+        agora, ate = await self.repository.horizon()
+
+        posicoes = decode_cursor(cursor) if cursor else None
+        retencao = agora - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+        reset = posicoes is None or posicoes["exclusoes"][0] < retencao
+        if reset:
+            # Resposta completa: exclusões anteriores não interessam
+            posicoes = {nome: None for nome in ENTIDADES}
+            posicoes["exclusoes"] = (ate, None)
+
+        # Admin sincroniza a frota inteira; os demais, só o que é seu
+        id_usuario = None if usuario.type == UserType.ADM else usuario.id
+
+        mais = False
+        novas: dict[str, Posicao] = {}
+
+        def pagina(nome: str, linhas: list, chave) -> list:
+            """Corta a página e calcula a nova posição da entidade"""
+            nonlocal mais
+            if len(linhas) > limit:
+                mais = True
+                linhas = linhas[:limit]
+                novas[nome] = chave(linhas[-1])
+            else:
+                # Tudo antes de `ate` já foi entregue
+                novas[nome] = (ate, None)
+            return linhas
+
+        veiculos = pagina(
+            "veiculos",
+            await self.repository.changed_vehicles(posicoes["veiculos"], ate, limit + 1, id_usuario),
+            lambda linha: (linha[0], linha[1].id)
+        )
+        abastecimentos = pagina(
+            "abastecimentos",
+            await self.repository.changed_refuels(posicoes["abastecimentos"], ate, limit + 1, id_usuario),
+            lambda linha: (linha[0], linha[1].id)
+        )
+        alertas = pagina(
+            "alertas",
+            list(await self.repository.changed_alerts(posicoes["alertas"], ate, limit + 1, id_usuario)),
+            lambda linha: (linha["updated_at"], linha["id"])
+        )
+        exclusoes = pagina(
+            "exclusoes",
+            [] if reset else await self.repository.tombstones(posicoes["exclusoes"], ate, limit + 1, id_usuario),
+            lambda linha: (linha.created_at, linha.id)
+        )
+
+        return SyncResponse(
+            cursor=encode_cursor(novas),
+            mais=mais,
+            reset=reset,
+            veiculos=[VehicleResponse.model_validate(v) for _, v in veiculos],
+            abastecimentos=[RefuelResponse.model_validate(r) for _, r in abastecimentos],
+            alertas=[AlertResponse.model_validate(dict(a)) for a in alertas],
+            exclusoes=[
+                SyncTombstoneResponse(entidade=e.entidade, id=e.id_registro, excluido_em=e.created_at)
+                for e in exclusoes
+            ]
+        )
+
+    async def purge_tombstones(self) -> int:
+        """Remove as exclusões mais antigas que a retenção"""
+        agora = await self.repository.now()
+        removidas = await self.repository.delete_tombstones_before(
+            agora - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+        )
+        await self.repository.db.commit()
+        return removidas
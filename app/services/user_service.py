@@ -1,4 +1,4 @@
-from typing import Optional, List
+from typing import Optional, List, Sequence
 from uuid import UUID as UuidType
 
 from sqlalchemy.exc import IntegrityError
@@ -62,7 +62,8 @@ class UserService:
         limit: int = 100,
         status: Optional[UserStatus] = None,
         user_type: Optional[UserType] = None,
-        search: Optional[str] = None
+        search: Optional[str] = None,
+        opcoes: Sequence = ()
     ) -> List[User]:
         """Lista usuários com filtros e paginação"""
         return await self.repo.get_all(
@@ -70,7 +71,8 @@ class UserService:
             limit=limit,
             status=status,
             user_type=user_type,
-            search=search
+            search=search,
+            opcoes=opcoes
         )
 
     async def count_users(
@@ -1,20 +1,23 @@
-from typing import Optional, List
+from typing import Optional, List, Sequence
 from uuid import UUID
 
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.repositories.vehicle_repository import VehicleRepository
+from app.repositories.sync_repository import SyncRepository
 from app.models.vehicle import Vehicle
 from app.schemas.vehicle import VehicleCreate, VehicleUpdate
 from app.schemas.enums import VehicleType
 from app.common.exceptions.veiculo_exceptions import VeiculoAlreadyExistsError
 from app.common.exceptions.validation_exceptions import ValidationError
+from app.common.batch import parse_ids, in_request_order
 
 
 class VehicleService:
     def __init__(self, db: AsyncSession):
         self.repo = VehicleRepository(db)
+        self.sync_repo = SyncRepository(db)
     
     async def create_vehicle(self, vehicle_data: VehicleCreate) -> Vehicle:
         """Cria um novo veículo com validações de negócio"""
@@ -60,6 +63,18 @@ class VehicleService:
         """Busca um veículo pelo ID"""
         return await self.repo.get_by_id(vehicle_id)
 
+    async def get_vehicles_by_ids(
+        self,
+        ids: Sequence[UUID],
+        id_usuario: Optional[UUID] = None
+    ) -> tuple[List[Vehicle], List[UUID]]:
+        """
+        Busca em lote: veículos na ordem de `ids` e os ids não encontrados.
+        id_usuario: veículos de outro usuário contam como não encontrados
+        """
+        ids = parse_ids(ids)
+        return in_request_order(ids, await self.repo.get_by_ids(ids, id_usuario))
+
     async def get_vehicle_by_placa(self, placa: str) -> Vehicle:
         """Busca um veículo pela placa"""
         return await self.repo.get_by_placa(placa)
@@ -72,7 +87,8 @@ class VehicleService:
         tipo: Optional[VehicleType] = None,
         frota: Optional[str] = None,
         manutencao_vencida: Optional[bool] = None,
-        search: Optional[str] = None
+        search: Optional[str] = None,
+        opcoes: Sequence = ()
     ) -> List[Vehicle]:
         """Lista veículos com filtros e paginação"""
         return await self.repo.get_all(
@@ -82,7 +98,8 @@ class VehicleService:
             tipo=tipo,
             frota=frota,
             manutencao_vencida=manutencao_vencida,
-            search=search
+            search=search,
+            opcoes=opcoes
         )
 
     async def count_vehicles(
@@ -102,15 +119,8 @@ class VehicleService:
             search=search
         )
 
-    async def update_vehicle(self, vehicle_id: UUID, vehicle_data: VehicleUpdate) -> Vehicle:
-        """Atualiza um veículo existente com validações"""
-        # Validar placa única se estiver sendo alterada
-        if vehicle_data.placa and await self.repo.exists_placa(
-            vehicle_data.placa, 
-            exclude_vehicle_id=vehicle_id
-        ):
-            raise VeiculoAlreadyExistsError.by_placa(vehicle_data.placa)
-        
+    async def update_vehicle(self, vehicle: Vehicle, vehicle_data: VehicleUpdate) -> Vehicle:
+        """Atualiza um veículo já carregado (e autorizado) com validações"""
         # Validações de campos numéricos
         if vehicle_data.km_atual is not None and vehicle_data.km_atual < 0:
             raise ValidationError.invalid_field("km_atual", "Quilometragem não pode ser negativa")
@@ -127,22 +137,70 @@ class VehicleService:
                 "Frequência de manutenção deve ser maior que zero"
             )
         
-        return await self.repo.update(vehicle_id, vehicle_data)
+        # Trocou de responsável: o veículo e os alertas dele saem do /sync do
+        # anterior e entram no do novo (alertas com updated_at de agora)
+        if vehicle_data.id_usuario is not None and vehicle_data.id_usuario != vehicle.id_usuario:
+            self.sync_repo.add_tombstone("veiculo", vehicle.id, vehicle.id_usuario)
+            await self.sync_repo.add_vehicle_alert_tombstones(vehicle.id, vehicle.id_usuario)
+            await self.sync_repo.touch_vehicle_alerts(vehicle.id)
 
-    async def delete_vehicle(self, vehicle_id: UUID) -> bool:
-        """Remove um veículo"""
-        return await self.repo.delete(vehicle_id)
+        try:
+            return await self.repo.update(vehicle, vehicle_data)
+        except IntegrityError as e:
+            # Placa única garantida pela constraint do banco (sem consulta prévia)
+            if "placa" in str(e.orig).lower():
+                raise VeiculoAlreadyExistsError.by_placa(vehicle_data.placa)
+            raise
 
-    async def update_km(self, vehicle_id: UUID, km_atual: int) -> Vehicle:
-        """Atualiza a quilometragem do veículo"""
+    async def delete_vehicle(self, vehicle: Vehicle) -> bool:
+        """Remove um veículo já carregado (e autorizado)"""
+        self.sync_repo.add_tombstone("veiculo", vehicle.id, vehicle.id_usuario)
+        # Os alertas saem junto (ON DELETE CASCADE)
+        await self.sync_repo.add_vehicle_alert_tombstones(vehicle.id, vehicle.id_usuario)
+        return await self.repo.delete(vehicle)
+
+    async def update_km(
+        self,
+        vehicle_id: UUID,
+        km_atual: int,
+        id_usuario: Optional[UUID] = None
+    ) -> Vehicle:
+        """
+        Atualiza a quilometragem do veículo.
+        id_usuario: só permite se o veículo for dele (None = sem restrição)
+        """
         if km_atual < 0:
             raise ValidationError.invalid_field("km_atual", "Quilometragem não pode ser negativa")
         
-        return await self.repo.update_km(vehicle_id, km_atual)
+        vehicle = await self.repo.update_km(vehicle_id, km_atual, id_usuario)
+        if vehicle is None:
+            await self._raise_not_found_or_unauthorized(
+                vehicle_id,
+                "Usuário não tem permissão para atualizar este veículo"
+            )
+        return vehicle
 
-    async def registrar_manutencao(self, vehicle_id: UUID) -> Vehicle:
-        """Registra que a manutenção foi realizada"""
-        return await self.repo.registrar_manutencao(vehicle_id)
+    async def registrar_manutencao(
+        self,
+        vehicle_id: UUID,
+        id_usuario: Optional[UUID] = None
+    ) -> Vehicle:
+        """
+        Registra que a manutenção foi realizada.
+        id_usuario: só permite se o veículo for dele (None = sem restrição)
+        """
+        vehicle = await self.repo.registrar_manutencao(vehicle_id, id_usuario)
+        if vehicle is None:
+            await self._raise_not_found_or_unauthorized(
+                vehicle_id,
+                "Usuário não tem permissão para registrar manutenção deste veículo"
+            )
+        return vehicle
+
+    async def _raise_not_found_or_unauthorized(self, vehicle_id: UUID, message: str) -> None:
+        """UPDATE condicional não alterou nada: veículo inexistente ou de outro usuário"""
+        await self.repo.get_by_id(vehicle_id)
+        raise ValidationError.unauthorized_operation(message)
 
     async def get_vehicles_manutencao_vencida(
         self, 
@@ -150,3 +208,12 @@ class VehicleService:
     ) -> List[Vehicle]:
         """Busca veículos com manutenção vencida"""
         return await self.repo.get_vehicles_manutencao_vencida(id_usuario)
+
+    async def recompute_maintenance(self) -> dict:
+        """Recalcula a próxima manutenção e a flag de vencida de toda a frota"""
+        alterados = await self.repo.recompute_maintenance()
+        return {
+            "alterados": len(alterados),
+            "vencidas": sum(1 for _, vencida in alterados if vencida),
+            "placas": [placa for placa, _ in alterados]
+        }
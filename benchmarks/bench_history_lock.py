@@ -0,0 +1,99 @@
+"""
+Stress test do lock por placa no histórico da IA.
+
+Dispara muitas gravações concorrentes (várias placas, várias gravações por
+placa), cada uma na sua própria sessão, como fariam workers diferentes.
+Cada placa começa com MIN_HISTORICO médias (placa fria não grava histórico
+próprio). Ao final confere se o histórico de cada placa tem exatamente uma
+entrada a mais por gravação, ou seja, se nenhum append foi perdido.
+
+Requer um PostgreSQL acessível em DATABASE_URL. Os artefatos vão para um
+diretório temporário (backend filesystem).
+
+    python -m benchmarks.bench_history_lock
+    python -m benchmarks.bench_history_lock --sem-lock   # mostra a corrida
+"""
+import argparse
+import asyncio
+import random
+import tempfile
+import time
+
+import numpy as np
+
+from app.core.config import settings
+
+settings.MODEL_STORE_BACKEND = "filesystem"
+settings.MODEL_STORE_PATH = tempfile.mkdtemp(prefix="bench_ia_")
+
+from app.core.database import AsyncSessionLocal, engine  # noqa: E402
+from app.integrations.db.locks import lock_placa  # noqa: E402
+from app.integrations.model_store import get_model_store  # noqa: E402
+from app.services.ai_service import ingest, retrain_model, save_history, MIN_HISTORICO  # noqa: E402
+
+
+def registrar(placa: str, media: float) -> None:
+    """Mesma sequência do cadastro de abastecimento: ingest e, se o gate pedir, retreino"""
+    resultado = ingest(placa, media)
+    if resultado["retreinar"]:
+        retrain_model(placa, resultado["motivo_retreino"])
+
+
+async def gravar(placa: str, usar_lock: bool) -> bool:
+    async with AsyncSessionLocal() as session:
+        if usar_lock:
+            await lock_placa(session, placa)
+        try:
+            await asyncio.to_thread(registrar, placa, random.uniform(2.5, 3.5))
+        except Exception:
+            # Sem lock, leituras concorrentes podem falhar no meio da corrida
+            return False
+        await session.commit()
+        return True
+
+
+async def main(placas: int, gravacoes: int, usar_lock: bool) -> int:
+    nomes = [f"BEN{i:04d}" for i in range(placas)]
+    for placa in nomes:
+        save_history(placa, np.random.uniform(2.5, 3.5, MIN_HISTORICO))
+
+    tarefas = [gravar(placa, usar_lock) for placa in nomes for _ in range(gravacoes)]
+    random.shuffle(tarefas)
+
+    inicio = time.perf_counter()
+    try:
+        resultados = await asyncio.gather(*tarefas)
+    finally:
+        await engine.dispose()
+    duracao = time.perf_counter() - inicio
+
+    store = get_model_store()
+    perdidos = 0
+    for placa in nomes:
+        historico = store.load(placa, "historico", fresh=True)
+        perdidos += MIN_HISTORICO + gravacoes - (0 if historico is None else len(historico))
+
+    total = placas * gravacoes
+    print(f"Gravações: {total} ({placas} placas x {gravacoes}) | lock: {'sim' if usar_lock else 'não'}")
+    print(f"Tempo: {duracao:.2f}s ({total / duracao:.1f} gravações/s)")
+
+    falhas = resultados.count(False)
+    if falhas:
+        print(f"⚠️  {falhas} gravações falharam")
+
+    if perdidos:
+        print(f"❌ {perdidos} appends perdidos")
+        return 1
+
+    print("✅ Nenhum append perdido")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--placas", type=int, default=8)
+    parser.add_argument("--gravacoes", type=int, default=25)
+    parser.add_argument("--sem-lock", action="store_true")
+    args = parser.parse_args()
+
+    raise SystemExit(asyncio.run(main(args.placas, args.gravacoes, not args.sem_lock)))
@@ -0,0 +1,240 @@
+"""
+CPU por requisição das listagens com 1000 linhas: retorno padrão (modelo
+devolvido sob response_model=, validado de novo e serializado pelo
+FastAPI) x PydanticResponse (serializado direto para bytes).
+
+Duas medidas, sem banco (linhas ORM transitórias de Refuel e Vehicle e,
+para os alertas, mappings no formato da projeção da listagem):
+
+  - serialização: só o caminho da resposta, nas três formas possíveis -
+    FastAPI sem o caminho rápido dump_json (validação + dict + json.dumps,
+    o que roda nas versões mais antigas aceitas pelo pyproject), FastAPI
+    com dump_json (validação + bytes) e PydanticResponse (só bytes);
+  - requisição completa: a pilha inteira do FastAPI instalado, em processo
+    (httpx + ASGITransport), com rodadas intercaladas e mediana.
+
+Também confere que os corpos das respostas são idênticos.
+
+    python -m benchmarks.bench_json_response
+    python -m benchmarks.bench_json_response --linhas 1000 --requisicoes 200
+"""
+import argparse
+import asyncio
+import inspect
+import json
+import statistics
+import time
+import uuid
+from datetime import date, datetime, time as dtime, timedelta, timezone
+from decimal import Decimal
+
+import fastapi
+import httpx
+from fastapi import FastAPI
+from fastapi.routing import serialize_response
+from pydantic import TypeAdapter
+
+from app.common.responses import PydanticResponse
+from app.models.refuel import Refuel
+from app.models.vehicle import Vehicle
+from app.schemas.alert import AlertResponse
+from app.schemas.enums import VehicleType
+from app.schemas.refuel import RefuelListResponse, RefuelResponse
+from app.schemas.vehicle import VehicleListResponse, VehicleResponse
+
+
+def gerar_dados(linhas: int):
+    agora = datetime.now(timezone.utc)
+    id_usuario = uuid.uuid4()
+
+    refuels = [
+        Refuel(
+            id=uuid.uuid4(), data=date(2025, 1, 1) + timedelta(days=i % 365), hora=dtime(10, i % 60),
+            km=10000 + i * 500, litros=Decimal("45.20"), tipo_combustivel="diesel",
+            valor_litro=Decimal("5.89"), posto="Posto Bench", tanque_cheio=i % 2 == 0,
+            media=Decimal("11.06"), valor_total=Decimal("266.23"), id_usuario=id_usuario,
+            placa=f"BEN{i % 50:04d}", created_at=agora, updated_at=agora
+        )
+        for i in range(linhas)
+    ]
+    vehicles = [
+        Vehicle(
+            id=uuid.uuid4(), placa=f"BEN{i:04d}", modelo="FH 540", marca="Volvo", ano=2020,
+            tipo=VehicleType.CAMINHAO, id_usuario=id_usuario, frota="Bench", km_atual=250000 + i,
+            frequencia_km_manutencao=10000, km_prox_manutencao=260000, manutencao_vencida=False,
+            capacidade_tanque=600, km_ultimo_abastecimento=249500, created_at=agora, updated_at=agora
+        )
+        for i in range(linhas)
+    ]
+    alertas = [
+        {
+            "id": uuid.uuid4(), "id_veiculo": uuid.uuid4(), "id_abastecimento": uuid.uuid4(),
+            "data_abastecimento": date(2025, 1, 1), "severity": "HIGH",
+            "message": "Consumo 35% acima da média do veículo", "resolved": False,
+            "created_at": agora.replace(tzinfo=None), "placa": f"BEN{i % 50:04d}"
+        }
+        for i in range(linhas)
+    ]
+    return refuels, vehicles, alertas
+
+
+def criar_app(refuels, vehicles, alertas) -> FastAPI:
+    """Pares de rotas iguais às dos routers, antes e depois do PydanticResponse"""
+    app = FastAPI()
+
+    def refuel_list():
+        return RefuelListResponse(
+            refuels=[RefuelResponse.model_validate(r) for r in refuels],
+            total=len(refuels), page=1, per_page=len(refuels)
+        )
+
+    def vehicle_list():
+        return VehicleListResponse(
+            vehicles=[VehicleResponse.model_validate(v) for v in vehicles],
+            total=len(vehicles), page=1, per_page=len(vehicles)
+        )
+
+    @app.get("/refuels/padrao", response_model=RefuelListResponse)
+    async def refuels_padrao() -> RefuelListResponse:
+        return refuel_list()
+
+    @app.get("/refuels/pydantic", response_model=RefuelListResponse)
+    async def refuels_pydantic() -> PydanticResponse:
+        return PydanticResponse(refuel_list())
+
+    @app.get("/vehicles/padrao", response_model=VehicleListResponse)
+    async def vehicles_padrao() -> VehicleListResponse:
+        return vehicle_list()
+
+    @app.get("/vehicles/pydantic", response_model=VehicleListResponse)
+    async def vehicles_pydantic() -> PydanticResponse:
+        return PydanticResponse(vehicle_list())
+
+    # Alertas: a rota devolve dicts da projeção, validados só pelo
+    # response_model (fica no caminho padrão; o par mostra o custo de validar na rota)
+    @app.get("/alerts/padrao", response_model=list[AlertResponse])
+    async def alerts_padrao():
+        return [dict(a) for a in alertas]
+
+    @app.get("/alerts/pydantic", response_model=list[AlertResponse])
+    async def alerts_pydantic():
+        return PydanticResponse([AlertResponse.model_validate(dict(a)) for a in alertas])
+
+    return app
+
+
+def cpu_ms(funcao, repeticoes: int, rodadas: int = 5) -> float:
+    """Menor CPU (ms) por chamada entre as rodadas"""
+    funcao()
+    melhores = []
+    for _ in range(rodadas):
+        inicio = time.process_time()
+        for _ in range(repeticoes):
+            funcao()
+        melhores.append((time.process_time() - inicio) * 1000 / repeticoes)
+    return min(melhores)
+
+
+def medir_serializacao(linhas: int, repeticoes: int) -> bool:
+    """Só o caminho da resposta, a partir do que a rota devolve"""
+    refuels, vehicles, alertas = gerar_dados(linhas)
+    cenarios = {
+        "refuels": (
+            TypeAdapter(RefuelListResponse),
+            RefuelListResponse(refuels=[RefuelResponse.model_validate(r) for r in refuels],
+                               total=linhas, page=1, per_page=linhas),
+        ),
+        "vehicles": (
+            TypeAdapter(VehicleListResponse),
+            VehicleListResponse(vehicles=[VehicleResponse.model_validate(v) for v in vehicles],
+                                total=linhas, page=1, per_page=linhas),
+        ),
+        # Dicts validados pelo response_model x validados na rota
+        "alerts": (TypeAdapter(list[AlertResponse]), [dict(a) for a in alertas]),
+    }
+
+    iguais = True
+    print(f"Serialização ({linhas} linhas, CPU por resposta)")
+    for nome, (adapter, retorno) in cenarios.items():
+        def sem_dump_json():
+            valor = adapter.validate_python(retorno, from_attributes=True)
+            conteudo = adapter.dump_python(valor, mode="json")
+            # JSONResponse.render
+            return json.dumps(conteudo, ensure_ascii=False, allow_nan=False, indent=None,
+                              separators=(",", ":")).encode("utf-8")
+
+        def com_dump_json():
+            return adapter.dump_json(adapter.validate_python(retorno, from_attributes=True))
+
+        if nome == "alerts":
+            def pydantic_response():
+                return PydanticResponse([AlertResponse.model_validate(a) for a in retorno]).body
+        else:
+            def pydantic_response():
+                return PydanticResponse(retorno).body
+
+        iguais &= sem_dump_json() == com_dump_json() == pydantic_response()
+        antigo, recente, rapido = (cpu_ms(f, repeticoes) for f in (sem_dump_json, com_dump_json, pydantic_response))
+        print(
+            f"  {nome:<9} sem dump_json {antigo:6.2f} ms | com dump_json {recente:6.2f} ms | "
+            f"PydanticResponse {rapido:6.2f} ms | economia {antigo - rapido:5.2f} ms ({(antigo - rapido) / antigo:4.0%})"
+            f" / {recente - rapido:5.2f} ms ({(recente - rapido) / recente:4.0%})"
+        )
+    return iguais
+
+
+async def medir_requisicoes(linhas: int, requisicoes: int, rodadas: int = 5) -> bool:
+    """Pilha inteira do FastAPI instalado: mediana das rodadas intercaladas"""
+    app = criar_app(*gerar_dados(linhas))
+    caminho_rapido = "dump_json" in inspect.signature(serialize_response).parameters
+
+    async def rodada(client, url) -> float:
+        inicio = time.process_time()
+        for _ in range(requisicoes):
+            await client.get(url)
+        return (time.process_time() - inicio) * 1000 / requisicoes
+
+    iguais = True
+    print(
+        f"Requisição completa (FastAPI {fastapi.__version__}, "
+        f"{'com' if caminho_rapido else 'sem'} dump_json; {requisicoes} req x {rodadas} rodadas)"
+    )
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        for cenario in ("refuels", "vehicles", "alerts"):
+            urls = (f"/{cenario}/padrao", f"/{cenario}/pydantic")
+            corpos = [(await client.get(url)).content for url in urls]
+            iguais &= corpos[0] == corpos[1]
+
+            tempos = {url: [] for url in urls}
+            for _ in range(rodadas):
+                for url in urls:
+                    tempos[url].append(await rodada(client, url))
+            padrao, rapido = (statistics.median(tempos[url]) for url in urls)
+
+            print(
+                f"  {cenario:<9} padrão {padrao:6.2f} ms | PydanticResponse {rapido:6.2f} ms | "
+                f"economia {padrao - rapido:5.2f} ms ({(padrao - rapido) / padrao:4.0%}) | "
+                f"{len(corpos[1]) / 1024:.0f} KiB"
+            )
+    return iguais
+
+
+async def main(linhas: int, requisicoes: int) -> int:
+    iguais = medir_serializacao(linhas, requisicoes)
+    iguais &= await medir_requisicoes(linhas, requisicoes)
+
+    if not iguais:
+        print("❌ Corpos diferentes entre as duas rotas")
+        return 1
+
+    print("✅ Corpos idênticos nas duas rotas")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--linhas", type=int, default=1000)
+    parser.add_argument("--requisicoes", type=int, default=50)
+    args = parser.parse_args()
+
+    raise SystemExit(asyncio.run(main(args.linhas, args.requisicoes)))
@@ -0,0 +1,199 @@
+"""
+Carga concorrente em RefuelService.create_refuel.
+
+Dois cenários, com e sem o lock por placa:
+  - placas distintas: um abastecimento por placa por rodada, todos ao mesmo
+    tempo (o lock não deve custar vazão, pois ninguém espera ninguém);
+  - mesma placa: vários abastecimentos da mesma placa ao mesmo tempo (sem
+    o lock, as médias e o estado de consumo do veículo saem errados).
+
+Ao final de cada cenário as médias gravadas são comparadas com o recálculo
+em SQL (RefuelRepository.recalculate_medias, em transação desfeita) e o
+estado de consumo dos veículos com refresh_consumption_state.
+
+Requer um PostgreSQL acessível em DATABASE_URL com as tabelas criadas.
+Cria um usuário e veículos BCC* próprios e remove tudo no final. Os
+artefatos da IA vão para um diretório temporário (backend filesystem).
+
+    python -m benchmarks.bench_refuel_concurrency
+    python -m benchmarks.bench_refuel_concurrency --placas 100 --rodadas 10
+"""
+import argparse
+import asyncio
+import random
+import tempfile
+import time
+import uuid
+from datetime import date, time as dtime
+from decimal import Decimal
+
+from app.core.config import settings
+
+settings.MODEL_STORE_BACKEND = "filesystem"
+settings.MODEL_STORE_PATH = tempfile.mkdtemp(prefix="bench_ia_")
+
+from sqlalchemy import text  # noqa: E402
+
+from app.common.exceptions import ResourceLockedError, ValidationError  # noqa: E402
+from app.core.database import AsyncSessionLocal, engine  # noqa: E402
+from app.repositories.refuel_repository import RefuelRepository  # noqa: E402
+from app.repositories.vehicle_repository import VehicleRepository  # noqa: E402
+from app.schemas.refuel import RefuelCreate  # noqa: E402
+from app.services import refuel_service  # noqa: E402
+
+PREFIXO = "BCC"
+EMAIL = "bench-concorrencia@frontnix.local"
+
+_lock_placa = refuel_service.lock_placa
+
+
+async def _sem_lock(db, placa, timeout_ms=None):
+    return None
+
+
+async def preparar(placas: int) -> tuple[uuid.UUID, list[str]]:
+    nomes = [f"{PREFIXO}{i:04d}" for i in range(placas)]
+    id_usuario = uuid.uuid4()
+
+    async with AsyncSessionLocal() as session:
+        await session.execute(
+            text(
+                'INSERT INTO users (id, name, "lastName", email, password, cpf, type, status) '
+                "VALUES (:id, 'Bench', 'Concorrencia', :email, '-', :cpf, 'ADM', 'ATIVO')"
+            ),
+            {"id": id_usuario, "email": EMAIL, "cpf": f"bench-{id_usuario.hex[:8]}"}
+        )
+        for placa in nomes:
+            await session.execute(
+                text(
+                    "INSERT INTO veiculos (id, placa, modelo, marca, ano, tipo, id_usuario, "
+                    "km_atual, capacidade_tanque, manutencao_vencida) "
+                    "VALUES (:id, :placa, 'Bench', 'Bench', 2024, 'CAMINHAO', :usuario, 1000, 300, false)"
+                ),
+                {"id": uuid.uuid4(), "placa": placa, "usuario": id_usuario}
+            )
+        await session.commit()
+
+    return id_usuario, nomes
+
+
+async def limpar() -> None:
+    async with AsyncSessionLocal() as session:
+        filtro = {"prefixo": f"{PREFIXO}%"}
+        await session.execute(
+            text("DELETE FROM alerts WHERE id_veiculo IN (SELECT id FROM veiculos WHERE placa LIKE :prefixo)"),
+            filtro
+        )
+        await session.execute(text("DELETE FROM refuel WHERE placa LIKE :prefixo"), filtro)
+        await session.execute(text("DELETE FROM veiculos WHERE placa LIKE :prefixo"), filtro)
+        await session.execute(text("DELETE FROM users WHERE email = :email"), {"email": EMAIL})
+        await session.commit()
+
+
+async def abastecer(id_usuario: uuid.UUID, placa: str, km: int) -> str:
+    dados = RefuelCreate(
+        data=date.today(),
+        hora=dtime(12, 0),
+        km=km,
+        litros=Decimal(random.randint(80, 150)),
+        valor_litro=Decimal("6.10"),
+        tanque_cheio=random.random() < 0.7,
+        id_usuario=id_usuario,
+        placa=placa
+    )
+
+    async with AsyncSessionLocal() as session:
+        try:
+            await refuel_service.RefuelService(session).create_refuel(dados)
+        except ValidationError:
+            # KM menor que o atual: outro abastecimento da placa chegou antes
+            return "rejeitado"
+        except ResourceLockedError:
+            return "timeout"
+        except Exception:
+            return "falha"
+
+    return "ok"
+
+
+async def divergencias(nomes: list[str]) -> tuple[int, int]:
+    """Médias e estados de consumo que o recálculo em SQL mudaria (sem gravar)."""
+    async with AsyncSessionLocal() as session:
+        refuels = RefuelRepository(session, auto_commit=False)
+        medias = 0
+        for placa in nomes:
+            medias += await refuels.recalculate_medias(placa, 0)
+
+        estados = 0
+        for placa in nomes:
+            estados += len(
+                await VehicleRepository(session, auto_commit=False).refresh_consumption_state(placa)
+            )
+
+        await session.rollback()
+
+    return medias, estados
+
+
+async def cenario(nome: str, placas: int, por_placa: int, rodadas: int, usar_lock: bool) -> bool:
+    refuel_service.lock_placa = _lock_placa if usar_lock else _sem_lock
+    await limpar()
+    id_usuario, nomes = await preparar(placas)
+
+    km = {placa: 1000 for placa in nomes}
+    contagem: dict[str, int] = {}
+    total = 0
+
+    inicio = time.perf_counter()
+    for _ in range(rodadas):
+        tarefas = []
+        for placa in nomes:
+            for _ in range(por_placa):
+                km[placa] += random.randint(300, 900)
+                tarefas.append(abastecer(id_usuario, placa, km[placa]))
+        random.shuffle(tarefas)
+
+        for resultado in await asyncio.gather(*tarefas):
+            contagem[resultado] = contagem.get(resultado, 0) + 1
+        total += len(tarefas)
+    duracao = time.perf_counter() - inicio
+
+    medias, estados = await divergencias(nomes)
+    await limpar()
+
+    resumo = ", ".join(f"{k}={v}" for k, v in sorted(contagem.items()))
+    print(
+        f"{nome:<16} lock={'sim' if usar_lock else 'não':<3} "
+        f"{total:>5} req em {duracao:6.2f}s ({total / duracao:7.1f} req/s) | {resumo}"
+    )
+
+    ok = medias == 0 and estados == 0
+    print(f"{'':<16} {'✅' if ok else '❌'} médias divergentes: {medias} | estados divergentes: {estados}")
+    return ok
+
+
+async def main(placas: int, rodadas: int, concorrentes: int) -> int:
+    try:
+        resultados = []
+        for usar_lock in (False, True):
+            await cenario("placas distintas", placas, 1, rodadas, usar_lock)
+        for usar_lock in (False, True):
+            resultados.append(
+                await cenario("mesma placa", max(placas // 10, 1), concorrentes, rodadas, usar_lock)
+            )
+    finally:
+        refuel_service.lock_placa = _lock_placa
+        await engine.dispose()
+
+    # Só o cenário com lock precisa sair consistente
+    return 0 if resultados[-1] else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--placas", type=int, default=50)
+    parser.add_argument("--rodadas", type=int, default=5)
+    parser.add_argument("--concorrentes", type=int, default=10, help="abastecimentos simultâneos por placa")
+    args = parser.parse_args()
+
+    raise SystemExit(asyncio.run(main(args.placas, args.rodadas, args.concorrentes)))
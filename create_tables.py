@@ -3,9 +3,48 @@ Script para criar as tabelas no banco de dados PostgreSQL
 Execute este arquivo para inicializar o banco de dados
 """
 import asyncio
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import create_async_engine
 from app.core.config import settings
 from app.models import Base
+from app.integrations.db.partitions import is_partitioned, ensure_partitions
+
+
+# create_all não altera tabelas existentes: colunas/índices novos entram
+# aqui, sempre de forma idempotente
+SCHEMA_UPGRADES = [
+    "ALTER TABLE veiculos ADD COLUMN IF NOT EXISTS km_ultimo_tanque_cheio INTEGER",
+    "ALTER TABLE veiculos ADD COLUMN IF NOT EXISTS litros_desde_tanque_cheio NUMERIC(10, 2) NOT NULL DEFAULT 0",
+    "ALTER TABLE veiculos ADD COLUMN IF NOT EXISTS km_ultima_manutencao INTEGER",
+    "CREATE INDEX IF NOT EXISTS ix_veiculos_manutencao_vencida "
+    "ON veiculos (id_usuario, km_atual) WHERE manutencao_vencida",
+    "CREATE INDEX IF NOT EXISTS ix_alerts_veiculo_resolved_created "
+    "ON alerts (id_veiculo, resolved, created_at)",
+    "ALTER TABLE alerts ADD COLUMN IF NOT EXISTS data_abastecimento DATE",
+    # alerts.updated_at: alertas existentes partem de created_at (gravado em UTC)
+    "ALTER TABLE alerts ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITH TIME ZONE",
+    "UPDATE alerts SET updated_at = COALESCE(created_at AT TIME ZONE 'UTC', now()) WHERE updated_at IS NULL",
+    "ALTER TABLE alerts ALTER COLUMN updated_at SET DEFAULT now()",
+    "ALTER TABLE alerts ALTER COLUMN updated_at SET NOT NULL",
+    "CREATE INDEX IF NOT EXISTS ix_alerts_sync ON alerts (updated_at, id)",
+    "CREATE INDEX IF NOT EXISTS ix_refuel_sync ON refuel (COALESCE(updated_at, created_at), id)",
+    "CREATE INDEX IF NOT EXISTS ix_veiculos_sync ON veiculos (COALESCE(updated_at, created_at), id)",
+    # alerts.id_veiculo passa a ser ON DELETE CASCADE (só recria a FK uma vez)
+    """
+    DO $$
+    BEGIN
+        IF NOT EXISTS (
+            SELECT 1 FROM pg_constraint
+            WHERE conname = 'alerts_id_veiculo_fkey' AND confdeltype = 'c'
+        ) THEN
+            ALTER TABLE alerts DROP CONSTRAINT IF EXISTS alerts_id_veiculo_fkey;
+            ALTER TABLE alerts ADD CONSTRAINT alerts_id_veiculo_fkey
+                FOREIGN KEY (id_veiculo) REFERENCES veiculos(id) ON DELETE CASCADE;
+        END IF;
+    END
+    $$
+    """,
+]
 
 
 async def create_tables():
@@ -24,6 +63,13 @@ async def create_tables():
         async with engine.begin() as conn:
             # Cria todas as tabelas definidas nos modelos
             await conn.run_sync(Base.metadata.create_all)
+
+            for ddl in SCHEMA_UPGRADES:
+                await conn.execute(text(ddl))
+            # refuel é particionada por mês: garante as partições dos próximos meses
+            # (bancos antigos: python -m app.jobs.refuel_partitions converter)
+            if await is_partitioned(conn):
+                await ensure_partitions(conn)
         print("✅ Tabelas criadas com sucesso!")
         
     except Exception as e:
@@ -0,0 +1,5 @@
+#!/bin/bash
+# Executado só na criação do volume do primário: libera conexões de
+# replicação (pg_basebackup/streaming) vindas da rede do compose
+set -e
+echo "host replication all all scram-sha-256" >> "$PGDATA/pg_hba.conf"